@@ -525,7 +525,8 @@ const imBackBtn = document.getElementById('im-back-btn');
     
     if (isSessionActive) {
       cameraSection.style.display = 'block';
-      cameraFeed.src = 'http://localhost:8080/video_feed';
+      // The popup shows a small preview; ask for a matching size and rate.
+      cameraFeed.src = 'http://localhost:8080/video_feed?width=320&quality=70&fps=15';
       cameraFeed.style.display = 'block';
       cameraPlaceholder.style.display = 'none';
       
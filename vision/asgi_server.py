@@ -0,0 +1,270 @@
+"""
+Vision Monitor Server (ASGI)
+Same routes as vision_server.py, served from an event loop instead of a thread per request.
+
+Stream clients are coroutines fed by one capture/encode thread per session and
+stream profile, and /status reads the snapshot the analysis loop publishes, so dozens
+of open streams cost little more memory than one.
+
+Run with:  python asgi_server.py   (or: uvicorn asgi_server:app --port 8080)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import vision_server as core
+from attention_monitor.eventlog import format_sse
+from attention_monitor.logging_utils import configure_logging
+from attention_monitor.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY
+from attention_monitor.profiler import install_profile_signal
+from attention_monitor.streaming import FrameFeed, StreamProfile
+
+# session id -> (session, FrameFeed), created with the session's first stream client
+feeds = {}
+
+
+def session_feed(session):
+    """Return the feed for a session, replacing it if the session was recreated on another camera."""
+    owner, feed = feeds.get(session.session_id, (None, None))
+    if owner is not session:
+        feed = FrameFeed(session.encoded_frames)
+        feeds[session.session_id] = (session, feed)
+    return feed
+
+
+def lookup_session(request):
+    """Return (session, error response) for the session in the path, or the default session."""
+    session_id = request.path_params.get('session_id', core.DEFAULT_SESSION_ID)
+    session = core.get_session(session_id, create=session_id == core.DEFAULT_SESSION_ID)
+    if session is None:
+        return None, JSONResponse({"success": False, "error": f"Unknown session: {session_id}"}, status_code=404)
+    return session, None
+
+
+def stream_profile(request):
+    """Parse width/height/quality/fps query parameters; returns (profile, error response)."""
+    try:
+        return StreamProfile.from_query(request.query_params, core.FRAME_WIDTH, core.FRAME_HEIGHT), None
+    except ValueError as e:
+        return None, JSONResponse({"success": False, "error": str(e)}, status_code=400)
+
+
+async def video_feed(request):
+    """Video streaming route; accepts the same query parameters as the Flask server."""
+    session, error = lookup_session(request)
+    if error:
+        return error
+    profile, error = stream_profile(request)
+    if error:
+        return error
+    return StreamingResponse(session_feed(session).frames(profile),
+                             media_type='multipart/x-mixed-replace; boundary=frame')
+
+
+async def snapshot(request):
+    """Latest frame as a single JPEG; a cache miss reads the camera on a worker thread."""
+    session, error = lookup_session(request)
+    if error:
+        return error
+    profile, error = stream_profile(request)
+    if error:
+        return error
+    frame_bytes, error = await run_in_threadpool(session.snapshot_jpeg, profile)
+    if error:
+        return JSONResponse({"success": False, "error": error}, status_code=503)
+    return Response(frame_bytes, media_type='image/jpeg', headers={"Cache-Control": "no-store"})
+
+
+async def status(request):
+    """Get current status and countdown from the published snapshot."""
+    session, error = lookup_session(request)
+    if error:
+        return error
+    return JSONResponse(session.snapshot.to_json(time.time()))
+
+
+async def list_sessions(request):
+    """List known sessions with their camera and current status."""
+    return JSONResponse(core.sessions_payload())
+
+
+async def health(request):
+    """Liveness check that never touches the camera or the model."""
+    return JSONResponse(core.health_payload())
+
+
+async def events(request):
+    """Attention history, a page at a time: /events?start=<ISO time>&limit=100, then ?since=<next_cursor>."""
+    query, error = core.events_query(request.query_params)
+    if error:
+        return JSONResponse({"success": False, "error": error}, status_code=400)
+    log = await run_in_threadpool(core.event_log_resource.get)
+    page = await run_in_threadpool(lambda: log.read(**query))
+    page.rollups = await run_in_threadpool(core.events_rollups, query)
+    return Response(page.to_json(), media_type='application/json')
+
+
+async def history(request):
+    """Attention per minute or hour over any range, from raw events and the rollup tiers alike."""
+    payload, code = await run_in_threadpool(core.history_payload, request.query_params)
+    return JSONResponse(payload, status_code=code)
+
+
+async def events_tail(request):
+    """New events as server-sent events; each carries its cursor as the id, so reconnecting resumes after it."""
+    query, error = core.events_query(request.query_params, request.headers.get('last-event-id'))
+    if error:
+        return JSONResponse({"success": False, "error": error}, status_code=400)
+    log = await run_in_threadpool(core.event_log_resource.get)
+    return StreamingResponse(tail_events(log, query), media_type='text/event-stream',
+                             headers={"Cache-Control": "no-store"})
+
+
+async def tail_events(log, query, poll_interval=0.25):
+    """Like core.tail_events, but polls the log's end instead of parking a thread per client in wait()."""
+    if query["cursor"] is None and query["start_ns"] is None:
+        query = dict(query, cursor=log.end)
+    yield b"retry: 2000\n\n"
+    idle = 0.0
+    while not log.closed:
+        page = await run_in_threadpool(lambda: log.read(**query))
+        if page.lines:
+            yield format_sse(page)
+        query = dict(query, cursor=page.next_cursor, start_ns=None)
+        if page.more:
+            continue
+        while log.end <= page.next_cursor and not log.closed:
+            await asyncio.sleep(poll_interval)
+            idle += poll_interval
+            if idle >= core.EVENTS_TAIL_HEARTBEAT:
+                idle = 0.0
+                yield b": keep-alive\n\n"
+
+
+async def metrics(request):
+    """Expose latency histograms and counters in Prometheus text format."""
+    return Response(REGISTRY.render(), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
+
+
+async def profile(request):
+    """Sample the analysis workers for N seconds and write a collapsed-stack or speedscope file."""
+    try:
+        seconds = float(request.query_params.get('seconds', 10.0))
+    except ValueError:
+        seconds = 10.0
+    payload, code = core.start_profile(seconds, request.query_params.get('format', 'collapsed'))
+    return JSONResponse(payload, status_code=code)
+
+
+async def cancel_alert(request):
+    """Cancel the pending alert."""
+    session, error = lookup_session(request)
+    if error:
+        return error
+    session.cancel_alert()
+    return JSONResponse({"success": True})
+
+
+async def request_json(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    return data if isinstance(data, dict) else None
+
+
+async def update_task(request):
+    """Update the current task for personalized messages."""
+    session, error = lookup_session(request)
+    if error:
+        return error
+    return JSONResponse(session.set_task(await request_json(request)))
+
+
+async def start_session(request):
+    """Start a vision monitoring session; JSON {"camera": index or URL} picks the camera."""
+    session_id = request.path_params.get('session_id', core.DEFAULT_SESSION_ID)
+    data = await request_json(request) or {}
+    _, error = await run_in_threadpool(
+        core.begin_session, session_id, data.get('camera', request.query_params.get('camera')))
+    if error:
+        return JSONResponse({"success": False, "error": error}, status_code=409)
+    return JSONResponse({"success": True, "message": "Session started", "session_id": session_id})
+
+
+async def stop_session(request):
+    """Stop the vision monitoring session."""
+    session, error = lookup_session(request)
+    if error:
+        return error
+    session.stop()
+    return JSONResponse({"success": True, "message": "Session stopped", "session_id": session.session_id})
+
+
+def on_startup():
+    if core.WARM_MODE:
+        core.logger.info("Warm mode: preloading the face model",
+                         extra={"camera_idle_grace_s": core.CAMERA_IDLE_GRACE_SECONDS})
+        core.analyzer_resource.start()
+    core.start_history_compaction()
+
+
+def on_shutdown():
+    core.stop_camera()
+    core.history_resource.close()
+
+
+app = Starlette(
+    routes=[
+        Route('/video_feed', video_feed),
+        Route('/snapshot', snapshot),
+        Route('/status', status),
+        Route('/health', health),
+        Route('/metrics', metrics),
+        Route('/events', events),
+        Route('/events/tail', events_tail),
+        Route('/history', history),
+        Route('/profile', profile, methods=['POST']),
+        Route('/cancel_alert', cancel_alert, methods=['POST']),
+        Route('/update_task', update_task, methods=['POST']),
+        Route('/start_session', start_session, methods=['POST']),
+        Route('/stop_session', stop_session, methods=['POST']),
+        Route('/sessions', list_sessions),
+        Route('/sessions/{session_id}/video_feed', video_feed),
+        Route('/sessions/{session_id}/snapshot', snapshot),
+        Route('/sessions/{session_id}/status', status),
+        Route('/sessions/{session_id}/cancel_alert', cancel_alert, methods=['POST']),
+        Route('/sessions/{session_id}/update_task', update_task, methods=['POST']),
+        Route('/sessions/{session_id}/start', start_session, methods=['POST']),
+        Route('/sessions/{session_id}/stop', stop_session, methods=['POST']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    on_startup=[on_startup],
+    on_shutdown=[on_shutdown],
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    configure_logging()
+    core.print_config_debug()
+    core.logger.info("Starting Vision Monitor Server (ASGI); camera feed at http://localhost:8080/video_feed")
+
+    if install_profile_signal(core.profiler, core.analysis_thread_idents, Path(core.PROFILE_OUTPUT_DIR),
+                              duration=float(os.getenv("PROFILE_SECONDS", "10"))):
+        core.logger.info("Send SIGUSR1 (kill -USR1 %d) to profile the analysis workers", os.getpid())
+    
+    uvicorn.run(app, host='0.0.0.0', port=int(os.getenv("VISION_PORT", "8080")), log_level="warning")
@@ -1,6 +1,19 @@
 """Attention monitoring package for focus detection demo."""
 
+from typing import TYPE_CHECKING
+
 from .configuration import PipelineConfig
-from .pipeline import AttentionMonitorPipeline
 
-__all__ = ["PipelineConfig", "AttentionMonitorPipeline"]
\ No newline at end of file
+if TYPE_CHECKING:
+    from .pipeline import AttentionMonitorPipeline
+
+__all__ = ["PipelineConfig", "AttentionMonitorPipeline"]
+
+
+def __getattr__(name: str):
+    # The pipeline pulls in cv2 and mediapipe; defer that until it is first used.
+    if name == "AttentionMonitorPipeline":
+        from .pipeline import AttentionMonitorPipeline
+
+        return AttentionMonitorPipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-import os
 from dataclasses import dataclass
-from typing import Iterable, Optional, Tuple
+from typing import TYPE_CHECKING, Iterable, List, Mapping, Optional, Tuple, Union
 
 import cv2
-import mediapipe as mp
 import numpy as np
 
+from .backends import LandmarkBackend, create_backend
+from .buffers import FrameBufferPool
 from .configuration import PipelineConfig
+from .metrics import stage_timer
 
-# Hint MediaPipe to use Metal Performance Shaders when running on Apple Silicon.
-os.environ.setdefault("MEDIAPIPE_USE_MPS", "1")
+if TYPE_CHECKING:
+    from .landmarker import FaceLandmarkerAnalyzer
+    from .traces import LandmarkRecorder
 
 POSE_LANDMARK_INDEXES = {
     "nose_tip": 1,
@@ -25,6 +27,15 @@ POSE_LANDMARK_INDEXES = {
 LEFT_EYE_LANDMARKS = [33, 160, 158, 133, 153, 144]
 RIGHT_EYE_LANDMARKS = [362, 385, 387, 263, 373, 380]
 
+# The only landmarks pose and EAR read; backends return these rows, in this order.
+LANDMARK_SUBSET: List[int] = sorted(
+    set(POSE_LANDMARK_INDEXES.values()) | set(LEFT_EYE_LANDMARKS) | set(RIGHT_EYE_LANDMARKS)
+)
+_ROW = {index: row for row, index in enumerate(LANDMARK_SUBSET)}
+_POSE_ROWS = {name: _ROW[index] for name, index in POSE_LANDMARK_INDEXES.items()}
+_LEFT_EYE_ROWS = [_ROW[index] for index in LEFT_EYE_LANDMARKS]
+_RIGHT_EYE_ROWS = [_ROW[index] for index in RIGHT_EYE_LANDMARKS]
+
 
 @dataclass(slots=True)
 class FrameAnalysis:
@@ -41,42 +52,81 @@ class FrameAnalysis:
 
 
 class FrameAnalyzer:
-    """Runs MediaPipe FaceMesh on frames and extracts pose metrics."""
-
-    def __init__(self, config: PipelineConfig):
+    """Runs a landmark backend on frames and extracts pose metrics.
+
+    The backend (MediaPipe FaceMesh by default, see
+    :mod:`attention_monitor.backends`) is picked by ``config.inference_backend``
+    unless one is passed in. With a ``recorder`` (or
+    ``config.landmark_trace_path``) every frame's landmarks are also kept for a
+    trace archive, written on :meth:`close`; see :mod:`attention_monitor.traces`.
+    """
+
+    def __init__(
+        self,
+        config: PipelineConfig,
+        backend: Optional[LandmarkBackend] = None,
+        recorder: Optional[LandmarkRecorder] = None,
+    ):
         self._config = config
-        self._face_mesh = mp.solutions.face_mesh.FaceMesh(
-            static_image_mode=False,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-        )
+        self._backend = backend or create_backend(config, LANDMARK_SUBSET)
+        self._buffers = FrameBufferPool(config.frame_width, config.frame_height)
+        if recorder is None and config.landmark_trace_path is not None:
+            from .traces import LandmarkRecorder
+
+            recorder = LandmarkRecorder(config.landmark_trace_path)
+        self._recorder = recorder
+
+    @property
+    def backend(self) -> LandmarkBackend:
+        return self._backend
 
     def analyze(self, frame: np.ndarray) -> FrameAnalysis:
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self._face_mesh.process(rgb)
-        if not results.multi_face_landmarks:
+        with stage_timer("inference"):
+            rgb = self._buffers.to_rgb(frame)
+            landmarks = self._backend.landmarks(rgb)
+        if self._recorder is not None:
+            self._recorder.record(landmarks, frame.shape[:2])
+        if landmarks is None:
             return FrameAnalysis(face_present=False)
+        return analyze_landmarks(landmarks, frame.shape[:2])
 
-        mesh = results.multi_face_landmarks[0].landmark
-        landmarks = _landmarks_to_array(mesh, frame.shape[:2])
+    def warm_up(self) -> None:
+        """Run a dummy inference so the first real frame skips graph setup and stale tracking."""
 
-        yaw, pitch, roll = _estimate_pose(landmarks, frame.shape[:2])
-        ear_left = _eye_aspect_ratio(landmarks, LEFT_EYE_LANDMARKS)
-        ear_right = _eye_aspect_ratio(landmarks, RIGHT_EYE_LANDMARKS)
-
-        return FrameAnalysis(
-            face_present=True,
-            yaw=yaw,
-            pitch=pitch,
-            roll=roll,
-            ear_left=ear_left,
-            ear_right=ear_right,
-        )
+        self._backend.warm_up(self._config.frame_width, self._config.frame_height)
 
     def close(self) -> None:
-        self._face_mesh.close()
+        self._backend.close()
+        if self._recorder is not None and len(self._recorder):
+            self._recorder.save()
+
+
+def analyze_landmarks(landmarks: np.ndarray, image_shape: Tuple[int, int]) -> FrameAnalysis:
+    """Pose and EAR from a backend's :data:`LANDMARK_SUBSET` rows; everything after inference."""
+
+    with stage_timer("pose"):
+        yaw, pitch, roll = _estimate_pose(landmarks, image_shape, _POSE_ROWS)
+        ear_left = _eye_aspect_ratio(landmarks, _LEFT_EYE_ROWS)
+        ear_right = _eye_aspect_ratio(landmarks, _RIGHT_EYE_ROWS)
+
+    return FrameAnalysis(
+        face_present=True,
+        yaw=yaw,
+        pitch=pitch,
+        roll=roll,
+        ear_left=ear_left,
+        ear_right=ear_right,
+    )
+
+
+def create_analyzer(config: PipelineConfig) -> Union[FrameAnalyzer, "FaceLandmarkerAnalyzer"]:
+    """The analyzer for ``config.inference_backend``: FaceLandmarker, or FrameAnalyzer on a landmark backend."""
+
+    if config.inference_backend == "face_landmarker":
+        from .landmarker import FaceLandmarkerAnalyzer
+
+        return FaceLandmarkerAnalyzer(config)
+    return FrameAnalyzer(config)
 
 
 class AttentionClassifier:
@@ -103,34 +153,49 @@ class AttentionClassifier:
         return "attentive", closed_frames
 
 
-def get_frame(cap: cv2.VideoCapture, width: int, height: int) -> Optional[np.ndarray]:
-    """Capture and resize a frame; returns None if capture fails."""
+def get_frame(
+    cap: cv2.VideoCapture,
+    width: int,
+    height: int,
+    buffers: Optional[FrameBufferPool] = None,
+) -> Optional[np.ndarray]:
+    """Capture and resize a frame; returns None if capture fails.
 
+    With ``buffers`` the frame is read and resized into reused arrays (sized by
+    the pool), so it is only valid until the next call.
+    """
+
+    if buffers is not None:
+        return buffers.read(cap)
     ret, frame = cap.read()
     if not ret or frame is None:
         return None
+    if frame.shape[1] == width and frame.shape[0] == height:
+        return frame
     resized = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
     return resized
 
 
-def _landmarks_to_array(landmarks, image_shape: Tuple[int, int]) -> np.ndarray:
-    height, width = image_shape
-    coords = np.array([(lm.x * width, lm.y * height, lm.z * width) for lm in landmarks], dtype=np.float64)
-    return coords
-
+def _estimate_pose(
+    landmarks: np.ndarray,
+    image_shape: Tuple[int, int],
+    rows: Mapping[str, int] = POSE_LANDMARK_INDEXES,
+) -> Tuple[float, float, float]:
+    """Estimate head pose (yaw, pitch, roll) using solvePnP.
 
-def _estimate_pose(landmarks: np.ndarray, image_shape: Tuple[int, int]) -> Tuple[float, float, float]:
-    """Estimate head pose (yaw, pitch, roll) using solvePnP."""
+    ``rows`` says where each pose point sits in ``landmarks``: FaceMesh numbers
+    for a full mesh, :data:`LANDMARK_SUBSET` positions for a backend's output.
+    """
 
     try:
         points_2d = np.array(
             [
-                landmarks[POSE_LANDMARK_INDEXES["nose_tip"]][:2],
-                landmarks[POSE_LANDMARK_INDEXES["chin"]][:2],
-                landmarks[POSE_LANDMARK_INDEXES["left_eye_outer"]][:2],
-                landmarks[POSE_LANDMARK_INDEXES["right_eye_outer"]][:2],
-                landmarks[POSE_LANDMARK_INDEXES["mouth_left"]][:2],
-                landmarks[POSE_LANDMARK_INDEXES["mouth_right"]][:2],
+                landmarks[rows["nose_tip"]][:2],
+                landmarks[rows["chin"]][:2],
+                landmarks[rows["left_eye_outer"]][:2],
+                landmarks[rows["right_eye_outer"]][:2],
+                landmarks[rows["mouth_left"]][:2],
+                landmarks[rows["mouth_right"]][:2],
             ],
             dtype=np.float64,
         )
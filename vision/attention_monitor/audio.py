@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import platform
-from typing import Literal
+import time
+from typing import Callable, Dict, Literal, Tuple
 
 import numpy as np
 
@@ -13,28 +14,51 @@ except ImportError:  # pragma: no cover - runtime fallback if sound lib missing
 SoundType = Literal["alert", "distraction"]
 
 
+_TONES: Dict[str, Tuple[float, float]] = {
+    # sound type: (duration seconds, fundamental Hz)
+    "alert": (0.35, 880.0),
+    "distraction": (0.6, 523.0),
+}
+
+
 class SoundManager:
-    """Plays short tones for immediate and prolonged distraction alerts."""
+    """Plays short tones for immediate and prolonged distraction alerts.
+
+    Tone buffers are synthesized once at construction and playback is fire and
+    forget, so an alert never blocks the caller. A tone requested while the
+    same tone is still playing is merged into it rather than queued behind it.
+    """
 
-    def __init__(self, enabled: bool = True) -> None:
+    def __init__(self, enabled: bool = True, clock: Callable[[], float] = time.monotonic) -> None:
         self._enabled = enabled
         self._sample_rate = 44_100
         self._use_simpleaudio = sa is not None and platform.system() != "Darwin"
+        self._clock = clock
+        self._tones: Dict[str, np.ndarray] = {
+            sound_type: self._build_tone(duration, frequency) for sound_type, (duration, frequency) in _TONES.items()
+        }
+        self._playing_until: Dict[str, float] = {}
+
+    def play_sound(self, sound_type: SoundType) -> bool:
+        """Start ``sound_type`` without waiting for it; returns False if it was disabled or merged."""
 
-    def play_sound(self, sound_type: SoundType) -> None:
         if not self._enabled:
-            return
+            return False
+        now = self._clock()
+        if now < self._playing_until.get(sound_type, 0.0):
+            return False
+        self._playing_until[sound_type] = now + _TONES[sound_type][0]
+
         if not self._use_simpleaudio or sa is None:
             print("\a", end="", flush=True)
-            return
+            return True
 
         try:
-            tone = self._build_tone(sound_type)
-            play_obj = sa.play_buffer(tone, 1, 2, self._sample_rate)
-            play_obj.wait_done()
+            sa.play_buffer(self._tones[sound_type], 1, 2, self._sample_rate)
         except Exception:
             self._use_simpleaudio = False
             print("\a", end="", flush=True)
+        return True
 
     def play_state_alert(self, state: str) -> None:
         """Play a quick tone when the attention state changes to non-attentive."""
@@ -49,10 +73,9 @@ class SoundManager:
 
         self.play_sound("distraction")
 
-    def _build_tone(self, sound_type: SoundType) -> np.ndarray:
-        duration = 0.35 if sound_type == "alert" else 0.6
-        frequency = 880 if sound_type == "alert" else 523
-        t = np.linspace(0, duration, int(self._sample_rate * duration), False)
+    def _build_tone(self, duration: float, frequency: float) -> np.ndarray:
+        samples = int(self._sample_rate * duration)
+        t = np.linspace(0, duration, samples, False)
 
         # Blend two harmonics for a more distinct tone without external audio files.
         primary = np.sin(frequency * 2 * np.pi * t)
@@ -60,14 +83,13 @@ class SoundManager:
         wave = primary + secondary
         peak = np.max(np.abs(wave))
         if peak == 0:
-            return np.zeros(int(self._sample_rate * duration), dtype=np.int16)
+            return np.zeros(samples, dtype=np.int16)
 
-        audio = np.int16(wave / peak * 32_000)
-        return audio
+        return np.ascontiguousarray(wave / peak * 32_000, dtype=np.int16)
 
     @property
     def enabled(self) -> bool:
         return self._enabled
 
     def set_enabled(self, value: bool) -> None:
-        self._enabled = value
\ No newline at end of file
+        self._enabled = value
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .configuration import PipelineConfig
+
+BACKENDS = ("mediapipe", "onnx")
+
+
+class LandmarkBackend:
+    """Finds one face in an RGB frame and returns the landmarks the analyzer asks for.
+
+    ``indices`` are FaceMesh landmark numbers; :meth:`landmarks` returns one
+    row per index, in that order, as pixel ``(x, y, z)`` with ``z`` on the
+    same scale as ``x`` — or None when no face is found.
+    """
+
+    name = "backend"
+
+    def __init__(self, indices: Sequence[int]) -> None:
+        self.indices = list(indices)
+
+    def landmarks(self, rgb: np.ndarray) -> Optional[np.ndarray]:
+        raise NotImplementedError
+
+    def warm_up(self, width: int, height: int) -> None:
+        """Run one inference on a blank frame: builds the graph and drops any tracked face."""
+
+        self.landmarks(np.zeros((height, width, 3), dtype=np.uint8))
+
+    def close(self) -> None:
+        pass
+
+
+class MediaPipeBackend(LandmarkBackend):
+    """The legacy ``mp.solutions.face_mesh`` graph: detection plus tracked 478-point mesh."""
+
+    name = "mediapipe"
+
+    def __init__(self, indices: Sequence[int]) -> None:
+        super().__init__(indices)
+        # Hint MediaPipe to use Metal Performance Shaders when running on Apple Silicon.
+        os.environ.setdefault("MEDIAPIPE_USE_MPS", "1")
+        import mediapipe as mp
+
+        self._face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=False,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+        )
+
+    def landmarks(self, rgb: np.ndarray) -> Optional[np.ndarray]:
+        results = self._face_mesh.process(rgb)
+        if not results.multi_face_landmarks:
+            return None
+        return mesh_subset(results.multi_face_landmarks[0].landmark, self.indices, rgb.shape[:2])
+
+    def close(self) -> None:
+        self._face_mesh.close()
+
+
+class OnnxLandmarkBackend(LandmarkBackend):
+    """A MediaPipe-style face-landmark model (192x192 crop in, 468x3 mesh out) on ONNX Runtime.
+
+    The model sees a square crop around the face: the previous frame's mesh
+    while tracking, an OpenCV Haar detection otherwise. The model's face score
+    (its second output, a logit) below ``min_face_score`` drops the track so
+    the next frame detects again. Input layout (NHWC or NCHW) is read from the
+    model; pixels are scaled to ``[0, 1]``.
+
+    ``threads`` sets ONNX Runtime's intra-op pool (0 keeps its default of one
+    per physical core); inter-op parallelism is off, since the graph is a
+    single chain.
+    """
+
+    name = "onnx"
+    ROI_SCALE = 1.5
+
+    def __init__(
+        self,
+        indices: Sequence[int],
+        model_path: Path,
+        threads: int = 0,
+        min_face_score: float = 0.5,
+    ) -> None:
+        super().__init__(indices)
+        try:
+            import onnxruntime as ort
+        except ImportError as e:  # pragma: no cover - optional dependency
+            raise RuntimeError("The onnx inference backend needs onnxruntime (pip install onnxruntime)") from e
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._channels_first = model_input.shape[1] == 3
+        self._size = int(model_input.shape[2] if self._channels_first else model_input.shape[1])
+        self._output_names = [output.name for output in self._session.get_outputs()[:2]]
+        self._min_face_score = min_face_score
+        self._detector = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        self._roi: Optional[Tuple[float, float, float]] = None
+        self._crop = np.empty((self._size, self._size, 3), dtype=np.uint8)
+        self._tensor = np.empty(
+            (1, 3, self._size, self._size) if self._channels_first else (1, self._size, self._size, 3),
+            dtype=np.float32,
+        )
+
+    def landmarks(self, rgb: np.ndarray) -> Optional[np.ndarray]:
+        roi = self._roi or self._detect(rgb)
+        if roi is None:
+            return None
+
+        center_x, center_y, side = roi
+        scale = side / self._size
+        # Maps crop pixels back to frame pixels; warpAffine takes its inverse with WARP_INVERSE_MAP.
+        to_frame = np.array([[scale, 0.0, center_x - side / 2], [0.0, scale, center_y - side / 2]], dtype=np.float64)
+        cv2.warpAffine(
+            rgb, to_frame, (self._size, self._size), dst=self._crop,
+            flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_CONSTANT,
+        )
+        if self._channels_first:
+            np.multiply(self._crop.transpose(2, 0, 1)[None], 1 / 255.0, out=self._tensor, casting="unsafe")
+        else:
+            np.multiply(self._crop[None], 1 / 255.0, out=self._tensor, casting="unsafe")
+
+        outputs = self._session.run(self._output_names, {self._input_name: self._tensor})
+        mesh = outputs[0].reshape(-1, 3)
+        if len(outputs) > 1 and _sigmoid(float(outputs[1].ravel()[0])) < self._min_face_score:
+            self._roi = None
+            return None
+
+        mesh = mesh * scale
+        mesh[:, 0] += center_x - side / 2
+        mesh[:, 1] += center_y - side / 2
+        self._roi = _roi_around(mesh[:, :2], self.ROI_SCALE)
+        return mesh[self.indices].astype(np.float64)
+
+    def warm_up(self, width: int, height: int) -> None:
+        # A blank frame never yields a detection, so run the model directly to build its kernels.
+        self._session.run(self._output_names, {self._input_name: np.zeros_like(self._tensor)})
+        self._roi = None
+
+    def _detect(self, rgb: np.ndarray) -> Optional[Tuple[float, float, float]]:
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        faces = self._detector.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5, minSize=(48, 48))
+        if len(faces) == 0:
+            return None
+        x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+        return x + w / 2, y + h / 2, max(w, h) * self.ROI_SCALE
+
+
+def create_backend(config: PipelineConfig, indices: Sequence[int]) -> LandmarkBackend:
+    """Build the landmark backend named by ``config.inference_backend``."""
+
+    if config.inference_backend == "mediapipe":
+        return MediaPipeBackend(indices)
+    if config.inference_backend == "onnx":
+        if config.onnx_model_path is None:
+            raise ValueError("inference_backend='onnx' needs onnx_model_path (ONNX_MODEL_PATH)")
+        return OnnxLandmarkBackend(indices, config.onnx_model_path, config.inference_threads)
+    raise ValueError(
+        f"Unknown inference backend {config.inference_backend!r}; expected one of {BACKENDS} or 'face_landmarker'"
+    )
+
+
+def mesh_subset(mesh, indices: Sequence[int], image_shape: Tuple[int, int]) -> np.ndarray:
+    """Pixel coordinates of ``indices`` from a MediaPipe landmark list; only those points are converted."""
+
+    height, width = image_shape
+    points = [mesh[i] for i in indices]
+    return np.array([(lm.x * width, lm.y * height, lm.z * width) for lm in points], dtype=np.float64)
+
+
+def _roi_around(points: np.ndarray, scale: float) -> Tuple[float, float, float]:
+    low = points.min(axis=0)
+    high = points.max(axis=0)
+    center = (low + high) / 2
+    return float(center[0]), float(center[1]), float((high - low).max() * scale)
+
+
+def _sigmoid(value: float) -> float:
+    return 1.0 / (1.0 + np.exp(-value))
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+import cv2
+import numpy as np
+
+
+class FrameBufferPool:
+    """Preallocated arrays for the capture, resize and color-conversion steps of a tick.
+
+    Each step writes into the array it used last time, so a steady-state tick
+    allocates no image memory. Frames returned by :meth:`read` and
+    :meth:`to_rgb` are overwritten on the next call; copy them to keep them.
+    """
+
+    __slots__ = ("width", "height", "_capture", "_resized", "_rgb")
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self._capture: Optional[np.ndarray] = None
+        self._resized: Optional[np.ndarray] = None
+        self._rgb: Optional[np.ndarray] = None
+
+    def read(self, cap: Any) -> Optional[np.ndarray]:
+        """Read the next frame into the capture buffer, resizing only if the size differs."""
+
+        if self._capture is None:
+            ret, frame = cap.read()
+        else:
+            ret, frame = cap.read(self._capture)
+        if not ret or frame is None:
+            return None
+        self._capture = frame
+
+        if frame.shape[1] == self.width and frame.shape[0] == self.height:
+            return frame
+        self._resized = cv2.resize(frame, (self.width, self.height), dst=self._resized, interpolation=cv2.INTER_AREA)
+        return self._resized
+
+    def to_rgb(self, frame: np.ndarray) -> np.ndarray:
+        """Convert a BGR frame to RGB in the reused RGB buffer."""
+
+        if self._rgb is not None and self._rgb.shape != frame.shape:
+            self._rgb = None
+        self._rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Optional, Union
+
+from .metrics import BUS_EVENTS, QUEUE_DEPTH, stage_timer
+
+if TYPE_CHECKING:
+    from .handlers import AttentionHandler, AttentionUpdate
+
+logger = logging.getLogger(__name__)
+
+# Queued in place of an update to run ``reset()`` in order on the subscriber's thread.
+_RESET = object()
+
+
+class EventBus:
+    """Hands every published :class:`~attention_monitor.handlers.AttentionUpdate` to each subscriber.
+
+    Inline subscribers (``handler.inline``) run on the publishing thread, in
+    subscription order, before :meth:`publish` returns: escalation timers and
+    status publishers that need to see a frame before the next one is
+    processed. Every other subscriber gets its own thread and a queue of up
+    to ``queue_size`` updates, so a slow sink (a log on a busy disk) never
+    delays the frame loop or the other sinks; when its queue is full the
+    oldest update is dropped. A subscriber that raises is logged and counted
+    as ``failed``; the others still get the update.
+    """
+
+    def __init__(self, queue_size: int = 256) -> None:
+        self.queue_size = queue_size
+        self._subscribers: List[Union[AttentionHandler, _Subscriber]] = []
+        self._inline: List[AttentionHandler] = []
+        self._background: List[_Subscriber] = []
+
+    @property
+    def handlers(self) -> List[AttentionHandler]:
+        return [_handler_of(subscriber) for subscriber in self._subscribers]
+
+    def subscribe(self, handler: AttentionHandler, inline: Optional[bool] = None) -> None:
+        """Deliver to ``handler`` after the current subscribers; ``inline`` overrides ``handler.inline``."""
+
+        if handler.inline if inline is None else inline:
+            self._inline.append(handler)
+            self._subscribers.append(handler)
+            return
+        subscriber = _Subscriber(handler, self.queue_size)
+        self._background.append(subscriber)
+        self._subscribers.append(subscriber)
+
+    def publish(self, update: AttentionUpdate) -> None:
+        for subscriber in self._background:
+            subscriber.put(update)
+        for handler in self._inline:
+            # One failing handler must not keep the frame from the ones after it, or fail the caller's tick.
+            try:
+                _deliver(handler, update)
+            except Exception:
+                _report_failure(_name_of(handler), "delivery")
+
+    def reset(self) -> None:
+        """Reset every subscriber; background ones after the updates already queued for them."""
+
+        for subscriber in self._subscribers:
+            if isinstance(subscriber, _Subscriber):
+                subscriber.put(_RESET)
+                continue
+            try:
+                subscriber.reset()
+            except Exception:
+                _report_failure(_name_of(subscriber), "reset")
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Let background subscribers finish their queues, then close every subscriber."""
+
+        for subscriber in self._background:
+            subscriber.stop(timeout)
+        for subscriber in self._subscribers:
+            _handler_of(subscriber).close()
+
+
+class _Subscriber:
+    def __init__(self, handler: AttentionHandler, queue_size: int) -> None:
+        self.handler = handler
+        self.name = _name_of(handler)
+        self._queue: Deque[object] = deque()
+        self._queue_size = queue_size
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, item: object) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._queue) >= self._queue_size:
+                self._queue.popleft()
+                BUS_EVENTS.labels(self.name, "dropped").inc()
+            self._queue.append(item)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"bus-{self.name}", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def stop(self, timeout: float) -> None:
+        with self._cond:
+            self._closed = True
+            thread = self._thread
+            self._cond.notify()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        depth = QUEUE_DEPTH.labels(f"bus.{self.name}")
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                item = self._queue.popleft()
+                depth.set(len(self._queue))
+            if item is _RESET:
+                # Caught like a delivery: an exception here would end the thread and leave the queue undrained.
+                try:
+                    self.handler.reset()
+                except Exception:
+                    _report_failure(self.name, "reset")
+                continue
+            try:
+                _deliver(self.handler, item)  # type: ignore[arg-type]
+            except Exception:
+                _report_failure(self.name, "delivery")
+                continue
+            BUS_EVENTS.labels(self.name, "delivered").inc()
+
+
+def _name_of(handler: AttentionHandler) -> str:
+    return handler.stage or type(handler).__name__
+
+
+def _report_failure(name: str, action: str) -> None:
+    """Count and log the exception being handled; call from an ``except`` block."""
+
+    BUS_EVENTS.labels(name, "failed").inc()
+    logger.exception("%s subscriber %s failed", name, action)
+
+
+def _deliver(handler: AttentionHandler, update: AttentionUpdate) -> None:
+    if handler.stage is None:
+        handler.handle(update)
+        return
+    with stage_timer(handler.stage):
+        handler.handle(update)
+
+
+def _handler_of(subscriber: Union[AttentionHandler, _Subscriber]) -> AttentionHandler:
+    return subscriber.handler if isinstance(subscriber, _Subscriber) else subscriber
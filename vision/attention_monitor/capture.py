@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import FRAME_AGE
+
+
+def configure_low_latency(cap: Any) -> None:
+    """Ask for compressed MJPG frames and a one-frame driver queue.
+
+    Both are hints: backends that do not support a property (V4L2 honours both,
+    most others ignore the buffer size) simply return False from ``set``.
+    """
+
+    import cv2
+
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+
+class _ReadRequest:
+    __slots__ = ("image", "ok", "frame", "done")
+
+    def __init__(self, image: Optional[np.ndarray]) -> None:
+        self.image = image
+        self.ok = False
+        self.frame: Optional[np.ndarray] = None
+        self.done = threading.Event()
+
+
+class FrameGrabber:
+    """Drains a capture device on a background thread so reads return the freshest frame.
+
+    The thread calls ``grab()``, which dequeues a frame without decoding it, and
+    decodes with ``retrieve()`` only when a consumer has asked for a frame. The
+    driver queue never backs up, so a frame's age is bounded by one camera
+    interval instead of the buffer depth, and frames nobody reads are never
+    decoded.
+
+    All device calls happen on the grabber thread (``cv2.VideoCapture`` is not
+    thread-safe); ``read()`` hands its request to that thread and waits, and
+    withdraws it if ``read_timeout`` passes first. The
+    object mirrors the parts of ``cv2.VideoCapture`` the pipeline uses.
+
+    While reads keep arriving (within ``decode_ahead`` seconds of each other)
+    every grabbed frame is decoded straight away, so a consumer woken by
+    :meth:`wait_for_frame` copies that frame instead of waiting a full camera
+    interval for the next one.
+    """
+
+    thread_safe = True
+
+    def __init__(self, cap: Any, read_timeout: float = 2.0, decode_ahead: float = 0.5) -> None:
+        self._cap = cap
+        self._read_timeout = read_timeout
+        self._decode_ahead = decode_ahead
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._requests: List[_ReadRequest] = []
+        self._seq = 0
+        self._grabbed_at: Optional[float] = None
+        self._demand_until = 0.0
+        self._decoded: Optional[np.ndarray] = None
+        self._decoded_seq = -1
+        self._spare: Optional[np.ndarray] = None
+        self._running = cap.isOpened()
+        self.last_frame_age: Optional[float] = None
+        self._thread = threading.Thread(target=self._drain, name="frame-grabber", daemon=True)
+        if self._running:
+            self._thread.start()
+
+    def isOpened(self) -> bool:
+        return self._running
+
+    @property
+    def seq(self) -> int:
+        """Number of frames grabbed so far; changes whenever a new frame is available."""
+
+        return self._seq
+
+    def wait_for_frame(self, last_seq: int, timeout: float = 1.0) -> int:
+        """Block until a frame newer than ``last_seq`` is grabbed; returns the current sequence."""
+
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self._seq != last_seq or not self._running, timeout)
+            return self._seq
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Decode the most recently grabbed frame, into ``image`` when its shape matches."""
+
+        with self._lock:
+            if not self._running:
+                return False, None
+            self._demand_until = time.monotonic() + self._decode_ahead
+            if self._decoded is not None and self._decoded_seq == self._seq:
+                self._observe_age()
+                return True, _copy_into(image, self._decoded)
+            request = _ReadRequest(image)
+            self._requests.append(request)
+        if not request.done.wait(self._read_timeout):
+            with self._lock:
+                if not request.done.is_set():
+                    # Withdrawn so the grabber thread never writes into ``image`` after we return.
+                    if request in self._requests:
+                        self._requests.remove(request)
+                    return False, None
+        return request.ok, request.frame
+
+    def set(self, prop: int, value: float) -> bool:
+        return self._cap.set(prop, value)
+
+    def get(self, prop: int) -> float:
+        return self._cap.get(prop)
+
+    def release(self) -> None:
+        with self._new_frame:
+            self._running = False
+            self._new_frame.notify_all()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._cap.release()
+        self._fail_pending()
+
+    def _drain(self) -> None:
+        while self._running:
+            if self._grabbed_at is not None:
+                self._serve_requests()
+            # grab() blocks until the device delivers the next frame.
+            ok = self._cap.grab()
+            decoded = None
+            if ok and time.monotonic() < self._demand_until:
+                ok, decoded = self._cap.retrieve(self._spare) if self._spare is not None else self._cap.retrieve()
+            with self._new_frame:
+                if not ok:
+                    self._running = False
+                else:
+                    self._grabbed_at = time.monotonic()
+                    self._seq += 1
+                    if decoded is not None:
+                        # Double-buffered: readers copy from _decoded under the lock.
+                        self._spare, self._decoded = self._decoded, decoded
+                        self._decoded_seq = self._seq
+                self._new_frame.notify_all()
+        self._fail_pending()
+
+    def _serve_requests(self) -> None:
+        with self._lock:
+            if not self._requests:
+                return
+        ok, decoded = self._cap.retrieve(self._spare) if self._spare is not None else self._cap.retrieve()
+        with self._lock:
+            # Taken only now, so requests that arrived during the decode get this frame too.
+            requests, self._requests = self._requests, []
+            if ok and decoded is not None:
+                self._spare, self._decoded = self._decoded, decoded
+                self._decoded_seq = self._seq
+            self._observe_age()
+            # Copied into callers' buffers under the lock, which read() takes before giving up on a request.
+            for request in requests:
+                request.ok = ok and decoded is not None
+                if request.ok:
+                    request.frame = _copy_into(request.image, decoded)
+                request.done.set()
+
+    def _observe_age(self) -> None:
+        age = time.monotonic() - (self._grabbed_at or 0.0)
+        self.last_frame_age = age
+        FRAME_AGE.observe(age)
+
+    def _fail_pending(self) -> None:
+        with self._lock:
+            requests, self._requests = self._requests, []
+        for request in requests:
+            request.done.set()
+
+
+def _copy_into(image: Optional[np.ndarray], frame: np.ndarray) -> np.ndarray:
+    if image is not None and image.shape == frame.shape:
+        np.copyto(image, frame)
+        return image
+    return frame.copy()
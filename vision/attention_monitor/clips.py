@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+from .metrics import CLIPS
+
+logger = logging.getLogger(__name__)
+
+Frame = Tuple[float, bytes]
+
+
+@dataclass(slots=True)
+class _Incident:
+    reasons: List[str]
+    started_at: float
+    until: float
+    frames: List[Frame] = field(default_factory=list)
+
+
+class ClipRecorder:
+    """Keeps the last few seconds of already-encoded frames and saves them around incidents.
+
+    The steady-state cost is a deque append of JPEG bytes the caller already
+    has; memory is bounded by ``max_bytes``. :meth:`trigger` marks an incident,
+    frames keep arriving for ``post_seconds``, and the clip (``pre_seconds``
+    before the first trigger through the end of the post window) is handed to
+    ``writer`` so disk I/O never runs on the caller's thread. Triggers that
+    land inside a pending incident extend it, up to ``max_clip_seconds``,
+    instead of starting a new clip.
+
+    A clip is a ``.mjpeg`` file (concatenated JPEGs, playable by ffmpeg/VLC)
+    plus a ``.json`` sidecar with the reasons and per-frame timestamps.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        output_dir: Path,
+        writer: Executor,
+        pre_seconds: float = 10.0,
+        post_seconds: float = 5.0,
+        max_bytes: int = 4 * 1024 * 1024,
+        max_clip_seconds: float = 60.0,
+    ) -> None:
+        self.name = name
+        self.output_dir = output_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_bytes = max_bytes
+        self.max_clip_seconds = max_clip_seconds
+        self._writer = writer
+        self._lock = threading.Lock()
+        self._frames: Deque[Frame] = deque()
+        self._bytes = 0
+        self._incident: Optional[_Incident] = None
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._bytes
+
+    def add(self, data: bytes, now: Optional[float] = None) -> None:
+        """Append one encoded frame; completes a pending incident whose post window has passed."""
+
+        now = time.time() if now is None else now
+        with self._lock:
+            self._frames.append((now, data))
+            self._bytes += len(data)
+            incident = self._incident
+            if incident is not None:
+                incident.frames.append((now, data))
+                if now >= incident.until:
+                    self._incident = None
+                    self._submit(incident)
+            self._trim(now)
+
+    def trigger(self, reason: str, now: Optional[float] = None) -> None:
+        """Record an incident; its clip is written once ``post_seconds`` of frames have arrived."""
+
+        now = time.time() if now is None else now
+        with self._lock:
+            incident = self._incident
+            if incident is not None:
+                if reason not in incident.reasons:
+                    incident.reasons.append(reason)
+                limit = incident.started_at + self.max_clip_seconds - self.pre_seconds
+                incident.until = min(max(incident.until, now + self.post_seconds), limit)
+                return
+            since = now - self.pre_seconds
+            self._incident = _Incident([reason], now, now + self.post_seconds,
+                                       [frame for frame in self._frames if frame[0] >= since])
+
+    def flush(self) -> None:
+        """Write a pending incident now with whatever post-event frames it has, e.g. on session stop."""
+
+        with self._lock:
+            incident, self._incident = self._incident, None
+            if incident is not None:
+                self._submit(incident)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    def _trim(self, now: float) -> None:
+        # The pending incident holds its own frame list, so the ring only needs the pre-event window.
+        since = now - self.pre_seconds
+        frames = self._frames
+        while frames and (frames[0][0] < since or self._bytes > self.max_bytes):
+            _, data = frames.popleft()
+            self._bytes -= len(data)
+
+    def _submit(self, incident: _Incident) -> None:
+        if not incident.frames:
+            CLIPS.labels("empty").inc()
+            return
+        self._writer.submit(_write_clip, self.output_dir, self.name, incident)
+
+
+def _write_clip(output_dir: Path, name: str, incident: _Incident) -> Optional[Path]:
+    stamp = datetime.fromtimestamp(incident.started_at).strftime("%Y%m%d-%H%M%S")
+    slug = re.sub(r"[^A-Za-z0-9_.+-]+", "_", f"{name}-{stamp}-{'+'.join(incident.reasons)}")
+    clip_path = output_dir / f"{slug}.mjpeg"
+    offsets = []
+    try:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with clip_path.open("wb") as clip:
+            for timestamp, data in incident.frames:
+                offsets.append({"t": round(timestamp, 3), "offset": clip.tell(), "size": len(data)})
+                clip.write(data)
+        metadata = {
+            "name": name,
+            "reasons": incident.reasons,
+            "incident_at": incident.started_at,
+            "frames": offsets,
+        }
+        clip_path.with_suffix(".json").write_text(json.dumps(metadata), encoding="utf-8")
+    except OSError as e:
+        CLIPS.labels("failed").inc()
+        logger.warning("Failed to write incident clip %s: %s", clip_path, e)
+        return None
+    CLIPS.labels("written").inc()
+    logger.info("Saved incident clip (%d frames): %s", len(offsets), clip_path)
+    return clip_path
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 
 @dataclass(slots=True)
@@ -16,11 +16,28 @@ class PipelineConfig:
     ear_threshold: float = 0.2
     yaw_threshold: float = 25.0
     pitch_threshold: float = 25.0
-    history_window: int = 10
-    distraction_threshold: int = 8
+    distraction_window_seconds: float = 30.0
+    distraction_fraction: float = 0.8
+    attention_windows: Tuple[float, ...] = (30.0, 300.0)
     event_log_path: Path = field(default_factory=lambda: Path("events.jsonl"))
+    # The log rotates to a new segment (with its own offset index) past this size, see attention_monitor.eventlog
+    event_log_segment_bytes: int = 64 * 1024 * 1024
     notification_api_key: Optional[str] = None
+    notification_heartbeat_seconds: float = 60.0
+    notification_min_interval_seconds: float = 5.0
     enable_sounds: bool = True
+    # Face-landmark backend: "mediapipe" or "onnx" (needs onnx_model_path), see attention_monitor.backends;
+    # or "face_landmarker" for the MediaPipe Tasks analyzer (needs face_landmarker_model_path)
+    inference_backend: str = "mediapipe"
+    onnx_model_path: Optional[Path] = None
+    # ONNX Runtime intra-op threads; 0 uses its default
+    inference_threads: int = 0
+    face_landmarker_model_path: Optional[Path] = None
+    # face_landmarker only: eye closure from eyeBlink blendshapes, "closed" at blink_threshold
+    use_blendshapes: bool = False
+    blink_threshold: float = 0.5
+    # Record every frame's landmarks to this .npz for inference-free replay (attention_monitor.traces)
+    landmark_trace_path: Optional[Path] = None
 
     def with_overrides(
         self,
@@ -32,11 +49,22 @@ class PipelineConfig:
         ear_threshold: Optional[float] = None,
         yaw_threshold: Optional[float] = None,
         pitch_threshold: Optional[float] = None,
-        history_window: Optional[int] = None,
-        distraction_threshold: Optional[int] = None,
+        distraction_window_seconds: Optional[float] = None,
+        distraction_fraction: Optional[float] = None,
+        attention_windows: Optional[Tuple[float, ...]] = None,
         event_log_path: Optional[Path] = None,
+        event_log_segment_bytes: Optional[int] = None,
         notification_api_key: Optional[str] = None,
+        notification_heartbeat_seconds: Optional[float] = None,
+        notification_min_interval_seconds: Optional[float] = None,
         enable_sounds: Optional[bool] = None,
+        inference_backend: Optional[str] = None,
+        onnx_model_path: Optional[Path] = None,
+        inference_threads: Optional[int] = None,
+        face_landmarker_model_path: Optional[Path] = None,
+        use_blendshapes: Optional[bool] = None,
+        blink_threshold: Optional[float] = None,
+        landmark_trace_path: Optional[Path] = None,
     ) -> "PipelineConfig":
         """Return a copy of the config with supplied overrides."""
 
@@ -48,9 +76,20 @@ class PipelineConfig:
             ear_threshold=ear_threshold if ear_threshold is not None else self.ear_threshold,
             yaw_threshold=yaw_threshold if yaw_threshold is not None else self.yaw_threshold,
             pitch_threshold=pitch_threshold if pitch_threshold is not None else self.pitch_threshold,
-            history_window=history_window if history_window is not None else self.history_window,
-            distraction_threshold=distraction_threshold if distraction_threshold is not None else self.distraction_threshold,
+            distraction_window_seconds=distraction_window_seconds if distraction_window_seconds is not None else self.distraction_window_seconds,
+            distraction_fraction=distraction_fraction if distraction_fraction is not None else self.distraction_fraction,
+            attention_windows=attention_windows if attention_windows is not None else self.attention_windows,
             event_log_path=event_log_path if event_log_path is not None else self.event_log_path,
+            event_log_segment_bytes=event_log_segment_bytes if event_log_segment_bytes is not None else self.event_log_segment_bytes,
             notification_api_key=notification_api_key if notification_api_key is not None else self.notification_api_key,
+            notification_heartbeat_seconds=notification_heartbeat_seconds if notification_heartbeat_seconds is not None else self.notification_heartbeat_seconds,
+            notification_min_interval_seconds=notification_min_interval_seconds if notification_min_interval_seconds is not None else self.notification_min_interval_seconds,
             enable_sounds=enable_sounds if enable_sounds is not None else self.enable_sounds,
+            inference_backend=inference_backend if inference_backend is not None else self.inference_backend,
+            onnx_model_path=onnx_model_path if onnx_model_path is not None else self.onnx_model_path,
+            inference_threads=inference_threads if inference_threads is not None else self.inference_threads,
+            face_landmarker_model_path=face_landmarker_model_path if face_landmarker_model_path is not None else self.face_landmarker_model_path,
+            use_blendshapes=use_blendshapes if use_blendshapes is not None else self.use_blendshapes,
+            blink_threshold=blink_threshold if blink_threshold is not None else self.blink_threshold,
+            landmark_trace_path=landmark_trace_path if landmark_trace_path is not None else self.landmark_trace_path,
         )
\ No newline at end of file
@@ -0,0 +1,485 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .events import AttentionEvent
+
+logger = logging.getLogger(__name__)
+
+# Sidecar index: a header with the segment's base offset, then (timestamp_ns, log offset) pairs.
+INDEX_MAGIC = b"EVTIDX1\0"
+_HEADER = struct.Struct("<8sq")
+_ENTRY = struct.Struct("<qq")
+
+MAX_PAGE = 1000
+
+
+@dataclass(slots=True)
+class EventPage:
+    """One page of log lines and the cursor to continue from."""
+
+    lines: List[str]
+    next_cursor: int
+    # More lines were already written past ``next_cursor``
+    more: bool
+    # The requested cursor pointed before the oldest kept record; the page starts at that record instead.
+    truncated: bool = False
+    # The cursor just past each line, for clients that resume mid-page
+    cursors: List[int] = field(default_factory=list)
+    # Summaries of the requested time before the oldest kept record (see attention_monitor.history)
+    rollups: Optional[List[Dict[str, object]]] = None
+
+    def to_json(self) -> str:
+        """The ``/events`` response body; log lines are spliced in as-is rather than parsed and re-encoded."""
+
+        rollups = f', "rollups": {json.dumps(self.rollups)}' if self.rollups is not None else ""
+        return (
+            f'{{"events": [{", ".join(self.lines)}], "next_cursor": "{self.next_cursor}", '
+            f'"more": {json.dumps(self.more)}, "truncated": {json.dumps(self.truncated)}{rollups}}}'
+        )
+
+
+@dataclass(slots=True)
+class LogSegment:
+    """One file of the log: ``base`` is the log offset of its first byte."""
+
+    base: int
+    path: Path
+    size: int = 0
+    timestamps: array = field(default_factory=lambda: array("q"))
+    offsets: array = field(default_factory=lambda: array("q"))
+
+    @property
+    def end(self) -> int:
+        return self.base + self.size
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".idx")
+
+    @property
+    def first_timestamp(self) -> Optional[int]:
+        return self.timestamps[0] if self.timestamps else None
+
+
+class EventLog:
+    """An append-only JSONL event log in segments, with a sparse timestamp index per segment.
+
+    Records are addressed by their *log offset*: the byte position they would
+    have if every segment ever written were concatenated. Offsets never change,
+    so a cursor (the offset to read from next) stays valid when the active file
+    ``path`` is rotated to ``<stem>.<base offset><suffix>`` after
+    ``segment_bytes`` (or once its first record is ``segment_seconds`` old),
+    and after old segments are removed; a cursor that falls before the oldest
+    kept record resumes at that record.
+
+    Next to each segment, ``<segment>.idx`` holds a ``(timestamp_ns, offset)``
+    entry for the first record and then for a record every ``index_interval``
+    bytes, written as the log grows. A query by time binary-searches it and
+    reads at most ``index_interval`` bytes before the first matching record.
+    Indexes that are missing or behind their segment (a log from before this
+    format, or a crash) are rebuilt when the log is opened.
+
+    One process writes a given log; readers in that process use the same
+    instance, and :meth:`read` never returns a partly written line.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        segment_bytes: int = 64 << 20,
+        index_interval: int = 4096,
+        segment_seconds: Optional[float] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.index_interval = index_interval
+        self._cond = threading.Condition()
+        self._closed = False
+        self._file: Optional[IO[bytes]] = None
+        self._index_file: Optional[IO[bytes]] = None
+        self._segments: List[LogSegment] = self._load()
+
+    @property
+    def start(self) -> int:
+        """Offset of the oldest kept record."""
+
+        with self._cond:
+            return self._segments[0].base
+
+    @property
+    def end(self) -> int:
+        """Offset just past the newest record: the cursor that waits for the next one."""
+
+        with self._cond:
+            return self._segments[-1].end
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def segments(self) -> List[LogSegment]:
+        """Every segment, oldest first; the last is the active file."""
+
+        with self._cond:
+            return list(self._segments)
+
+    def append(self, event: AttentionEvent) -> int:
+        return self.append_line(event.to_json(), event.timestamp_ns)
+
+    def append_line(self, line: str, timestamp_ns: int) -> int:
+        """Append one JSON line (no newline) written at ``timestamp_ns``; returns its offset."""
+
+        data = line.encode("utf-8") + b"\n"
+        with self._cond:
+            if self._closed:
+                raise ValueError("event log is closed")
+            segment = self._segments[-1]
+            if segment.size and (
+                segment.size + len(data) > self.segment_bytes
+                or self.segment_seconds is not None
+                and timestamp_ns - segment.timestamps[0] > self.segment_seconds * 1e9
+            ):
+                segment = self._rotate()
+            if self._file is None:
+                self._file = segment.path.open("ab")
+            offset = segment.end
+            self._file.write(data)
+            # Flushed per line so another handle (and read()) sees whole records as soon as append returns.
+            self._file.flush()
+            segment.size += len(data)
+            if not segment.offsets or offset - segment.offsets[-1] >= self.index_interval:
+                self._add_entry(segment, timestamp_ns, offset)
+            self._cond.notify_all()
+        return offset
+
+    def read(
+        self,
+        cursor: Optional[int] = None,
+        start_ns: Optional[int] = None,
+        limit: int = 100,
+        session: Optional[str] = None,
+        max_scan_bytes: int = 4 << 20,
+    ) -> EventPage:
+        """Up to ``limit`` records from ``cursor``, or else from the first record at or after ``start_ns``.
+
+        With neither, reading starts at the oldest record. ``session`` keeps
+        only that session's records; at most ``max_scan_bytes`` are read per
+        call, so a sparse filter returns a short page with ``more`` set.
+        """
+
+        limit = max(1, min(limit, MAX_PAGE))
+        with self._cond:
+            segments = self._segments
+            end = segments[-1].end
+            truncated = False
+            if cursor is not None:
+                position = min(max(cursor, 0), end)
+                if position < segments[0].base:
+                    position, truncated = segments[0].base, True
+            elif start_ns is not None:
+                position = self._offset_before(start_ns)
+            else:
+                position = segments[0].base
+
+            # Lines without the session's key as AttentionEvent.to_json() writes it are skipped unparsed.
+            needle = f'"session": {json.dumps(session)}'.encode("utf-8") if session is not None else b""
+            lines: List[str] = []
+            cursors: List[int] = []
+            scanned = 0
+            for offset, raw in self._lines(position, end):
+                if start_ns is not None and cursor is None and not lines and _timestamp_ns(raw) < start_ns:
+                    position = offset + len(raw)
+                    continue
+                if session is not None and (needle not in raw or _session_of(raw) != session):
+                    position = offset + len(raw)
+                    scanned += len(raw)
+                    if scanned >= max_scan_bytes:
+                        break
+                    continue
+                lines.append(raw.decode("utf-8").rstrip("\n"))
+                position = offset + len(raw)
+                cursors.append(position)
+                scanned += len(raw)
+                if len(lines) >= limit or scanned >= max_scan_bytes:
+                    break
+            return EventPage(lines, position, position < end, truncated, cursors)
+
+    def wait(self, cursor: int, timeout: Optional[float] = None) -> bool:
+        """Block until a record past ``cursor`` is written (True) or ``timeout`` passes (False)."""
+
+        with self._cond:
+            return self._cond.wait_for(lambda: self._closed or self._segments[-1].end > cursor, timeout) and (
+                self._segments[-1].end > cursor
+            )
+
+    def offset_before(self, start_ns: int) -> int:
+        """An offset at or before the first record at or after ``start_ns``, from the index alone."""
+
+        with self._cond:
+            return self._offset_before(start_ns)
+
+    def last_timestamp(self, segment: LogSegment) -> Optional[int]:
+        """Time of the segment's newest record, read from its last indexed stretch; None if it is empty."""
+
+        with self._cond:
+            if not segment.offsets:
+                return None
+            last = None
+            for _, raw in self._lines(segment.offsets[-1], segment.end):
+                last = raw
+            return _timestamp_ns(last) if last is not None else None
+
+    def rotate(self) -> None:
+        """Start a new segment now, so the current one can be rolled up or removed; no-op when it is empty."""
+
+        with self._cond:
+            if self._segments[-1].size:
+                self._rotate()
+
+    def remove_segment(self, segment: LogSegment) -> None:
+        """Delete a rotated segment and its index; the active segment is never removed."""
+
+        with self._cond:
+            if segment is self._segments[-1] or segment not in self._segments:
+                raise ValueError(f"{segment.path} is not a rotated segment of this log")
+            self._segments.remove(segment)
+            for path in (segment.path, segment.index_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for handle in (self._file, self._index_file):
+                if handle is not None:
+                    handle.close()
+            self._file = self._index_file = None
+            self._cond.notify_all()
+
+    # -- reading
+
+    def _lines(self, position: int, end: int) -> Iterator[Tuple[int, bytes]]:
+        """``(offset, raw line)`` from ``position`` up to ``end``, across segments."""
+
+        bases = [segment.base for segment in self._segments]
+        index = max(bisect_right(bases, position) - 1, 0)
+        for segment in self._segments[index:]:
+            if segment.base >= end:
+                return
+            if segment.end <= position:
+                continue
+            stop = min(segment.end, end)
+            with segment.path.open("rb") as handle:
+                offset = max(position, segment.base)
+                handle.seek(max(offset - segment.base - 1, 0))
+                # A cursor not made by read() may point into a record; start at the next one.
+                if offset > segment.base and handle.read(1) != b"\n":
+                    offset += len(handle.readline())
+                while offset < stop:
+                    raw = handle.readline()
+                    if not raw.endswith(b"\n"):
+                        return
+                    yield offset, raw
+                    offset += len(raw)
+            position = stop
+
+    def _offset_before(self, start_ns: int) -> int:
+        """An offset at or before the first record at or after ``start_ns`` (records are roughly time-ordered)."""
+
+        segments = [segment for segment in self._segments if segment.timestamps]
+        if not segments:
+            return self._segments[0].base
+        firsts = [segment.first_timestamp for segment in segments]
+        segment = segments[max(bisect_right(firsts, start_ns) - 1, 0)]
+        # The last indexed record before start_ns; the wanted one is within index_interval bytes after it.
+        entry = bisect_right(segment.timestamps, start_ns - 1) - 1
+        return segment.offsets[entry] if entry >= 0 else segment.base
+
+    # -- writing
+
+    def _add_entry(self, segment: LogSegment, timestamp_ns: int, offset: int) -> None:
+        segment.timestamps.append(timestamp_ns)
+        segment.offsets.append(offset)
+        if self._index_file is None:
+            self._index_file = segment.index_path.open("ab")
+        self._index_file.write(_ENTRY.pack(timestamp_ns, offset))
+        self._index_file.flush()
+
+    def _rotate(self) -> LogSegment:
+        current = self._segments[-1]
+        for handle in (self._file, self._index_file):
+            if handle is not None:
+                handle.close()
+        self._file = self._index_file = None
+        rotated = self.path.with_name(f"{self.path.stem}.{current.base:016d}{self.path.suffix}")
+        os.replace(current.index_path, rotated.with_name(rotated.name + ".idx"))
+        os.replace(current.path, rotated)
+        current.path = rotated
+        active = LogSegment(current.end, self.path)
+        # Created now, not on the next append, so readers and a reopened log find it even if nothing follows.
+        self.path.touch()
+        _write_index(active)
+        self._segments.append(active)
+        logger.info("Rotated event log", extra={"segment": rotated.name, "bytes": current.size})
+        return active
+
+    # -- opening
+
+    def _load(self) -> List[LogSegment]:
+        segments: List[LogSegment] = []
+        for candidate in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"):
+            base = candidate.name[len(self.path.stem) + 1 : len(candidate.name) - len(self.path.suffix)]
+            if base.isdigit():
+                segments.append(LogSegment(int(base), candidate))
+        segments.sort(key=lambda segment: segment.base)
+
+        base = segments[-1].base + segments[-1].path.stat().st_size if segments else 0
+        header = _read_header(self.path.with_name(self.path.name + ".idx"))
+        if header is not None and self.path.exists():
+            base = header
+        segments.append(LogSegment(base, self.path))
+        for segment in segments:
+            _load_segment(segment, self.index_interval)
+        return segments
+
+
+def _load_segment(segment: LogSegment, index_interval: int) -> None:
+    path = segment.path
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    size = path.stat().st_size
+    if size:
+        with path.open("rb+") as handle:
+            # A line cut short by a crash would run into the next record; drop it.
+            handle.seek(max(size - 1, 0))
+            if handle.read(1) != b"\n":
+                handle.seek(0)
+                kept = handle.read().rfind(b"\n") + 1
+                handle.truncate(kept)
+                logger.warning("Dropped a partial event log line", extra={"segment": path.name, "bytes": size - kept})
+                size = kept
+    segment.size = size
+
+    entries = _read_entries(segment)
+    valid = entries is not None and all(segment.base <= offset < segment.end for _, offset in entries)
+    if not valid:
+        entries = []
+        _write_index(segment)
+    resume = entries[-1][1] if entries else segment.base
+    new_entries = []
+    with path.open("rb") as handle:
+        handle.seek(resume - segment.base)
+        offset = resume
+        last = entries[-1][1] if entries else None
+        for raw in handle:
+            if last is None or offset - last >= index_interval:
+                new_entries.append((_timestamp_ns(raw), offset))
+                last = offset
+            offset += len(raw)
+    if new_entries:
+        with segment.index_path.open("ab") as index:
+            for entry in new_entries:
+                index.write(_ENTRY.pack(*entry))
+    for timestamp, offset in entries + new_entries:
+        segment.timestamps.append(timestamp)
+        segment.offsets.append(offset)
+
+
+def _read_header(path: Path) -> Optional[int]:
+    try:
+        with path.open("rb") as handle:
+            magic, base = _HEADER.unpack(handle.read(_HEADER.size))
+    except (FileNotFoundError, struct.error):
+        return None
+    return base if magic == INDEX_MAGIC else None
+
+
+def _read_entries(segment: LogSegment) -> Optional[List[Tuple[int, int]]]:
+    try:
+        data = segment.index_path.read_bytes()
+    except FileNotFoundError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, base = _HEADER.unpack_from(data)
+    if magic != INDEX_MAGIC or base != segment.base:
+        return None
+    body = data[_HEADER.size : len(data) - (len(data) - _HEADER.size) % _ENTRY.size]
+    return list(_ENTRY.iter_unpack(body))
+
+
+def _write_index(segment: LogSegment) -> None:
+    with segment.index_path.open("wb") as handle:
+        handle.write(_HEADER.pack(INDEX_MAGIC, segment.base))
+
+
+def _timestamp_ns(raw: bytes) -> int:
+    try:
+        return parse_timestamp_ns(json.loads(raw)["timestamp"])
+    except (ValueError, KeyError, TypeError):
+        return 0
+
+
+def _session_of(raw: bytes) -> Optional[str]:
+    try:
+        return json.loads(raw).get("session")
+    except ValueError:
+        return None
+
+
+_MIN_NS, _MAX_NS = -(1 << 63), 1 << 63
+
+
+def parse_timestamp_ns(value: str) -> int:
+    """Epoch nanoseconds from an ISO-8601 time (UTC if it has no offset) or epoch seconds.
+
+    Raises ValueError for anything else, including times that are not finite or
+    do not fit the signed 64-bit nanoseconds the index stores.
+    """
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        try:
+            timestamp_ns = int(moment.timestamp() * 1e6) * 1000
+        except OverflowError:
+            raise ValueError(f"timestamp out of range: {value!r}") from None
+    else:
+        # Compared as a float first: inf, nan and overflowing products all fail here.
+        if not _MIN_NS <= seconds * 1e9 < _MAX_NS:
+            raise ValueError(f"timestamp out of range: {value!r}")
+        timestamp_ns = int(seconds * 1e9)
+    if not _MIN_NS <= timestamp_ns < _MAX_NS:
+        raise ValueError(f"timestamp out of range: {value!r}")
+    return timestamp_ns
+
+
+def format_sse(page: EventPage) -> bytes:
+    """Server-sent events for a page: each record as ``data``, with the cursor after it as its ``id``.
+
+    A client that reconnects sends the last ``id`` as ``Last-Event-ID`` and
+    resumes right after the last record it received.
+    """
+
+    return "".join(
+        f"id: {cursor}\ndata: {line}\n\n" for cursor, line in zip(page.cursors, page.lines)
+    ).encode("utf-8")
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# Keys of the JSON log line, in order; "timestamp" is the ISO-8601 rendering of ``timestamp_ns``.
+EVENT_FIELDS = (
+    "timestamp",
+    "state",
+    "face_present",
+    "yaw",
+    "pitch",
+    "roll",
+    "ear_left",
+    "ear_right",
+    "ear_avg",
+    "frame_interval_seconds",
+)
+# Followed by "session" on events from the vision server, which logs every session to one file.
+
+
+@dataclass(slots=True)
+class AttentionEvent:
+    """One classified frame as plain numbers: what the log, notifications and status are built from.
+
+    The pipeline creates one per frame, so it holds an epoch-nanosecond int
+    and floats only; the ISO timestamp, dict and JSON forms are rendered when
+    a sink asks for them, and the JSON line once however many sinks ask.
+    """
+
+    timestamp_ns: int
+    state: str
+    face_present: bool
+    yaw: float
+    pitch: float
+    roll: float
+    ear_left: float
+    ear_right: float
+    ear_avg: float
+    frame_interval_seconds: float
+    session: Optional[str] = None
+    _json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def timestamp(self) -> float:
+        """Seconds since the epoch."""
+
+        return self.timestamp_ns / 1e9
+
+    def isoformat(self) -> str:
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9, timezone.utc).isoformat()
+
+    def to_dict(self) -> Dict[str, object]:
+        """The event as the log and the notification payloads carry it, with an ISO ``timestamp``."""
+
+        event: Dict[str, object] = {
+            "timestamp": self.isoformat(),
+            "state": self.state,
+            "face_present": self.face_present,
+            "yaw": float(self.yaw),
+            "pitch": float(self.pitch),
+            "roll": float(self.roll),
+            "ear_left": float(self.ear_left),
+            "ear_right": float(self.ear_right),
+            "ear_avg": float(self.ear_avg),
+            "frame_interval_seconds": self.frame_interval_seconds,
+        }
+        if self.session is not None:
+            event["session"] = self.session
+        return event
+
+    def to_json(self) -> str:
+        """One JSON log line (without the newline); rendered on first use and then reused."""
+
+        if self._json is None:
+            self._json = json.dumps(self.to_dict())
+        return self._json
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Collection, Optional, Union
+
+from .eventlog import EventLog
+from .metrics import stage_timer
+from .windows import NEGATIVE_STATES, AttentionWindows
+
+if TYPE_CHECKING:
+    from .analyzer import FrameAnalysis
+    from .audio import SoundManager
+    from .events import AttentionEvent
+    from .notifications import NotificationDispatcher
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class AttentionUpdate:
+    """One classified frame, as handed to every handler."""
+
+    state: str
+    analysis: FrameAnalysis
+    event: AttentionEvent
+    # time.monotonic() when the frame was classified
+    now: float
+
+
+class AttentionHandler:
+    """A side effect subscribed to an :class:`~attention_monitor.pipeline.AttentionMonitorPipeline`.
+
+    :meth:`handle` runs after every classified frame, timed under ``stage``;
+    handlers that only occasionally do real work set ``stage`` to None and
+    time that work themselves. Inline handlers run on the pipeline's thread
+    before the next frame; the rest (``inline = False``) get a thread of
+    their own from the pipeline's :class:`~attention_monitor.bus.EventBus`.
+    """
+
+    stage: Optional[str] = "handler"
+    inline = True
+
+    def handle(self, update: AttentionUpdate) -> None:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """Forget per-session state; called from ``AttentionMonitorPipeline.reset``."""
+
+    def close(self) -> None:
+        """Release what the handler owns once the pipeline stops."""
+
+
+def check_and_handle_distraction_window(
+    windows: AttentionWindows,
+    window: str,
+    threshold: float,
+    now: float,
+    negative_states: Optional[Collection[str]] = None,
+) -> bool:
+    """Return True when a full ``window`` spent at least ``threshold`` of its time distracted."""
+
+    negative_states = negative_states or NEGATIVE_STATES
+    if not windows.is_full(window, now):
+        return False
+    return windows.fraction(window, negative_states, now) >= threshold
+
+
+class EventLogHandler(AttentionHandler):
+    """Appends every event to the event log, off the pipeline's thread; per-frame console output is the pipeline's debug log.
+
+    Given a path it opens (and on close, closes) its own
+    :class:`~attention_monitor.eventlog.EventLog`; given a log, it appends to
+    that one, as the vision server's sessions share one.
+    """
+
+    stage = "logging"
+    inline = False
+
+    def __init__(self, log: Union[Path, EventLog], segment_bytes: int = 64 * 1024 * 1024) -> None:
+        self._owned = not isinstance(log, EventLog)
+        self.path = Path(log) if self._owned else log.path
+        self._segment_bytes = segment_bytes
+        self._log: Optional[EventLog] = None if self._owned else log
+
+    def handle(self, update: AttentionUpdate) -> None:
+        if self._log is None:
+            self._log = EventLog(self.path, segment_bytes=self._segment_bytes)
+        self._log.append(update.event)
+
+    def close(self) -> None:
+        if self._owned and self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+class CallbackHandler(AttentionHandler):
+    """Calls ``callback(update)`` for every frame, e.g. the server's per-session status publisher."""
+
+    def __init__(self, callback: Callable[[AttentionUpdate], None], stage: Optional[str] = None) -> None:
+        self._callback = callback
+        self.stage = stage
+
+    def handle(self, update: AttentionUpdate) -> None:
+        self._callback(update)
+
+
+class NotificationHandler(AttentionHandler):
+    stage = "notification"
+
+    def __init__(self, dispatcher: NotificationDispatcher) -> None:
+        self._dispatcher = dispatcher
+
+    def handle(self, update: AttentionUpdate) -> None:
+        # Repeated states are suppressed and delivery happens off this thread; the payload is only built
+        # for updates that will be queued.
+        payload = {}
+        if self._dispatcher.due(update.state):
+            payload = update.event.to_dict()
+            payload.pop("state")
+        self._dispatcher.submit(update.state, **payload)
+
+    def reset(self) -> None:
+        self._dispatcher.reset()
+
+    def close(self) -> None:
+        self._dispatcher.close()
+
+
+class SoundHandler(AttentionHandler):
+    stage = "sound"
+
+    def __init__(self, sound_manager: SoundManager) -> None:
+        self._sound_manager = sound_manager
+
+    def handle(self, update: AttentionUpdate) -> None:
+        if update.state != "attentive":
+            self._sound_manager.play_state_alert(update.state)
+
+
+class InterventionHandler(AttentionHandler):
+    """Sounds and notifies once when a full distraction window crosses its threshold."""
+
+    stage = "intervention"
+
+    def __init__(
+        self,
+        windows: AttentionWindows,
+        window: str,
+        threshold: float,
+        sound_manager: SoundManager,
+        dispatcher: NotificationDispatcher,
+    ) -> None:
+        self._windows = windows
+        self._window = window
+        self._threshold = threshold
+        self._sound_manager = sound_manager
+        self._dispatcher = dispatcher
+        self._active = False
+
+    def handle(self, update: AttentionUpdate) -> None:
+        threshold_hit = check_and_handle_distraction_window(
+            self._windows, self._window, self._threshold, update.now, NEGATIVE_STATES
+        )
+
+        if threshold_hit and not self._active:
+            logger.warning(
+                "Prolonged distraction detected",
+                extra={"window": self._window, "threshold": self._threshold, "state": update.state},
+            )
+            self._sound_manager.play_prolonged_alert()
+            self._dispatcher.intervention(self._windows.summary(NEGATIVE_STATES, update.now), **update.event.to_dict())
+            self._active = True
+        elif not threshold_hit:
+            self._active = False
+
+    def reset(self) -> None:
+        self._active = False
+
+
+class EscalationTimer(AttentionHandler):
+    """Runs ``action`` once ``state`` has lasted ``threshold`` seconds without interruption.
+
+    Any other state ends the episode and rearms the timer, so an action fires at
+    most once per episode. While the timer runs, ``deadline`` is the wall-clock
+    time the action is due (for countdowns); it is None otherwise. The action is
+    timed as the ``escalation`` stage and runs on the pipeline's thread, or is
+    submitted to ``executor`` when one is given so slow actions (audio, outbound
+    calls) do not hold up the frames behind it.
+    """
+
+    stage = None
+
+    def __init__(
+        self,
+        state: str,
+        threshold: float,
+        action: Callable[[AttentionUpdate], None],
+        clock: Callable[[], float] = time.time,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.state = state
+        self.threshold = threshold
+        self._action = action
+        self._clock = clock
+        self._executor = executor
+        self.started_at: Optional[float] = None
+        self.deadline: Optional[float] = None
+        self.triggered = False
+        # Bumped by reset(), so an action still running from an earlier episode cannot mark this one
+        self._episode = 0
+        self._firing = False
+
+    def handle(self, update: AttentionUpdate) -> None:
+        if update.state != self.state:
+            if self.started_at is not None:
+                self.reset()
+            return
+
+        now = self._clock()
+        if self.started_at is None:
+            self.started_at = now
+        if self.triggered or self._firing:
+            return
+        if now - self.started_at < self.threshold:
+            self.deadline = self.started_at + self.threshold
+            return
+
+        self.deadline = None
+        self._firing = True
+        if self._executor is None:
+            self._fire(update, self._episode)
+        else:
+            self._executor.submit(self._fire, update, self._episode)
+
+    def _fire(self, update: AttentionUpdate, episode: int) -> None:
+        try:
+            with stage_timer("escalation"):
+                self._action(update)
+        except Exception:
+            logger.exception("%s escalation failed", self.state)
+        finally:
+            # Marked afterwards so the action still sees its own episode as untriggered.
+            if episode == self._episode:
+                self.triggered = True
+                self._firing = False
+
+    def reset(self) -> None:
+        self._episode += 1
+        self.started_at = None
+        self.deadline = None
+        self.triggered = False
+        self._firing = False
@@ -0,0 +1,468 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import struct
+import threading
+import time
+from calendar import timegm
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .eventlog import MAX_PAGE, EventLog, LogSegment, parse_timestamp_ns
+
+logger = logging.getLogger(__name__)
+
+STATES = ("attentive", "looking_away", "sleeping", "not_present")
+# Per-frame values summarized in a rollup, from the event's keys; only frames with a face count.
+MEASURES = (("yaw", "yaw"), ("pitch", "pitch"), ("ear", "ear_avg"))
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+# start, session index, frames, face frames, seconds per state, then min, max and sum per measure
+_RECORD = struct.Struct(f"<qIII{len(STATES)}f{len(MEASURES)}f{len(MEASURES)}f{len(MEASURES)}d")
+_NO_SESSION = 0xFFFFFFFF
+
+
+@dataclass(slots=True)
+class Rollup:
+    """Attention for one session over ``seconds`` from ``start`` (epoch seconds): time per state and pose/EAR stats."""
+
+    start: int
+    seconds: int
+    session: Optional[str]
+    frames: int = 0
+    face_frames: int = 0
+    state_seconds: List[float] = field(default_factory=lambda: [0.0] * len(STATES))
+    minimum: List[float] = field(default_factory=lambda: [math.inf] * len(MEASURES))
+    maximum: List[float] = field(default_factory=lambda: [-math.inf] * len(MEASURES))
+    total: List[float] = field(default_factory=lambda: [0.0] * len(MEASURES))
+
+    def add(self, event: Mapping[str, object]) -> None:
+        """Count one event as the log writes it (see :meth:`AttentionEvent.to_dict`)."""
+
+        self.frames += 1
+        state = event.get("state")
+        if state in STATES:
+            self.state_seconds[STATES.index(state)] += float(event.get("frame_interval_seconds") or 0.0)
+        if not event.get("face_present"):
+            return
+        self.face_frames += 1
+        for index, (_, key) in enumerate(MEASURES):
+            value = float(event.get(key) or 0.0)
+            self.minimum[index] = min(self.minimum[index], value)
+            self.maximum[index] = max(self.maximum[index], value)
+            self.total[index] += value
+
+    def to_dict(self) -> Dict[str, object]:
+        tracked = sum(self.state_seconds)
+        summary: Dict[str, object] = {
+            "start": datetime.fromtimestamp(self.start, timezone.utc).isoformat(),
+            "seconds": self.seconds,
+            "session": self.session,
+            "frames": self.frames,
+            "state_seconds": {state: round(value, 3) for state, value in zip(STATES, self.state_seconds)},
+            "distracted_fraction": round(1 - self.state_seconds[0] / tracked, 4) if tracked else None,
+        }
+        for index, (name, _) in enumerate(MEASURES):
+            summary[name] = (
+                {
+                    "min": round(self.minimum[index], 4),
+                    "mean": round(self.total[index] / self.face_frames, 4),
+                    "max": round(self.maximum[index], 4),
+                }
+                if self.face_frames
+                else None
+            )
+        return summary
+
+    def pack(self, session_index: int) -> bytes:
+        return _RECORD.pack(
+            self.start,
+            session_index,
+            self.frames,
+            self.face_frames,
+            *self.state_seconds,
+            *(value if self.face_frames else 0.0 for value in self.minimum),
+            *(value if self.face_frames else 0.0 for value in self.maximum),
+            *self.total,
+        )
+
+    def merge_record(self, fields: Tuple) -> None:
+        """Add a record as :meth:`pack` wrote it, without building a :class:`Rollup` for it first."""
+
+        states, measures = len(STATES), len(MEASURES)
+        self.frames += fields[2]
+        self.face_frames += fields[3]
+        for index in range(states):
+            self.state_seconds[index] += fields[4 + index]
+        if not fields[3]:
+            return
+        base = 4 + states
+        for index in range(measures):
+            self.minimum[index] = min(self.minimum[index], fields[base + index])
+            self.maximum[index] = max(self.maximum[index], fields[base + measures + index])
+            self.total[index] += fields[base + 2 * measures + index]
+
+
+class HistoryStore:
+    """Tiered retention for an :class:`~attention_monitor.eventlog.EventLog`: raw events, then minute and hour rollups.
+
+    :meth:`compact` (run every few minutes by :meth:`start`) moves history
+    down the tiers, each kept in fixed-width records next to the log:
+
+    * every rotated raw segment is rolled up into per-minute records in
+      ``<stem>.minute.<YYYYMMDD>.rollup``, one file per UTC day, as soon as it
+      rotates; the segment itself is removed once all of it is ``raw_seconds``
+      old (the active segment is rotated when it gets that old);
+    * each minute file whose day ended ``minute_seconds`` ago becomes per-hour
+      records in ``<stem>.hour.<YYYYMM>.rollup`` and is removed;
+    * hour files whose month ended ``hour_seconds`` ago are removed.
+
+    Disk use is therefore bounded by the three ages. :meth:`rollups` answers a
+    time range from the hour and minute files plus the raw events not yet
+    rolled up, so queries read the same whether or not compaction has run.
+
+    ``<stem>.rollup.json`` holds the session names records refer to, how far
+    the log and the minute files have been rolled up, and the committed length
+    of every rollup file. It is replaced atomically after the records it covers
+    are written, and bytes or files it does not cover are dropped on open, so
+    an interrupted compaction is redone rather than counted twice.
+    """
+
+    def __init__(
+        self,
+        log: EventLog,
+        *,
+        raw_seconds: float = 3 * DAY,
+        minute_seconds: float = 90 * DAY,
+        hour_seconds: float = 730 * DAY,
+    ) -> None:
+        self.log = log
+        self.raw_seconds = raw_seconds
+        self.minute_seconds = minute_seconds
+        self.hour_seconds = hour_seconds
+        self._directory = log.path.parent
+        self._stem = log.path.stem
+        self._state_path = self._directory / f"{self._stem}.rollup.json"
+        self._lock = threading.Lock()
+        self._compacting = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Log offset up to which raw events are in the minute files
+        self._rolled_offset = 0
+        # Minute files for days before this (epoch seconds) have been rolled into hours
+        self._hours_until = 0
+        self._sessions: List[str] = []
+        self._lengths: Dict[str, int] = {}
+        self._load()
+
+    # -- queries
+
+    def rollups(
+        self,
+        start_ns: int,
+        end_ns: int,
+        session: Optional[str] = None,
+        seconds: int = MINUTE,
+    ) -> List[Rollup]:
+        """Rollups of ``seconds`` (a minute or an hour) per session covering ``[start_ns, end_ns)``.
+
+        History already in hour records stays hourly when minutes are asked
+        for. Buckets at the edges cover the whole minute or hour they are in.
+        """
+
+        start, end = start_ns // 1_000_000_000, -(-end_ns // 1_000_000_000)
+        with self._lock:
+            sessions = list(self._sessions)
+            lengths = dict(self._lengths)
+            rolled_offset = self._rolled_offset
+            hours_until = self._hours_until
+        buckets: Dict[Tuple[int, Optional[str]], Rollup] = {}
+
+        def bucket_for(bucket_start: int, width: int, name: Optional[str]) -> Rollup:
+            width = max(seconds, width)
+            key = (bucket_start // width * width, name)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = Rollup(key[0], width, name)
+            return bucket
+
+        for file_name, length in lengths.items():
+            tier, period = _parse_name(file_name, self._stem)
+            period_start, period_end = _period_bounds(tier, period)
+            if period_end <= start or period_start >= end or tier == "minute" and period_start < hours_until:
+                continue
+            width = MINUTE if tier == "minute" else HOUR
+            for fields in self._records(file_name, length):
+                name = None if fields[1] == _NO_SESSION else sessions[fields[1]]
+                if session is not None and name != session or fields[0] + width <= start or fields[0] >= end:
+                    continue
+                bucket_for(fields[0], width, name).merge_record(fields)
+        for timestamp, event in self._raw_events(max(rolled_offset, self.log.start), start_ns, end_ns, session):
+            bucket_for(timestamp // 1_000_000_000, MINUTE, event.get("session")).add(event)
+        return sorted(buckets.values(), key=lambda rollup: (rollup.start, rollup.session or ""))
+
+    def coverage(self) -> Dict[str, Optional[str]]:
+        """When each tier's history starts (ISO-8601), or None for an empty tier."""
+
+        with self._lock:
+            lengths = dict(self._lengths)
+            hours_until = self._hours_until
+        first: Dict[str, Optional[int]] = {"hour": None, "minute": None}
+        for name, length in lengths.items():
+            tier, period = _parse_name(name, self._stem)
+            period_start = _period_bounds(tier, period)[0]
+            if length and (tier == "hour" or period_start >= hours_until):
+                first[tier] = period_start if first[tier] is None else min(first[tier], period_start)
+        raw = self.log.segments()[0].first_timestamp
+        return {
+            "hour": _isoformat(first["hour"]),
+            "minute": _isoformat(first["minute"]),
+            "raw": _isoformat(raw // 1_000_000_000 if raw is not None else None),
+        }
+
+    # -- compaction
+
+    def start(self, interval: float = 300.0) -> None:
+        """Run :meth:`compact` now and then every ``interval`` seconds on a background thread."""
+
+        if self._thread is not None:
+            return
+
+        def run() -> None:
+            while True:
+                try:
+                    self.compact()
+                except Exception:
+                    logger.exception("History compaction failed")
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=run, name="history-compactor", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 30.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Move history down the tiers as far as the ages allow; returns what was rolled up and removed."""
+
+        now = time.time() if now is None else now
+        done = {"segments_rolled": 0, "segments_removed": 0, "days_rolled": 0, "months_removed": 0}
+        with self._compacting:
+            raw_cutoff_ns = int((now - self.raw_seconds) * 1e9)
+            segments = self.log.segments()
+            active_last = self.log.last_timestamp(segments[-1])
+            if active_last is not None and active_last <= raw_cutoff_ns:
+                self.log.rotate()
+                segments = self.log.segments()
+
+            for segment in segments[:-1]:
+                if segment.end > self._rolled_offset:
+                    self._roll_segment(segment)
+                    done["segments_rolled"] += 1
+                last = self.log.last_timestamp(segment)
+                if last is None or last <= raw_cutoff_ns:
+                    self.log.remove_segment(segment)
+                    done["segments_removed"] += 1
+
+            # Whole days only, so an hour is never split between a minute file and an hour record.
+            day_cutoff = int(now - self.minute_seconds) // DAY * DAY
+            for name in sorted(self._files("minute")):
+                day_start = _period_bounds("minute", _parse_name(name, self._stem)[1])[0]
+                if day_start + DAY <= day_cutoff and day_start >= self._hours_until:
+                    self._roll_day(name, day_start)
+                    done["days_rolled"] += 1
+
+            month_cutoff = now - self.hour_seconds
+            for name in self._files("hour"):
+                if _period_bounds("hour", _parse_name(name, self._stem)[1])[1] <= month_cutoff:
+                    with self._lock:
+                        self._lengths.pop(name)
+                    self._save_state()
+                    (self._directory / name).unlink(missing_ok=True)
+                    done["months_removed"] += 1
+        if any(done.values()):
+            logger.info("Compacted attention history", extra=done)
+        return done
+
+    def _roll_segment(self, segment: LogSegment) -> None:
+        buckets: Dict[Tuple[int, Optional[str]], Rollup] = {}
+        with segment.path.open("rb") as handle:
+            handle.seek(max(self._rolled_offset - segment.base, 0))
+            for raw in handle:
+                try:
+                    event = json.loads(raw)
+                    start = parse_timestamp_ns(event["timestamp"]) // 1_000_000_000 // MINUTE * MINUTE
+                except (ValueError, KeyError, TypeError):
+                    continue
+                key = (start, event.get("session"))
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = Rollup(start, MINUTE, key[1])
+                bucket.add(event)
+        self._append("minute", buckets.values(), rolled_offset=segment.end)
+
+    def _roll_day(self, name: str, day_start: int) -> None:
+        with self._lock:
+            sessions = list(self._sessions)
+            length = self._lengths[name]
+        buckets: Dict[Tuple[int, Optional[str]], Rollup] = {}
+        for fields in self._records(name, length):
+            key = (fields[0] // HOUR * HOUR, None if fields[1] == _NO_SESSION else sessions[fields[1]])
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = Rollup(key[0], HOUR, key[1])
+            bucket.merge_record(fields)
+        self._append("hour", buckets.values(), hours_until=day_start + DAY, drop=name)
+        (self._directory / name).unlink(missing_ok=True)
+
+    def _append(
+        self,
+        tier: str,
+        rollups: Iterable[Rollup],
+        *,
+        rolled_offset: Optional[int] = None,
+        hours_until: Optional[int] = None,
+        drop: Optional[str] = None,
+    ) -> None:
+        """Append records to their period files, then commit them (and the watermark) in the state file."""
+
+        by_file: Dict[str, List[Rollup]] = {}
+        for rollup in sorted(rollups, key=lambda rollup: (rollup.start, rollup.session or "")):
+            by_file.setdefault(_file_name(self._stem, tier, rollup.start), []).append(rollup)
+        with self._lock:
+            sessions = list(self._sessions)
+        index = {name: position for position, name in enumerate(sessions)}
+        lengths: Dict[str, int] = {}
+        for name, records in by_file.items():
+            data = bytearray()
+            for rollup in records:
+                if rollup.session is not None and rollup.session not in index:
+                    index[rollup.session] = len(sessions)
+                    sessions.append(rollup.session)
+                data += rollup.pack(_NO_SESSION if rollup.session is None else index[rollup.session])
+            with (self._directory / name).open("ab") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+                lengths[name] = handle.tell()
+        with self._lock:
+            self._sessions = sessions
+            self._lengths.update(lengths)
+            if drop is not None:
+                self._lengths.pop(drop, None)
+            if rolled_offset is not None:
+                self._rolled_offset = rolled_offset
+            if hours_until is not None:
+                self._hours_until = hours_until
+        self._save_state()
+
+    # -- files
+
+    def _files(self, tier: str) -> List[str]:
+        with self._lock:
+            return [name for name in self._lengths if _parse_name(name, self._stem)[0] == tier]
+
+    def _records(self, name: str, length: int) -> Iterator[Tuple]:
+        """The committed records of a rollup file as :meth:`Rollup.pack` field tuples."""
+
+        try:
+            with (self._directory / name).open("rb") as handle:
+                data = handle.read(length)
+        except FileNotFoundError:
+            return iter(())
+        return _RECORD.iter_unpack(data[: len(data) - len(data) % _RECORD.size])
+
+    def _raw_events(
+        self, cursor: int, start_ns: int, end_ns: int, session: Optional[str]
+    ) -> Iterator[Tuple[int, Dict[str, object]]]:
+        """``(timestamp_ns, event)`` for raw events in the range from ``cursor`` on."""
+
+        cursor = max(cursor, self.log.offset_before(start_ns))
+        while True:
+            page = self.log.read(cursor=cursor, limit=MAX_PAGE, session=session)
+            for line in page.lines:
+                event = json.loads(line)
+                timestamp = parse_timestamp_ns(event["timestamp"])
+                if timestamp >= end_ns:
+                    return
+                if timestamp >= start_ns:
+                    yield timestamp, event
+            if not page.more:
+                return
+            cursor = page.next_cursor
+
+    def _save_state(self) -> None:
+        with self._lock:
+            state = {
+                "sessions": self._sessions,
+                "rolled_offset": self._rolled_offset,
+                "hours_until": self._hours_until,
+                "files": self._lengths,
+            }
+            text = json.dumps(state)
+        temporary = self._state_path.with_name(self._state_path.name + ".tmp")
+        with temporary.open("w", encoding="utf-8") as handle:
+            handle.write(text)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self._state_path)
+
+    def _load(self) -> None:
+        try:
+            state = json.loads(self._state_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            state = {}
+        self._sessions = list(state.get("sessions", []))
+        self._rolled_offset = int(state.get("rolled_offset", 0))
+        self._hours_until = int(state.get("hours_until", 0))
+        self._lengths = {name: int(length) for name, length in state.get("files", {}).items()}
+        # Records written after the last commit belong to a compaction that will run again.
+        for path in self._directory.glob(f"{self._stem}.*.*.rollup"):
+            length = self._lengths.get(path.name)
+            if length is None:
+                path.unlink()
+            elif path.stat().st_size > length:
+                with path.open("rb+") as handle:
+                    handle.truncate(length)
+        for name in list(self._lengths):
+            tier, period = _parse_name(name, self._stem)
+            if tier == "minute" and _period_bounds(tier, period)[0] < self._hours_until:
+                self._lengths.pop(name)
+                (self._directory / name).unlink(missing_ok=True)
+
+
+def _file_name(stem: str, tier: str, start: int) -> str:
+    moment = datetime.fromtimestamp(start, timezone.utc)
+    return f"{stem}.{tier}.{moment:%Y%m%d}.rollup" if tier == "minute" else f"{stem}.{tier}.{moment:%Y%m}.rollup"
+
+
+def _parse_name(name: str, stem: str) -> Tuple[str, str]:
+    tier, period, _ = name[len(stem) + 1 :].split(".")
+    return tier, period
+
+
+def _period_bounds(tier: str, period: str) -> Tuple[int, int]:
+    """Epoch seconds at the start and end of a minute file's day or an hour file's month (UTC)."""
+
+    if tier == "minute":
+        start = timegm(datetime.strptime(period, "%Y%m%d").timetuple())
+        return start, start + DAY
+    year, month = int(period[:4]), int(period[4:])
+    start = timegm((year, month, 1, 0, 0, 0))
+    end = timegm((year + month // 12, month % 12 + 1, 1, 0, 0, 0))
+    return start, end
+
+
+def _isoformat(seconds: Optional[int]) -> Optional[str]:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat() if seconds is not None else None
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from .analyzer import LEFT_EYE_LANDMARKS, RIGHT_EYE_LANDMARKS, FrameAnalysis, _eye_aspect_ratio
+from .backends import mesh_subset
+from .buffers import FrameBufferPool
+from .configuration import PipelineConfig
+from .metrics import stage_timer
+
+_EYE_SUBSET = [*LEFT_EYE_LANDMARKS, *RIGHT_EYE_LANDMARKS]
+_LEFT_EYE_ROWS = list(range(len(LEFT_EYE_LANDMARKS)))
+_RIGHT_EYE_ROWS = list(range(len(LEFT_EYE_LANDMARKS), len(_EYE_SUBSET)))
+
+
+class FaceLandmarkerAnalyzer:
+    """Frame analysis on the MediaPipe Tasks ``FaceLandmarker`` instead of FaceMesh + solvePnP.
+
+    The landmarker runs in VIDEO mode, tracking across frames from
+    monotonically increasing timestamps. Head pose comes straight from its
+    facial transformation matrix (no PnP solve), so yaw, pitch and roll are
+    rotations about the vertical, horizontal and viewing axes, all near zero
+    when facing the camera. Only the twelve eye landmarks cross into Python,
+    for EAR.
+
+    With ``config.use_blendshapes`` eye closure comes from the ``eyeBlink``
+    blendshapes instead. Each score is mapped onto the EAR scale so that
+    ``blink_threshold`` lands exactly on ``ear_threshold``, and
+    ``AttentionClassifier`` works unchanged.
+
+    Needs a ``face_landmarker.task`` bundle (``config.face_landmarker_model_path``).
+    """
+
+    def __init__(self, config: PipelineConfig) -> None:
+        if config.face_landmarker_model_path is None:
+            raise ValueError("inference_backend='face_landmarker' needs face_landmarker_model_path")
+        import mediapipe as mp
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        self._config = config
+        self._mp = mp
+        options = vision.FaceLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=str(config.face_landmarker_model_path)),
+            running_mode=vision.RunningMode.VIDEO,
+            num_faces=1,
+            min_face_detection_confidence=0.5,
+            min_face_presence_confidence=0.5,
+            min_tracking_confidence=0.5,
+            output_face_blendshapes=config.use_blendshapes,
+            output_facial_transformation_matrixes=True,
+        )
+        self._landmarker = vision.FaceLandmarker.create_from_options(options)
+        self._buffers = FrameBufferPool(config.frame_width, config.frame_height)
+        self._last_timestamp_ms = -1
+
+    def analyze(self, frame: np.ndarray) -> FrameAnalysis:
+        with stage_timer("inference"):
+            rgb = self._buffers.to_rgb(frame)
+            result = self._detect(rgb)
+        if not result.face_landmarks:
+            return FrameAnalysis(face_present=False)
+
+        with stage_timer("pose"):
+            yaw, pitch, roll = pose_from_matrix(result.facial_transformation_matrixes[0])
+            if self._config.use_blendshapes and result.face_blendshapes:
+                ear_left, ear_right = self._ears_from_blendshapes(result.face_blendshapes[0])
+            else:
+                eyes = mesh_subset(result.face_landmarks[0], _EYE_SUBSET, rgb.shape[:2])
+                ear_left = _eye_aspect_ratio(eyes, _LEFT_EYE_ROWS)
+                ear_right = _eye_aspect_ratio(eyes, _RIGHT_EYE_ROWS)
+
+        return FrameAnalysis(
+            face_present=True,
+            yaw=yaw,
+            pitch=pitch,
+            roll=roll,
+            ear_left=ear_left,
+            ear_right=ear_right,
+        )
+
+    def warm_up(self) -> None:
+        """Run a dummy inference so the first real frame skips graph setup and stale tracking."""
+
+        self._detect(np.zeros((self._config.frame_height, self._config.frame_width, 3), dtype=np.uint8))
+
+    def close(self) -> None:
+        self._landmarker.close()
+
+    def _detect(self, rgb: np.ndarray):
+        # VIDEO mode rejects timestamps that do not increase, even across a warm-up.
+        timestamp_ms = max(int(time.monotonic() * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=rgb)
+        return self._landmarker.detect_for_video(image, timestamp_ms)
+
+    def _ears_from_blendshapes(self, categories: Sequence) -> Tuple[float, float]:
+        scores = {category.category_name: category.score for category in categories}
+        return (
+            blink_to_ear(scores.get("eyeBlinkLeft", 0.0), self._config.blink_threshold, self._config.ear_threshold),
+            blink_to_ear(scores.get("eyeBlinkRight", 0.0), self._config.blink_threshold, self._config.ear_threshold),
+        )
+
+
+def pose_from_matrix(matrix: np.ndarray) -> Tuple[float, float, float]:
+    """(yaw, pitch, roll) in degrees from a 4x4 face-to-camera transform, decomposed as Ry·Rx·Rz."""
+
+    rotation = np.asarray(matrix, dtype=np.float64)[:3, :3]
+    # The transform can carry the face model's scale; only the rotation matters.
+    rotation = rotation / np.linalg.norm(rotation, axis=0)
+    yaw = np.degrees(np.arctan2(rotation[0, 2], rotation[2, 2]))
+    pitch = np.degrees(np.arcsin(np.clip(-rotation[1, 2], -1.0, 1.0)))
+    roll = np.degrees(np.arctan2(rotation[1, 0], rotation[1, 1]))
+    return float(yaw), float(pitch), float(roll)
+
+
+def blink_to_ear(blink: float, blink_threshold: float, ear_threshold: float) -> float:
+    """Map a 0..1 blink score to an EAR-like value: 1 -> 0, ``blink_threshold`` -> ``ear_threshold``."""
+
+    if blink_threshold >= 1.0:
+        return ear_threshold
+    return ear_threshold * (1.0 - blink) / (1.0 - blink_threshold)
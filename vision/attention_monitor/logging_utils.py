@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import atexit
 import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Mapping, MutableMapping
+from typing import Hashable, Mapping, Optional, TextIO, Tuple
 
 
 def save_event_to_jsonl(log_path: Path, event: Mapping[str, object]) -> None:
@@ -11,4 +20,179 @@ def save_event_to_jsonl(log_path: Path, event: Mapping[str, object]) -> None:
     log_path.parent.mkdir(parents=True, exist_ok=True)
     with log_path.open("a", encoding="utf-8") as handle:
         json.dump(event, handle)
-        handle.write("\n")
\ No newline at end of file
+        handle.write("\n")
+
+
+# Attributes every LogRecord has; anything else on a record came from ``extra=`` and is a structured field.
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+    "rate_key",
+}
+
+
+def record_fields(record: logging.LogRecord) -> Mapping[str, object]:
+    """The structured fields passed to the logging call through ``extra=``."""
+
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class StructuredFormatter(logging.Formatter):
+    """``time level logger: message key=value ...``, or one JSON object per line with ``json_output``.
+
+    Fields come from ``extra=`` on the logging call, e.g.
+    ``logger.info("State changed", extra={"session": sid, "state": state})``.
+    """
+
+    def __init__(self, json_output: bool = False) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        self.json_output = json_output
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = record_fields(record)
+        if not self.json_output:
+            line = super().format(record)
+            if not fields:
+                return line
+            text, sep, trace = line.partition("\n")
+            pairs = " ".join(f"{key}={_field_text(value)}" for key, value in fields.items())
+            return f"{text} {pairs}{sep}{trace}"
+
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **fields,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _field_text(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.3g}" if abs(value) < 1e-3 else f"{value:.2f}"
+    text = str(value)
+    return json.dumps(text) if not text or " " in text else text
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most one record per key every ``interval`` seconds.
+
+    The key is the record's ``rate_key`` (pass it in ``extra=``) or else its
+    logger, message template and ``session`` field, so a message repeated every
+    tick is limited per session while distinct messages are not. The next
+    record let through for a key carries ``suppressed=<count>``. Keys are kept
+    for the ``max_keys`` most recently seen messages.
+    """
+
+    def __init__(self, interval: float = 1.0, max_keys: int = 1024, clock=time.monotonic) -> None:
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (time last let through, records suppressed since)
+        self._seen: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval <= 0:
+            return True
+        key = getattr(record, "rate_key", None)
+        if key is None:
+            key = (record.name, record.msg, getattr(record, "session", None))
+        now = self._clock()
+        with self._lock:
+            last = self._seen.get(key)
+            if last is not None and now - last[0] < self.interval:
+                self._seen[key] = (last[0], last[1] + 1)
+                return False
+            self._seen[key] = (now, 0)
+            self._seen.move_to_end(key)
+            if len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+        if last is not None and last[1]:
+            record.suppressed = last[1]
+        return True
+
+
+class AsyncQueueHandler(QueueHandler):
+    """Hands records to a :class:`~logging.handlers.QueueListener` thread without formatting them.
+
+    Only the ``%`` merge of the message and its arguments happens on the
+    logging thread; timestamps, fields and tracebacks are formatted by the
+    listener. A full queue drops the record (counted in ``dropped``) rather
+    than blocking the caller.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The record stays in this process, so exc_info can travel as-is; only args may be mutated later.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    json_output: Optional[bool] = None,
+    rate_limit: Optional[float] = None,
+    stream: TextIO = sys.stderr,
+    queue_size: int = 10000,
+) -> AsyncQueueHandler:
+    """Route the root logger through a bounded queue to a background thread writing ``stream``.
+
+    Unset arguments come from ``LOG_LEVEL`` (default INFO), ``LOG_FORMAT``
+    (``text`` or ``json``) and ``LOG_RATE_LIMIT_SECONDS`` (default 1; 0 turns
+    rate limiting off). Calling it again replaces the previous configuration.
+    """
+
+    global _listener
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    if json_output is None:
+        json_output = os.getenv("LOG_FORMAT", "text").lower() == "json"
+    if rate_limit is None:
+        rate_limit = float(os.getenv("LOG_RATE_LIMIT_SECONDS", "1"))
+
+    if _listener is not None:
+        _listener.stop()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(StructuredFormatter(json_output))
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(queue_size)
+    handler = AsyncQueueHandler(log_queue)
+    handler.addFilter(RateLimitFilter(rate_limit))
+    _listener = QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    return handler
+
+
+@atexit.register
+def stop_logging() -> None:
+    """Write out whatever is still queued and stop the listener thread; runs at exit."""
+
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
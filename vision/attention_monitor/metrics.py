@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[LabelValues, object] = {}
+
+    def labels(self, *values: str, **kwargs: str):
+        """Return the child series for the given label values, creating it on first use."""
+
+        key = tuple(str(v) for v in values) if values else tuple(str(kwargs[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def _series(self) -> Iterable[Tuple[LabelValues, object]]:
+        if not self.labelnames:
+            yield (), self._default()
+            return
+        yield from list(self._children.items())
+
+    def _default(self):
+        return self.labels()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._series():
+            lines.extend(self._render_child(_format_labels(self.labelnames, values), child))
+        return lines
+
+    def _render_child(self, labels: str, child) -> List[str]:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def _render_child(self, labels: str, child: _Value) -> List[str]:
+        return [f"{self.name}{labels} {_format_value(child.value)}"]
+
+
+class Gauge(_Metric):
+    """Gauge whose series are either set directly or read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def set_function(self, fn: Callable[[], float], *values: str) -> None:
+        """Evaluate ``fn`` lazily on each scrape; costs nothing between scrapes."""
+
+        with self._lock:
+            self._functions[tuple(values)] = fn
+
+    def _series(self) -> Iterable[Tuple[LabelValues, object]]:
+        yield from list(self._children.items())
+        for values, fn in list(self._functions.items()):
+            holder = _Value()
+            try:
+                holder.value = float(fn())
+            except Exception:
+                continue
+            yield values, holder
+
+    def _render_child(self, labels: str, child: _Value) -> List[str]:
+        return [f"{self.name}{labels} {_format_value(child.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild) -> None:
+        self._child = child
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self._bounds)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return self._default().time()
+
+    def _render_child(self, labels: str, child: _HistogramChild) -> List[str]:
+        counts, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        base = labels[1:-1] + "," if labels else ""
+        for bound, count in zip(self._bounds + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _format_value(bound)
+            lines.append(f'{self.name}_bucket{{{base}le="{le}"}} {cumulative}')
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "attention_stage_duration_seconds",
+    "Time spent in each stage of a frame tick.",
+    ("stage",),
+)
+FRAMES = REGISTRY.counter(
+    "attention_frames_total",
+    "Frames by outcome: captured, analyzed, skipped, dropped or failed.",
+    ("outcome",),
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "attention_queue_depth",
+    "Items currently waiting in internal queues.",
+    ("queue",),
+)
+OUTBOUND_REQUESTS = REGISTRY.counter(
+    "attention_outbound_requests_total",
+    "Outbound API calls by service and outcome; rejected calls never left the process, deadline ones were cut off by the escalation budget.",
+    ("service", "outcome"),
+)
+OUTBOUND_LATENCY = REGISTRY.histogram(
+    "attention_outbound_request_duration_seconds",
+    "Latency of outbound API calls, including failures.",
+    ("service",),
+)
+SESSION_START_LATENCY = REGISTRY.histogram(
+    "attention_session_start_seconds",
+    "Time from a session start request to its first classified frame.",
+)
+FRAME_AGE = REGISTRY.histogram(
+    "attention_frame_age_seconds",
+    "Age of a frame when it is decoded for a consumer.",
+    buckets=(0.005, 0.01, 0.02, 0.035, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+STREAM_ENCODES = REGISTRY.counter(
+    "attention_stream_encodes_total",
+    "Stream frames by profile: encoded, or reused from another client's encode.",
+    ("profile", "result"),
+)
+STREAM_CLIENTS = REGISTRY.gauge(
+    "attention_stream_clients",
+    "Open video streams by profile.",
+    ("profile",),
+)
+BREAKER_STATE = REGISTRY.gauge(
+    "attention_circuit_state",
+    "Outbound circuit breaker state per service: 0 closed, 1 half-open, 2 open.",
+    ("service",),
+)
+NOTIFICATIONS = REGISTRY.counter(
+    "attention_notifications_total",
+    "Notification messages by destination and outcome: delivered, suppressed, dropped or failed.",
+    ("destination", "outcome"),
+)
+BUS_EVENTS = REGISTRY.counter(
+    "attention_bus_events_total",
+    "Updates for event-bus subscribers by stage and outcome: delivered or dropped (background subscribers), failed (any).",
+    ("stage", "outcome"),
+)
+CLIPS = REGISTRY.counter(
+    "attention_incident_clips_total",
+    "Incident clips by result: written, failed or empty.",
+    ("result",),
+)
+CLIP_BUFFER_BYTES = REGISTRY.gauge(
+    "attention_clip_buffer_bytes",
+    "Encoded frame bytes held in incident pre-event ring buffers.",
+)
+
+
+def stage_timer(stage: str) -> _Timer:
+    """Context manager recording the wrapped block under ``stage``."""
+
+    return STAGE_LATENCY.labels(stage).time()
+
+
+def record_outbound(service: str, outcome: str, seconds: Optional[float] = None) -> None:
+    OUTBOUND_REQUESTS.labels(service, outcome).inc()
+    if seconds is not None:
+        OUTBOUND_LATENCY.labels(service).observe(seconds)
+
+
+def _format_labels(names: Sequence[str], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Iterable, Optional
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 from .configuration import PipelineConfig
+from .metrics import NOTIFICATIONS
 
 logger = logging.getLogger(__name__)
 
+Message = Dict[str, Any]
+
 
 class NotificationClient:
     """Placeholder client that demonstrates where API calls would occur."""
@@ -28,21 +34,194 @@ class NotificationClient:
             self._api_key[-4:],
         )
 
-    def send_intervention(self, recent_states: Iterable[str], **metadata: Any) -> None:
+    def send_notifications(self, messages: List[Message]) -> None:
+        """Send several state updates in one request; each message carries its ``state``."""
+
+        if not self._api_key:
+            logger.debug("Batch of %d notifications skipped; no API key configured.", len(messages))
+            return
+
+        logger.info(
+            "[notification] Would send %d updates in one batch: states=%s (api_key=***%s)",
+            len(messages),
+            [message.get("state") for message in messages],
+            self._api_key[-4:],
+        )
+
+    def send_intervention(self, distraction: Mapping[str, float], **metadata: Any) -> None:
+        """``distraction`` maps each attention window to its fraction of distracted time."""
+
         if not self._api_key:
             logger.debug("Intervention skipped; no API key configured.")
             return
 
         logger.warning(
-            "[notification] Would trigger intervention for states=%s payload=%s (api_key=***%s)",
-            list(recent_states),
+            "[notification] Would trigger intervention for distraction=%s payload=%s (api_key=***%s)",
+            dict(distraction),
             metadata,
             self._api_key[-4:],
         )
 
 
+class NotificationDispatcher:
+    """Decides which state updates are worth sending and delivers them on a background thread.
+
+    The pipeline calls :meth:`submit` every frame. Only state transitions and
+    a periodic heartbeat for an unchanged state are queued; everything else is
+    counted as suppressed. Queued updates wait ``batch_window`` seconds so a
+    burst (flapping between states) goes out as one batched request, and each
+    destination is held to at most one request per ``min_interval`` seconds;
+    updates that arrive meanwhile join the next batch. Interventions are
+    coalesced to the latest one. Delivery never runs on the caller's thread.
+    """
+
+    NOTIFICATION = "notification"
+    INTERVENTION = "intervention"
+
+    def __init__(
+        self,
+        client: NotificationClient,
+        *,
+        heartbeat_interval: float = 60.0,
+        batch_window: float = 1.0,
+        min_interval: Optional[Mapping[str, float]] = None,
+        max_batch: int = 50,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = client
+        self.heartbeat_interval = heartbeat_interval
+        self.batch_window = batch_window
+        self.min_interval = {self.NOTIFICATION: 5.0, self.INTERVENTION: 0.0, **(min_interval or {})}
+        self.max_batch = max_batch
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._pending: Dict[str, List[Message]] = {}
+        self._first_queued: Dict[str, float] = {}
+        self._last_delivery: Dict[str, float] = {}
+        self._last_state: Optional[str] = None
+        self._last_queued_at = 0.0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def due(self, state: str) -> bool:
+        """Whether :meth:`submit` would queue ``state`` now: a transition, or a heartbeat that is due."""
+
+        return state != self._last_state or self._clock() - self._last_queued_at >= self.heartbeat_interval
+
+    def submit(self, state: str, **metadata: Any) -> bool:
+        """Queue ``state`` if it is a transition or a heartbeat is due; returns whether it was queued."""
+
+        now = self._clock()
+        if state == self._last_state and now - self._last_queued_at < self.heartbeat_interval:
+            NOTIFICATIONS.labels(self.NOTIFICATION, "suppressed").inc()
+            return False
+        reason = "transition" if state != self._last_state else "heartbeat"
+        self._last_state = state
+        self._last_queued_at = now
+        self._enqueue(self.NOTIFICATION, {"state": state, "reason": reason, **metadata}, now)
+        return True
+
+    def intervention(self, distraction: Mapping[str, float], **metadata: Any) -> None:
+        now = self._clock()
+        self._enqueue(self.INTERVENTION, {"distraction": dict(distraction), **metadata}, now)
+
+    def reset(self) -> None:
+        """Forget the last state so the next update counts as a transition (e.g. a new session)."""
+
+        self._last_state = None
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Deliver everything still queued, ignoring batch windows and rate limits, then stop."""
+
+        with self._cond:
+            self._closed = True
+            thread = self._thread
+            self._cond.notify()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _enqueue(self, destination: str, message: Message, now: float) -> None:
+        with self._cond:
+            if self._closed:
+                NOTIFICATIONS.labels(destination, "dropped").inc()
+                return
+            pending = self._pending.setdefault(destination, [])
+            if not pending:
+                self._first_queued[destination] = now
+            if destination == self.INTERVENTION and pending:
+                # Only the newest intervention matters.
+                NOTIFICATIONS.labels(destination, "suppressed").inc(len(pending))
+                pending.clear()
+            elif len(pending) >= self.max_batch:
+                pending.pop(0)
+                NOTIFICATIONS.labels(destination, "dropped").inc()
+            pending.append(message)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="notifications", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                destination, batch = self._next_batch()
+                if destination is None:
+                    return
+            self._deliver(destination, batch)
+
+    def _next_batch(self) -> Tuple[Optional[str], List[Message]]:
+        """Wait (holding the condition) for the next destination allowed to send; (None, []) once closed and empty."""
+
+        while True:
+            ready = [destination for destination, pending in self._pending.items() if pending]
+            if not ready:
+                if self._closed:
+                    return None, []
+                self._cond.wait()
+                continue
+            now = self._clock()
+            due = {
+                destination: now if self._closed else max(
+                    self._first_queued[destination] + (self.batch_window if destination == self.NOTIFICATION else 0.0),
+                    self._last_delivery.get(destination, float("-inf")) + self.min_interval.get(destination, 0.0),
+                )
+                for destination in ready
+            }
+            destination = min(due, key=due.get)
+            if due[destination] > now:
+                self._cond.wait(due[destination] - now)
+                continue
+            batch = self._pending.pop(destination)
+            self._last_delivery[destination] = now
+            return destination, batch
+
+    def _deliver(self, destination: str, batch: List[Message]) -> None:
+        try:
+            if destination == self.INTERVENTION:
+                message = dict(batch[-1])
+                self._client.send_intervention(message.pop("distraction"), **message)
+            elif len(batch) == 1:
+                message = dict(batch[0])
+                self._client.send_notification(message.pop("state"), **message)
+            else:
+                self._client.send_notifications(batch)
+        except Exception:
+            NOTIFICATIONS.labels(destination, "failed").inc(len(batch))
+            logger.exception("Delivering %d %s message(s) failed", len(batch), destination)
+            return
+        NOTIFICATIONS.labels(destination, "delivered").inc(len(batch))
+
+
+@lru_cache(maxsize=None)
+def _dispatcher_for(api_key: Optional[str]) -> NotificationDispatcher:
+    return NotificationDispatcher(NotificationClient(api_key))
+
+
 def send_notification(state: str, metadata: Dict[str, Any], config: PipelineConfig) -> None:
-    """Helper wrapper for compatibility with functional call sites."""
+    """Helper wrapper for compatibility with functional call sites.
+
+    Calls with the same API key share one client and dispatcher, so repeated
+    states are suppressed and delivery happens in the background.
+    """
 
-    client = NotificationClient(config.notification_api_key)
-    client.send_notification(state, **metadata)
\ No newline at end of file
+    _dispatcher_for(config.notification_api_key).submit(state, **metadata)
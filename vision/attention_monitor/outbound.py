@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+from .metrics import BREAKER_STATE, record_outbound
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a service whose breaker is open."""
+
+    def __init__(self, service: str) -> None:
+        super().__init__(f"{service} circuit is open; failing fast")
+        self.service = service
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an escalation's time budget is spent before a call starts."""
+
+
+class CircuitBreaker:
+    """Stops calling a service after repeated failures, then lets single probes through.
+
+    ``failure_threshold`` consecutive failures open the breaker; calls are
+    rejected without touching the network for ``reset_timeout`` seconds. After
+    that one caller at a time is let through (half-open): success closes the
+    breaker, failure reopens it for another ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only the first caller gets through."""
+
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """Give back a half-open probe slot without judging the service (the call never went out)."""
+
+        with self._lock:
+            self._probing = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(service: str) -> CircuitBreaker:
+    """The shared breaker for ``service``, created (and exported as a metric) on first use."""
+
+    found = _breakers.get(service)
+    if found is not None:
+        return found
+    with _breakers_lock:
+        found = _breakers.get(service)
+        if found is None:
+            found = _breakers[service] = CircuitBreaker(service)
+            BREAKER_STATE.set_function(lambda: _STATE_VALUES[found.state], service)
+        return found
+
+
+def breaker_states() -> Dict[str, str]:
+    return {service: found.state for service, found in list(_breakers.items())}
+
+
+class Deadline:
+    """A time budget shared by every outbound call made for one escalation."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds: float) -> None:
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def timeout(self, requested: Optional[float], minimum: float = 0.05) -> float:
+        """Clip a call's timeout to what is left; raises ``DeadlineExceeded`` when nothing useful is."""
+
+        remaining = self.remaining()
+        if remaining < minimum:
+            raise DeadlineExceeded("escalation budget spent")
+        return remaining if requested is None else min(requested, remaining)
+
+
+_deadline: ContextVar[Optional[Deadline]] = ContextVar("outbound_deadline", default=None)
+
+
+@contextmanager
+def deadline_budget(seconds_or_deadline) -> Iterator[Deadline]:
+    """Bound every ``guarded`` call in the block (on this thread) by one shared deadline."""
+
+    deadline = seconds_or_deadline if isinstance(seconds_or_deadline, Deadline) else Deadline(seconds_or_deadline)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def budget_timeout(requested: Optional[float]) -> Optional[float]:
+    """The timeout to use for a call: ``requested`` clipped to the current deadline, if any."""
+
+    deadline = _deadline.get()
+    return requested if deadline is None else deadline.timeout(requested)
+
+
+class _Call:
+    __slots__ = ("failed",)
+
+    def __init__(self) -> None:
+        self.failed = False
+
+    def fail(self) -> None:
+        """Count a bad response (e.g. HTTP 5xx) that did not raise as a failure."""
+
+        self.failed = True
+
+
+@contextmanager
+def guarded(service: str) -> Iterator[_Call]:
+    """Run one call to ``service`` through its breaker.
+
+    Raises ``CircuitOpenError`` without running the block while the breaker is
+    open, and ``DeadlineExceeded`` when the escalation budget is already spent.
+    An exception from the block, or ``fail()`` on the yielded call, counts as
+    a failure; anything else closes the breaker.
+    """
+
+    deadline = _deadline.get()
+    if deadline is not None and deadline.remaining() <= 0:
+        record_outbound(service, "deadline")
+        raise DeadlineExceeded(f"escalation budget spent before calling {service}")
+    found = breaker(service)
+    if not found.allow():
+        record_outbound(service, "rejected")
+        raise CircuitOpenError(service)
+    call = _Call()
+    try:
+        yield call
+    except DeadlineExceeded:
+        found.release()
+        raise
+    except Exception:
+        found.record_failure()
+        raise
+    if call.failed:
+        found.record_failure()
+    else:
+        found.record_success()
@@ -1,39 +1,49 @@
 from __future__ import annotations
 
 import asyncio
-import sys
-from collections import deque
-from datetime import datetime, timezone
-from typing import Deque, Dict, Optional, Set
+import logging
+import time
+from typing import List, Mapping, Optional, Sequence
 
 import cv2
+import numpy as np
 
-from .analyzer import AttentionClassifier, FrameAnalyzer, FrameAnalysis, get_frame
+from .analyzer import AttentionClassifier, FrameAnalyzer, FrameAnalysis, create_analyzer, get_frame
 from .audio import SoundManager
+from .buffers import FrameBufferPool
+from .bus import EventBus
 from .configuration import PipelineConfig
-from .logging_utils import save_event_to_jsonl
-from .notifications import NotificationClient
-
-NEGATIVE_STATES = {"not_present", "looking_away", "sleeping"}
-
-
-def check_and_handle_distraction_window(
-    history: Deque[str],
-    threshold: int,
-    negative_states: Optional[Set[str]] = None,
-) -> bool:
-    """Return True when the rolling history exceeds the distraction threshold."""
-
-    negative_states = negative_states or NEGATIVE_STATES
-    if len(history) < history.maxlen:
-        return False
-
-    negative_count = sum(1 for state in history if state in negative_states)
-    return negative_count >= threshold
+from .events import AttentionEvent
+from .handlers import (
+    AttentionHandler,
+    AttentionUpdate,
+    EventLogHandler,
+    InterventionHandler,
+    NotificationHandler,
+    SoundHandler,
+    check_and_handle_distraction_window,
+)
+from .metrics import FRAMES, stage_timer
+from .notifications import NotificationClient, NotificationDispatcher
+from .resources import open_camera
+from .windows import NEGATIVE_STATES, AttentionWindows, window_name
+
+__all__ = ["AttentionMonitorPipeline", "check_and_handle_distraction_window"]
+
+logger = logging.getLogger(__name__)
 
 
 class AttentionMonitorPipeline:
-    """Coordinates frame capture, analysis, logging, and alerting."""
+    """Coordinates frame capture, analysis, logging, and alerting.
+
+    :meth:`process` is the per-frame engine: analysis, classification and the
+    attention windows, then the update is published on an
+    :class:`~attention_monitor.bus.EventBus` that every handler subscribes to.
+    :meth:`run` feeds it from the local webcam with the default handlers
+    (event log, notifications, sounds, interventions); the vision server feeds
+    one pipeline per session from its scheduler and passes its escalations and
+    status publisher in as ``handlers``.
+    """
 
     def __init__(
         self,
@@ -41,48 +51,53 @@ class AttentionMonitorPipeline:
         *,
         sound_manager: Optional[SoundManager] = None,
         notification_client: Optional[NotificationClient] = None,
+        frame_analyzer: Optional[FrameAnalyzer] = None,
+        handlers: Optional[Sequence[AttentionHandler]] = None,
+        session_id: Optional[str] = None,
     ) -> None:
         self._config = config
-        self._frame_analyzer = FrameAnalyzer(config)
+        self._session_id = session_id
+        self._frame_analyzer = frame_analyzer or create_analyzer(config)
         self._classifier = AttentionClassifier(config)
-        self._sound_manager = sound_manager or SoundManager(config.enable_sounds)
-        self._notification_client = notification_client or NotificationClient(config.notification_api_key)
+        self._buffers = FrameBufferPool(config.frame_width, config.frame_height)
 
-        self._history: Deque[str] = deque(maxlen=config.history_window)
+        self._windows = AttentionWindows(
+            (*config.attention_windows, config.distraction_window_seconds), config.frame_process_interval
+        )
+        self._distraction_window = window_name(config.distraction_window_seconds)
         self._closed_frames = 0
-        self._last_logged_state: Optional[str] = None
-        self._intervention_active = False
+        self._bus = EventBus()
+        for handler in (
+            handlers if handlers is not None else self._default_handlers(sound_manager, notification_client)
+        ):
+            self._bus.subscribe(handler)
+
+    def subscribe(self, handler: AttentionHandler, inline: Optional[bool] = None) -> None:
+        """Run ``handler`` after every frame, after the handlers already subscribed; see :meth:`EventBus.subscribe`."""
+
+        self._bus.subscribe(handler, inline)
 
     async def run(self) -> None:
-        cap = cv2.VideoCapture(0)
+        # The grabber drains the device between ticks so each tick sees a fresh frame.
+        cap = open_camera(0, self._config.frame_width, self._config.frame_height)
         if not cap.isOpened():
-            print("Could not open webcam. Ensure the camera is connected.", file=sys.stderr)
+            logger.error("Could not open webcam. Ensure the camera is connected.")
             return
 
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self._config.frame_width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self._config.frame_height)
-
-        print("Starting attention monitor. Press 'q' in the video window to exit.")
+        logger.info("Starting attention monitor. Press 'q' in the video window to exit.")
 
         try:
             while True:
-                frame = get_frame(cap, self._config.frame_width, self._config.frame_height)
+                with stage_timer("capture"):
+                    frame = get_frame(cap, self._config.frame_width, self._config.frame_height, self._buffers)
                 if frame is None:
-                    print("Frame capture failed; retrying...", file=sys.stderr)
+                    FRAMES.labels("failed").inc()
+                    logger.warning("Frame capture failed; retrying...")
                     await asyncio.sleep(self._config.frame_process_interval)
                     continue
+                FRAMES.labels("captured").inc()
 
-                analysis = self._frame_analyzer.analyze(frame)
-                state, self._closed_frames = self._classifier.classify(analysis, self._closed_frames)
-                event = self._build_event(state, analysis)
-
-                save_event_to_jsonl(self._config.event_log_path, event)
-                print(f"[{event['timestamp']}] state={state}")
-
-                self._history.append(state)
-                self._handle_notifications(state, event)
-                self._handle_sounds(state)
-                self._handle_intervention(event)
+                self.process(frame)
 
                 cv2.imshow("Attention Monitor", frame)
                 if cv2.waitKey(1) & 0xFF == ord("q"):
@@ -91,47 +106,92 @@ class AttentionMonitorPipeline:
                 await asyncio.sleep(self._config.frame_process_interval)
         finally:
             cap.release()
-            self._frame_analyzer.close()
+            self.close()
             cv2.destroyAllWindows()
 
-    def _handle_notifications(self, state: str, event: Dict[str, object]) -> None:
-        if not event:
-            return
-        payload = dict(event)
-        payload.pop("state", None)
-        self._notification_client.send_notification(state, **payload)
-
-    def _handle_sounds(self, state: str) -> None:
-        if state != "attentive":
-            self._sound_manager.play_state_alert(state)
-
-    def _handle_intervention(self, event: Dict[str, object]) -> None:
-        threshold_hit = check_and_handle_distraction_window(
-            self._history,
-            self._config.distraction_threshold,
-            NEGATIVE_STATES,
-        )
+    def process(self, frame: np.ndarray, now: Optional[float] = None) -> AttentionUpdate:
+        """Analyze and classify one frame, then hand the result to every handler.
+
+        ``now`` (monotonic seconds) defaults to the current time; replays pass
+        the recorded frame time instead.
+        """
+
+        started = time.perf_counter()
+        analysis = self._frame_analyzer.analyze(frame)
+        FRAMES.labels("analyzed").inc()
+        with stage_timer("classification"):
+            state, self._closed_frames = self._classifier.classify(analysis, self._closed_frames)
+            event = self._build_event(state, analysis)
+
+        update = AttentionUpdate(state, analysis, event, time.monotonic() if now is None else now)
+        self._windows.observe(state, update.now)
+        self._bus.publish(update)
+        # Checked first so that with debug off no fields are built; LOG_RATE_LIMIT_SECONDS=0 logs every frame.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Frame",
+                extra={
+                    "state": state,
+                    "yaw": analysis.yaw,
+                    "pitch": analysis.pitch,
+                    "ear": analysis.ear_average,
+                    "latency_ms": (time.perf_counter() - started) * 1000,
+                },
+            )
+        return update
+
+    def reset(self) -> None:
+        """Clear per-session state so the pipeline and its loaded model can be reused."""
+
+        self._windows.reset()
+        self._closed_frames = 0
+        self._bus.reset()
+        self._frame_analyzer.warm_up()
+
+    def close(self, *, analyzer: bool = True) -> None:
+        """Stop the handlers (background ones after their queued updates) and, unless told not to, free the model."""
 
-        if threshold_hit and not self._intervention_active:
-            print("ALERT: Prolonged distraction detected!")
-            self._sound_manager.play_prolonged_alert()
-            self._notification_client.send_intervention(self._history, **event)
-            self._intervention_active = True
-        elif not threshold_hit:
-            self._intervention_active = False
-
-    def _build_event(self, state: str, analysis: FrameAnalysis) -> Dict[str, object]:
-        timestamp = datetime.now(timezone.utc).isoformat()
-        event: Dict[str, object] = {
-            "timestamp": timestamp,
-            "state": state,
-            "face_present": analysis.face_present,
-            "yaw": analysis.yaw,
-            "pitch": analysis.pitch,
-            "roll": analysis.roll,
-            "ear_left": analysis.ear_left,
-            "ear_right": analysis.ear_right,
-            "ear_avg": analysis.ear_average,
-            "frame_interval_seconds": self._config.frame_process_interval,
-        }
-        return event
\ No newline at end of file
+        self._bus.close()
+        if analyzer:
+            self._frame_analyzer.close()
+
+    def distraction(self, now: Optional[float] = None) -> Mapping[str, float]:
+        """Fraction of time distracted in each attention window, e.g. ``{"30s": 0.4, "300s": 0.1, "session": 0.05}``."""
+
+        return self._windows.summary(NEGATIVE_STATES, time.monotonic() if now is None else now)
+
+    def _default_handlers(
+        self,
+        sound_manager: Optional[SoundManager],
+        notification_client: Optional[NotificationClient],
+    ) -> List[AttentionHandler]:
+        config = self._config
+        sound_manager = sound_manager or SoundManager(config.enable_sounds)
+        notifications = NotificationDispatcher(
+            notification_client or NotificationClient(config.notification_api_key),
+            heartbeat_interval=config.notification_heartbeat_seconds,
+            min_interval={NotificationDispatcher.NOTIFICATION: config.notification_min_interval_seconds},
+        )
+        return [
+            EventLogHandler(config.event_log_path, config.event_log_segment_bytes),
+            NotificationHandler(notifications),
+            SoundHandler(sound_manager),
+            InterventionHandler(
+                self._windows, self._distraction_window, config.distraction_fraction, sound_manager, notifications
+            ),
+        ]
+
+    def _build_event(self, state: str, analysis: FrameAnalysis) -> AttentionEvent:
+        return AttentionEvent(
+            time.time_ns(),
+            state,
+            analysis.face_present,
+            analysis.yaw,
+            analysis.pitch,
+            analysis.roll,
+            analysis.ear_left,
+            analysis.ear_right,
+            analysis.ear_average,
+            self._config.frame_process_interval,
+            self._session_id,
+        )
\ No newline at end of file
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Collection, Dict, List, Literal, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+ProfileFormat = Literal["collapsed", "speedscope"]
+
+FrameKey = Tuple[str, str, int]
+
+ThreadIdents = Union[int, Collection[int]]
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of one or more threads at a fixed interval.
+
+    Sampling happens on a separate daemon thread through ``sys._current_frames()``,
+    so the profiled threads run unmodified; the only cost they see is the sampler
+    briefly holding the GIL (tens of microseconds every ``interval`` seconds).
+    Stacks from several threads (a worker pool) are merged into one profile.
+    """
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(
+        self,
+        thread_ident: ThreadIdents,
+        duration: float,
+        output_path: Path,
+        fmt: ProfileFormat = "collapsed",
+    ) -> bool:
+        """Profile ``thread_ident`` (one ident or several) in the background; returns False if already running."""
+
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = threading.Thread(
+                target=self.profile,
+                args=(thread_ident, duration, output_path, fmt),
+                name="sampling-profiler",
+                daemon=True,
+            )
+            self._thread.start()
+        return True
+
+    def profile(
+        self,
+        thread_ident: ThreadIdents,
+        duration: float,
+        output_path: Path,
+        fmt: ProfileFormat = "collapsed",
+    ) -> Path:
+        """Collect samples for ``duration`` seconds and write them to ``output_path``."""
+
+        stacks, sample_count = self._collect(thread_ident, duration)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "speedscope":
+            output_path.write_text(json.dumps(_to_speedscope(stacks, self._interval, output_path.stem)), encoding="utf-8")
+        else:
+            output_path.write_text(_to_collapsed(stacks), encoding="utf-8")
+        logger.info("Profile written", extra={"samples": sample_count, "path": str(output_path), "format": fmt})
+        return output_path
+
+    def _collect(self, thread_ident: ThreadIdents, duration: float) -> Tuple[Counter, int]:
+        idents = (thread_ident,) if isinstance(thread_ident, int) else tuple(thread_ident)
+        stacks: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            current = sys._current_frames()
+            frames = [current[ident] for ident in idents if ident in current]
+            del current
+            if not frames:
+                break
+            for frame in frames:
+                stack: List[FrameKey] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stacks[tuple(reversed(stack))] += 1
+                samples += 1
+            del frames
+            time.sleep(self._interval)
+        return stacks, samples
+
+
+def default_profile_path(output_dir: Path, fmt: ProfileFormat = "collapsed") -> Path:
+    suffix = ".speedscope.json" if fmt == "speedscope" else ".collapsed.txt"
+    return output_dir / f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}{suffix}"
+
+
+def install_profile_signal(
+    profiler: SamplingProfiler,
+    target_ident: Callable[[], Optional[ThreadIdents]],
+    output_dir: Path,
+    duration: float = 10.0,
+    signum: Optional[int] = None,
+) -> bool:
+    """Start a profile of ``target_ident()`` whenever ``signum`` (SIGUSR1) arrives.
+
+    Must be called from the main thread; returns False where the signal is unavailable.
+    """
+
+    signum = signum if signum is not None else getattr(signal, "SIGUSR1", None)
+    if signum is None:
+        return False
+
+    def _handler(_signum, _frame) -> None:
+        ident = target_ident()
+        if ident is None:
+            logger.warning("Profile requested but there is no thread to sample")
+            return
+        profiler.start(ident, duration, default_profile_path(output_dir))
+
+    signal.signal(signum, _handler)
+    return True
+
+
+def _describe(key: FrameKey) -> str:
+    name, filename, line = key
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def _to_collapsed(stacks: Counter) -> str:
+    lines = [";".join(_describe(key) for key in stack) + f" {count}" for stack, count in stacks.most_common()]
+    return "\n".join(lines) + "\n"
+
+
+def _to_speedscope(stacks: Counter, interval: float, name: str) -> Dict[str, object]:
+    frame_index: Dict[FrameKey, int] = {}
+    frames: List[Dict[str, object]] = []
+    samples: List[List[int]] = []
+    weights: List[float] = []
+    for stack, count in stacks.items():
+        indexes = []
+        for key in stack:
+            if key not in frame_index:
+                frame_index[key] = len(frames)
+                frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            indexes.append(frame_index[key])
+        samples.append(indexes)
+        weights.append(count * interval)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+        "exporter": "attention_monitor.profiler",
+    }
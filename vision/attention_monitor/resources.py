@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Generic, Optional, TypeVar
+
+if TYPE_CHECKING:
+    import cv2
+    import numpy as np
+
+T = TypeVar("T")
+
+
+def open_camera(index: int, width: int, height: int, *, low_latency: bool = True) -> Any:
+    """Open a capture device and request the given frame size.
+
+    With ``low_latency`` the device is asked for MJPG and a minimal driver queue,
+    and is wrapped in a :class:`~attention_monitor.capture.FrameGrabber` so reads
+    always return the freshest frame.
+    """
+
+    import cv2
+
+    from .capture import FrameGrabber, configure_low_latency
+
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        return cap
+    if low_latency:
+        configure_low_latency(cap)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    return FrameGrabber(cap) if low_latency else cap
+
+
+class WarmResource(Generic[T]):
+    """Builds an expensive object once in the background and hands out the same instance."""
+
+    def __init__(self, factory: Callable[[], T], primer: Optional[Callable[[T], None]] = None) -> None:
+        self._factory = factory
+        self._primer = primer
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._instance: Optional[T] = None
+        self._error: Optional[BaseException] = None
+        self._started = False
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._build, name="warm-resource", daemon=True).start()
+
+    def get(self, timeout: Optional[float] = None) -> T:
+        """Return the instance, building it on the caller's thread if warm-up never started."""
+
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Warm resource is still loading")
+        if self._error is not None:
+            raise RuntimeError("Warm resource failed to load") from self._error
+        assert self._instance is not None
+        return self._instance
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and self._error is None
+
+    def close(self) -> None:
+        instance, self._instance = self._instance, None
+        if instance is not None and hasattr(instance, "close"):
+            instance.close()
+
+    def _build(self) -> None:
+        try:
+            instance = self._factory()
+            if self._primer is not None:
+                self._primer(instance)
+            self._instance = instance
+        except BaseException as exc:  # surfaced to callers of get()
+            self._error = exc
+        finally:
+            self._ready.set()
+
+
+class PooledCamera:
+    """Handle lent out by :class:`CameraPool`; reads are serialized across borrowers."""
+
+    def __init__(self, pool: "CameraPool", cap: cv2.VideoCapture) -> None:
+        self._pool = pool
+        self._cap = cap
+        self._released = False
+
+    def isOpened(self) -> bool:
+        return not self._released and self._cap.isOpened()
+
+    def read(self, image: Optional[np.ndarray] = None):
+        if getattr(self._cap, "thread_safe", False):
+            return self._cap.read(image)
+        with self._pool.read_lock:
+            return self._cap.read(image) if image is not None else self._cap.read()
+
+    def wait_for_frame(self, last_seq: int, timeout: float = 1.0) -> int:
+        """Wait for a frame newer than ``last_seq``; plain captures block in ``read`` instead."""
+
+        wait = getattr(self._cap, "wait_for_frame", None)
+        return wait(last_seq, timeout) if wait is not None else last_seq + 1
+
+    @property
+    def seq(self) -> Optional[int]:
+        """Frame sequence of the underlying grabber, or None for plain captures."""
+
+        return getattr(self._cap, "seq", None)
+
+    def set(self, prop: int, value: float) -> bool:
+        return self._cap.set(prop, value)
+
+    def get(self, prop: int) -> float:
+        return self._cap.get(prop)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._pool.release()
+
+
+class CameraPool:
+    """Shares one open capture device and keeps it open for ``idle_grace`` seconds after use.
+
+    With ``idle_grace`` of 0 the device is released as soon as the last borrower
+    lets go, matching the behaviour of opening a fresh capture per session.
+    """
+
+    def __init__(self, opener: Callable[[], cv2.VideoCapture], idle_grace: float = 0.0) -> None:
+        self._opener = opener
+        self._idle_grace = idle_grace
+        self._lock = threading.Lock()
+        self.read_lock = threading.Lock()
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._borrowers = 0
+        self._close_timer: Optional[threading.Timer] = None
+
+    def acquire(self) -> Optional[PooledCamera]:
+        """Borrow the shared device, opening it if needed; returns None if it cannot be opened."""
+
+        with self._lock:
+            self._cancel_timer()
+            if self._cap is None or not self._cap.isOpened():
+                cap = self._opener()
+                if not cap.isOpened():
+                    cap.release()
+                    return None
+                self._cap = cap
+            self._borrowers += 1
+            return PooledCamera(self, self._cap)
+
+    def release(self) -> None:
+        with self._lock:
+            self._borrowers = max(0, self._borrowers - 1)
+            if self._borrowers:
+                return
+            if self._idle_grace <= 0:
+                self._close_locked()
+                return
+            self._close_timer = threading.Timer(self._idle_grace, self._close_if_idle)
+            self._close_timer.daemon = True
+            self._close_timer.start()
+
+    @property
+    def is_open(self) -> bool:
+        return self._cap is not None
+
+    @property
+    def last_frame_age(self) -> Optional[float]:
+        """Seconds between grabbing and decoding the last frame served, if known."""
+
+        return getattr(self._cap, "last_frame_age", None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._cancel_timer()
+            self._close_locked()
+
+    def _close_if_idle(self) -> None:
+        with self._lock:
+            if not self._borrowers:
+                self._close_locked()
+
+    def _close_locked(self) -> None:
+        if self._cap is not None:
+            with self.read_lock:
+                self._cap.release()
+            self._cap = None
+
+    def _cancel_timer(self) -> None:
+        if self._close_timer is not None:
+            self._close_timer.cancel()
+            self._close_timer = None
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Protocol, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledSession(Protocol):
+    session_id: str
+    active: bool
+
+    def tick(self) -> bool:
+        """Analyze one frame; return False to leave the schedule."""
+
+    def finish(self) -> None:
+        """Release per-session resources after the last tick."""
+
+
+class SessionScheduler:
+    """Runs the analysis ticks of every active session on one worker pool.
+
+    A session is ticked again ``interval`` seconds after its previous tick
+    finishes, and never by two workers at once, so per-session state (timers,
+    the face tracker) needs no locking. The pool is sized to the CPU count:
+    with more cameras than cores, ticks queue for a worker instead of
+    oversubscribing the CPU, and idle sessions cost a heap entry rather than a
+    thread.
+    """
+
+    def __init__(self, interval: float = 0.5, workers: Optional[int] = None) -> None:
+        self.interval = interval
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="analysis", initializer=self._register_worker
+        )
+        self._cond = threading.Condition()
+        self._sessions: Dict[str, ScheduledSession] = {}
+        self._due: List[Tuple[float, int, str]] = []
+        self._order = itertools.count()
+        self._in_flight: Set[str] = set()
+        self._worker_idents: List[int] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, session: ScheduledSession) -> bool:
+        """Schedule ``session`` for an immediate first tick; False if it is already scheduled.
+
+        A session that is scheduled keeps ticking for as long as ``tick()``
+        returns True, and is rescheduled after ``finish()`` if it was
+        reactivated meanwhile.
+        """
+
+        with self._cond:
+            if session.session_id in self._sessions:
+                return False
+            self._sessions[session.session_id] = session
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="session-scheduler", daemon=True)
+                self._thread.start()
+            self._push(session.session_id, time.monotonic())
+        return True
+
+    def is_scheduled(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    @property
+    def backlog(self) -> int:
+        """Sessions whose tick is due but still waiting for a free worker."""
+
+        now = time.monotonic()
+        with self._cond:
+            return sum(1 for due, _, _ in self._due if due <= now) + max(0, len(self._in_flight) - self.workers)
+
+    def worker_idents(self) -> List[int]:
+        return list(self._worker_idents)
+
+    def _register_worker(self) -> None:
+        self._worker_idents.append(threading.get_ident())
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due or self._due[0][0] > time.monotonic():
+                    timeout = self._due[0][0] - time.monotonic() if self._due else None
+                    self._cond.wait(timeout)
+                _, _, session_id = heapq.heappop(self._due)
+                session = self._sessions.get(session_id)
+                if session is None or session_id in self._in_flight:
+                    continue
+                self._in_flight.add(session_id)
+            self._pool.submit(self._tick, session)
+
+    def _tick(self, session: ScheduledSession) -> None:
+        keep = False
+        try:
+            keep = session.tick()
+        except Exception:
+            logger.exception("Session %s tick failed", session.session_id)
+        with self._cond:
+            self._in_flight.discard(session.session_id)
+            if keep:
+                self._push(session.session_id, time.monotonic() + self.interval)
+                return
+        try:
+            session.finish()
+        except Exception:
+            logger.exception("Session %s failed to release its resources", session.session_id)
+        with self._cond:
+            # Still registered while finishing so a restart cannot tick alongside finish().
+            if session.active:
+                self._push(session.session_id, time.monotonic() + self.interval)
+            else:
+                self._sessions.pop(session.session_id, None)
+
+    def _push(self, session_id: str, due: float) -> None:
+        heapq.heappush(self._due, (due, next(self._order), session_id))
+        self._cond.notify()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class StatusSnapshot:
+    """Everything ``/status`` reports, published by the analysis loop as one immutable object.
+
+    Writers build a new snapshot and swap the reference; readers never see a
+    status paired with another state's countdown. Countdowns are stored as
+    deadlines so a snapshot stays correct between ticks.
+    """
+
+    status: str = "Looking for face..."
+    status_type: str = "focused"
+    countdown_deadline: Optional[float] = None
+    consequence: Optional[str] = None
+    session_active: bool = False
+    # Fraction of time distracted per attention window, as of the last tick
+    distraction: Optional[Mapping[str, float]] = None
+
+    def to_json(self, now: float) -> Dict[str, Any]:
+        countdown = None
+        consequence = None
+        if self.countdown_deadline is not None:
+            remaining = max(0, int(self.countdown_deadline - now))
+            if remaining > 0:
+                countdown = remaining
+                consequence = self.consequence
+        return {
+            "status": self.status,
+            "statusType": self.status_type,
+            "countdown": countdown,
+            "consequence": consequence,
+            "session_active": self.session_active,
+            "distraction": self.distraction,
+        }
+
+
+def status_type_for(status: str) -> str:
+    """Map a human-readable status line to the ``statusType`` the extension switches on."""
+
+    lowered = status.lower()
+    if "sleep" in lowered:
+        return "sleeping"
+    if "not present" in lowered:
+        return "not_present"
+    if "looking away" in lowered:
+        return "looking_away"
+    return "focused"
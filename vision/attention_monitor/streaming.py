@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+from .metrics import STREAM_CLIENTS, STREAM_ENCODES, stage_timer
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MIN_WIDTH = 16
+MIN_QUALITY = 10
+MAX_QUALITY = 95
+MIN_FPS = 0.2
+MAX_FPS = 60.0
+
+
+@dataclass(frozen=True, slots=True)
+class StreamProfile:
+    """Output size, JPEG quality and frame-rate cap requested by one stream client."""
+
+    width: int
+    height: int
+    quality: int = 85
+    max_fps: Optional[float] = None
+
+    @classmethod
+    def from_query(
+        cls,
+        args: Mapping[str, str],
+        source_width: int,
+        source_height: int,
+        default_quality: int = 85,
+    ) -> "StreamProfile":
+        """Build a profile from ``width``, ``height``, ``quality`` and ``fps`` query parameters.
+
+        A missing dimension keeps the source aspect ratio, sizes are never
+        upscaled past the source, and quality and fps are clamped to sane
+        ranges. Raises ``ValueError`` for values that are not numbers.
+        """
+
+        width = _parse(args, "width", int)
+        height = _parse(args, "height", int)
+        quality = _parse(args, "quality", int)
+        max_fps = _parse(args, "fps", float)
+
+        if width is None and height is None:
+            width, height = source_width, source_height
+        elif height is None:
+            height = round(width * source_height / source_width)
+        elif width is None:
+            width = round(height * source_width / source_height)
+        width = min(max(width, MIN_WIDTH), source_width)
+        height = min(max(height, MIN_WIDTH), source_height)
+
+        quality = default_quality if quality is None else min(max(quality, MIN_QUALITY), MAX_QUALITY)
+        if max_fps is not None:
+            # fps=0 asks for the camera rate, same as leaving it out.
+            max_fps = min(max(max_fps, MIN_FPS), MAX_FPS) if max_fps > 0 else None
+        return cls(width, height, quality, max_fps)
+
+    @property
+    def encoding(self) -> Tuple[int, int, int]:
+        """Key shared by every client that receives identical JPEG bytes."""
+
+        return self.width, self.height, self.quality
+
+    @property
+    def label(self) -> str:
+        return f"{self.width}x{self.height}q{self.quality}"
+
+
+def _parse(args: Mapping[str, str], name: str, kind: Callable[[str], object]):
+    raw = args.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        return kind(raw)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {raw!r}") from None
+
+
+class _EncodedSlot:
+    __slots__ = ("lock", "seq", "data", "encoded_at", "resized")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.seq: Optional[int] = None
+        self.data: Optional[bytes] = None
+        self.encoded_at = 0.0
+        self.resized: Optional[np.ndarray] = None
+
+
+class SharedEncoder:
+    """Encodes each camera frame at most once per output size and quality.
+
+    Clients with the same encoding share one slot: the first to ask for a frame
+    sequence resizes and encodes it, the rest get the cached bytes. The latest
+    bytes per encoding double as the ``/snapshot`` cache.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._slots: Dict[Tuple[int, int, int], _EncodedSlot] = {}
+
+    def encode(
+        self,
+        seq: int,
+        profile: StreamProfile,
+        read_frame: Callable[[], Optional[np.ndarray]],
+        current_seq: Optional[Callable[[], Optional[int]]] = None,
+    ) -> Optional[Tuple[int, bytes]]:
+        """Return ``(sequence, JPEG bytes)`` for frame ``seq`` or newer, reading only on a cache miss.
+
+        ``current_seq`` reports the sequence of the frame ``read_frame`` just
+        decoded; a grabber decodes the next frame, not the one that woke the
+        caller. Clients should wait for a frame newer than the returned
+        sequence so they never receive the same bytes twice.
+        """
+
+        slot = self._slot(profile)
+        with slot.lock:
+            if slot.seq is not None and slot.seq >= seq and slot.data is not None:
+                STREAM_ENCODES.labels(profile.label, "shared").inc()
+                return slot.seq, slot.data
+            frame = read_frame()
+            if frame is None:
+                return None
+            data = self._encode(slot, frame, profile)
+            if data is None:
+                return None
+            decoded_seq = current_seq() if current_seq is not None else None
+            slot.seq = seq if decoded_seq is None else max(seq, decoded_seq)
+            slot.data, slot.encoded_at = data, time.monotonic()
+            STREAM_ENCODES.labels(profile.label, "encoded").inc()
+            return slot.seq, data
+
+    def latest(self, profile: StreamProfile, max_age: float) -> Optional[bytes]:
+        """Most recent bytes for ``profile`` if encoded within ``max_age`` seconds."""
+
+        slot = self._slots.get(profile.encoding)
+        if slot is None or slot.data is None:
+            return None
+        if time.monotonic() - slot.encoded_at > max_age:
+            return None
+        return slot.data
+
+    def clear(self) -> None:
+        """Forget every cached frame, e.g. when a session ends or the camera is reopened."""
+
+        with self._lock:
+            self._slots.clear()
+
+    def _slot(self, profile: StreamProfile) -> _EncodedSlot:
+        slot = self._slots.get(profile.encoding)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.setdefault(profile.encoding, _EncodedSlot())
+        return slot
+
+    @staticmethod
+    def _encode(slot: _EncodedSlot, frame: np.ndarray, profile: StreamProfile) -> Optional[bytes]:
+        import cv2
+
+        with stage_timer("encode"):
+            if frame.shape[1] != profile.width or frame.shape[0] != profile.height:
+                if slot.resized is not None and slot.resized.shape[:2] != (profile.height, profile.width):
+                    slot.resized = None
+                slot.resized = cv2.resize(
+                    frame, (profile.width, profile.height), dst=slot.resized, interpolation=cv2.INTER_AREA
+                )
+                frame = slot.resized
+            ret, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, profile.quality])
+        return buffer.tobytes() if ret else None
+
+
+def mjpeg_part(data: bytes) -> bytes:
+    return b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + data + b"\r\n"
+
+
+class FramePacer:
+    """Sleeps just long enough to keep a client at or under its ``max_fps``."""
+
+    __slots__ = ("_interval", "_next_due")
+
+    def __init__(self, max_fps: Optional[float]) -> None:
+        self._interval = 1.0 / max_fps if max_fps else 0.0
+        self._next_due = 0.0
+
+    def delay(self) -> float:
+        """Seconds until the next frame may be sent."""
+
+        if not self._interval:
+            return 0.0
+        return max(0.0, self._next_due - time.monotonic())
+
+    def wait(self) -> None:
+        """Call before waiting for a frame, so the frame sent is the newest one."""
+
+        delay = self.delay()
+        if delay:
+            time.sleep(delay)
+
+    def sent(self) -> None:
+        if self._interval:
+            self._next_due = time.monotonic() + self._interval
+
+
+class _Channel:
+    """Latest encoded frame of one profile, published from a producer thread onto an event loop."""
+
+    __slots__ = ("profile", "latest", "subscribers", "closed", "_changed")
+
+    def __init__(self, profile: StreamProfile) -> None:
+        self.profile = profile
+        self.latest: Optional[Tuple[int, bytes]] = None
+        self.subscribers = 0
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def publish(self, encoded: Tuple[int, bytes]) -> None:
+        self.latest = encoded
+        self._notify()
+
+    def close(self) -> None:
+        self.closed = True
+        self._notify()
+
+    def _notify(self) -> None:
+        # Waiters hold the old event; replacing it means each wait sees one change.
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def next(self, last_seq: int) -> Optional[Tuple[int, bytes]]:
+        while True:
+            latest = self.latest
+            if latest is not None and latest[0] != last_seq:
+                return latest
+            if self.closed:
+                return None
+            await self._changed.wait()
+
+
+Producer = Callable[[StreamProfile, Callable[[], bool]], Iterator[Tuple[int, bytes]]]
+
+
+class FrameFeed:
+    """Fans encoded frames out to async stream clients.
+
+    Each distinct profile gets one producer thread iterating ``producer(profile,
+    wanted)``; clients are coroutines awaiting the next published frame, so an
+    extra client costs a waiter rather than a thread and a frame buffer. A slow
+    client skips to the newest frame instead of queueing old ones.
+    """
+
+    def __init__(self, producer: Producer) -> None:
+        self._producer = producer
+        self._channels: Dict[StreamProfile, _Channel] = {}
+
+    async def frames(self, profile: StreamProfile) -> AsyncIterator[bytes]:
+        """Yield multipart parts for one client until the producer stops."""
+
+        channel = self._join(profile, asyncio.get_running_loop())
+        clients = STREAM_CLIENTS.labels(profile.label)
+        clients.inc()
+        try:
+            last_seq = 0
+            while True:
+                encoded = await channel.next(last_seq)
+                if encoded is None:
+                    return
+                last_seq = encoded[0]
+                yield mjpeg_part(encoded[1])
+        finally:
+            clients.dec()
+            channel.subscribers -= 1
+
+    def _join(self, profile: StreamProfile, loop: asyncio.AbstractEventLoop) -> _Channel:
+        channel = self._channels.get(profile)
+        if channel is None:
+            channel = self._channels[profile] = _Channel(profile)
+            self._start(channel, loop)
+        channel.subscribers += 1
+        return channel
+
+    def _start(self, channel: _Channel, loop: asyncio.AbstractEventLoop) -> None:
+        threading.Thread(
+            target=self._produce, args=(channel, loop), name=f"stream-{channel.profile.label}", daemon=True
+        ).start()
+
+    def _produce(self, channel: _Channel, loop: asyncio.AbstractEventLoop) -> None:
+        def wanted() -> bool:
+            return channel.subscribers > 0
+
+        try:
+            for encoded in self._producer(channel.profile, wanted):
+                loop.call_soon_threadsafe(channel.publish, encoded)
+        finally:
+            loop.call_soon_threadsafe(self._finished, channel, loop, not wanted())
+
+    def _finished(self, channel: _Channel, loop: asyncio.AbstractEventLoop, idle: bool) -> None:
+        # A client that joined while an idle producer was winding down needs a new one.
+        if idle and channel.subscribers > 0:
+            self._start(channel, loop)
+            return
+        channel.close()
+        if self._channels.get(channel.profile) is channel:
+            del self._channels[channel.profile]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .analyzer import LANDMARK_SUBSET, FrameAnalysis, analyze_landmarks
+from .configuration import PipelineConfig
+
+if TYPE_CHECKING:
+    from .handlers import AttentionHandler, AttentionUpdate
+
+TRACE_VERSION = 1
+
+
+class LandmarkRecorder:
+    """Collects the landmark subset :class:`~attention_monitor.analyzer.FrameAnalyzer` reads, one row per frame.
+
+    :meth:`record` only appends a float32 copy of the ``(len(indices), 3)``
+    array the backend returned (NaN when no face was found) and a timestamp;
+    :meth:`save` writes everything to a compressed ``.npz`` archive that
+    :meth:`LandmarkTrace.load` reads back.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        indices: Sequence[int] = LANDMARK_SUBSET,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = Path(path)
+        self.indices = list(indices)
+        self._clock = clock
+        self._timestamps: List[float] = []
+        self._landmarks: List[np.ndarray] = []
+        self._frame_shape: Tuple[int, int] = (0, 0)
+        self._started_at = time.time()
+        self._missing = np.full((len(self.indices), 3), np.nan, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def record(self, landmarks: Optional[np.ndarray], frame_shape: Tuple[int, int]) -> None:
+        if not self._timestamps:
+            self._started_at = time.time()
+            self._frame_shape = (int(frame_shape[0]), int(frame_shape[1]))
+        self._timestamps.append(self._clock())
+        self._landmarks.append(self._missing if landmarks is None else landmarks.astype(np.float32))
+
+    def save(self) -> Path:
+        """Write the archive (replacing any earlier one at ``path``) and return its path."""
+
+        timestamps = np.asarray(self._timestamps, dtype=np.float64)
+        if len(timestamps):
+            timestamps -= timestamps[0]
+        landmarks = (
+            np.stack(self._landmarks) if self._landmarks else np.empty((0, len(self.indices), 3), dtype=np.float32)
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("wb") as handle:
+            np.savez_compressed(
+                handle,
+                version=np.int32(TRACE_VERSION),
+                timestamps=timestamps,
+                landmarks=landmarks,
+                indices=np.asarray(self.indices, dtype=np.int32),
+                frame_shape=np.asarray(self._frame_shape, dtype=np.int32),
+                started_at=np.float64(self._started_at),
+            )
+        return self.path
+
+
+@dataclass(slots=True)
+class LandmarkTrace:
+    """A recorded landmark trace: per-frame landmark rows plus seconds since the first frame."""
+
+    timestamps: np.ndarray
+    # (frames, len(indices), 3) float32 pixels; all-NaN rows where no face was found
+    landmarks: np.ndarray
+    indices: np.ndarray
+    frame_shape: Tuple[int, int]
+    # Wall-clock time of the first frame
+    started_at: float = 0.0
+
+    @classmethod
+    def load(cls, path: Path) -> "LandmarkTrace":
+        with np.load(path) as archive:
+            version = int(archive["version"])
+            if version != TRACE_VERSION:
+                raise ValueError(f"{path}: unsupported landmark trace version {version}")
+            trace = cls(
+                timestamps=archive["timestamps"],
+                landmarks=archive["landmarks"],
+                indices=archive["indices"],
+                frame_shape=tuple(int(v) for v in archive["frame_shape"]),  # type: ignore[arg-type]
+                started_at=float(archive["started_at"]),
+            )
+        if list(trace.indices) != LANDMARK_SUBSET:
+            raise ValueError(f"{path}: trace was recorded for a different landmark subset")
+        return trace
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def present(self) -> np.ndarray:
+        return ~np.isnan(self.landmarks[:, 0, 0])
+
+
+class ReplayAnalyzer:
+    """Stands in for ``FrameAnalyzer``: every :meth:`analyze` call consumes the next traced frame.
+
+    The frame passed in is ignored. Landmarks go through the same
+    :func:`~attention_monitor.analyzer.analyze_landmarks` the live analyzer
+    uses, so pose, EAR and everything downstream run exactly as they would
+    behind the camera, without MediaPipe or video decoding.
+    """
+
+    def __init__(self, trace: LandmarkTrace) -> None:
+        self.trace = trace
+        self.position = 0
+        # float64 like a live backend's output, and NaN rows mapped to None up front.
+        self._rows: List[Optional[np.ndarray]] = [
+            landmarks.astype(np.float64) if present else None
+            for landmarks, present in zip(trace.landmarks, trace.present)
+        ]
+
+    @property
+    def exhausted(self) -> bool:
+        return self.position >= len(self._rows)
+
+    def analyze(self, frame: Optional[np.ndarray] = None) -> FrameAnalysis:
+        if self.exhausted:
+            raise IndexError("landmark trace exhausted")
+        landmarks = self._rows[self.position]
+        self.position += 1
+        if landmarks is None:
+            return FrameAnalysis(face_present=False)
+        return analyze_landmarks(landmarks, self.trace.frame_shape)
+
+    def rewind(self) -> None:
+        self.position = 0
+
+    def warm_up(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def replay(
+    trace: LandmarkTrace,
+    config: PipelineConfig,
+    handlers: Sequence[AttentionHandler] = (),
+) -> Iterator[AttentionUpdate]:
+    """Run ``trace`` through a pipeline with ``handlers`` as fast as it will go, yielding each update.
+
+    The attention windows see the trace's own timestamps (offset onto the
+    monotonic clock), so window fractions and interventions match the
+    recorded session rather than the replay speed.
+    """
+
+    from .pipeline import AttentionMonitorPipeline
+
+    analyzer = ReplayAnalyzer(trace)
+    pipeline = AttentionMonitorPipeline(config, frame_analyzer=analyzer, handlers=list(handlers))  # type: ignore[arg-type]
+    base = time.monotonic()
+    try:
+        for timestamp in trace.timestamps:
+            yield pipeline.process(None, now=base + float(timestamp))  # type: ignore[arg-type]
+    finally:
+        pipeline.close()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Collection, Deque, Dict, Iterable, List, Mapping, Optional
+
+SESSION = "session"
+NEGATIVE_STATES = frozenset({"not_present", "looking_away", "sleeping"})
+
+
+class _Run:
+    """Consecutive observations of one state, shared by every window that holds it."""
+
+    __slots__ = ("state", "start", "end")
+
+    def __init__(self, state: str, start: float, end: float) -> None:
+        self.state = state
+        self.start = start
+        self.end = end
+
+
+class _Window:
+    __slots__ = ("span", "runs", "totals")
+
+    def __init__(self, span: Optional[float]) -> None:
+        self.span = span
+        self.runs: Deque[_Run] = deque()
+        self.totals: Dict[str, float] = {}
+
+    def clipped(self, now: float) -> Dict[str, float]:
+        """Seconds per state that have slid out of the window since the last eviction.
+
+        Right after an observation only the oldest run can straddle the window
+        start, so this normally looks at a single run.
+        """
+
+        excess: Dict[str, float] = {}
+        if self.span is None:
+            return excess
+        start = now - self.span
+        for run in self.runs:
+            if run.start >= start:
+                break
+            excess[run.state] = excess.get(run.state, 0.0) + min(run.end, start) - run.start
+        return excess
+
+
+class AttentionWindows:
+    """Seconds spent in each state over several sliding time windows.
+
+    Each observation covers the time since the previous one, so the answer is
+    in seconds whatever the sampling interval. Consecutive observations of the
+    same state extend one run instead of adding entries, every window keeps
+    running per-state totals, and runs that slide out are subtracted as they
+    leave. An observation costs O(1) amortized and a query O(number of
+    states), independent of window length or frame rate.
+
+    Windows are named by their span in seconds ("30s", "300s"); ``"session"``
+    covers everything since the last :meth:`reset`.
+    """
+
+    def __init__(self, spans: Iterable[float], default_interval: float) -> None:
+        self.default_interval = default_interval
+        self._windows: Dict[str, _Window] = {window_name(span): _Window(span) for span in sorted(set(spans))}
+        self._windows[SESSION] = _Window(None)
+        self._current: Optional[_Run] = None
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._windows)
+
+    def reset(self) -> None:
+        for window in self._windows.values():
+            window.runs.clear()
+            window.totals.clear()
+        self._current = None
+
+    def observe(self, state: str, now: float) -> None:
+        """Credit ``state`` with the time since the previous observation (``default_interval`` for the first)."""
+
+        run = self._current
+        elapsed = self.default_interval if run is None else max(0.0, now - run.end)
+        if run is None or run.state != state:
+            run = self._current = _Run(state, now - elapsed, now)
+            for window in self._windows.values():
+                window.runs.append(run)
+        else:
+            run.end = now
+        for window in self._windows.values():
+            window.totals[state] = window.totals.get(state, 0.0) + elapsed
+            self._evict(window, now)
+
+    def seconds(self, window: str, now: float) -> Dict[str, float]:
+        """Seconds per state inside ``window`` as of ``now``."""
+
+        win = self._windows[window]
+        totals = dict(win.totals)
+        for state, seconds in win.clipped(now).items():
+            totals[state] = max(0.0, totals[state] - seconds)
+        return totals
+
+    def coverage(self, window: str, now: float) -> float:
+        """Observed seconds inside ``window``; a window is full once this reaches its span."""
+
+        return sum(self.seconds(window, now).values())
+
+    def fraction(self, window: str, states: Collection[str], now: float) -> float:
+        """Share of observed time in ``window`` spent in any of ``states`` (0.0 before any observation)."""
+
+        totals = self.seconds(window, now)
+        observed = sum(totals.values())
+        if observed <= 0:
+            return 0.0
+        return sum(seconds for state, seconds in totals.items() if state in states) / observed
+
+    def is_full(self, window: str, now: float) -> bool:
+        span = self._windows[window].span
+        # Half an interval of slack so sampling jitter does not keep a window "almost full".
+        return span is None or self.coverage(window, now) >= span - self.default_interval / 2
+
+    def summary(self, states: Collection[str], now: float) -> Mapping[str, float]:
+        """``{window name: fraction in states}`` for every window, rounded for JSON payloads."""
+
+        return {name: round(self.fraction(name, states, now), 3) for name in self._windows}
+
+    @staticmethod
+    def _evict(window: _Window, now: float) -> None:
+        if window.span is None:
+            return
+        start = now - window.span
+        runs = window.runs
+        while runs and runs[0].end <= start:
+            run = runs.popleft()
+            remaining = window.totals[run.state] - (run.end - run.start)
+            window.totals[run.state] = remaining if remaining > 1e-9 else 0.0
+
+
+def window_name(span: float) -> str:
+    return f"{span:g}s"
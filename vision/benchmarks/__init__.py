@@ -0,0 +1,7 @@
+"""Headless performance benchmarks for the vision stack.
+
+Run from the ``vision`` directory::
+
+    python -m benchmarks run --output bench.json
+    python -m benchmarks compare baseline.json bench.json
+"""
@@ -0,0 +1,314 @@
+"""Run the vision benchmark suites or compare two saved reports."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .results import compare_reports, environment, format_comparison, load_report, write_report
+
+SUITES = ("imports", "stages", "allocations", "server", "escalation", "backends", "replay", "logs", "events")
+
+
+def _run(args: argparse.Namespace) -> int:
+    suites = args.suite or list(SUITES)
+    results = {}
+    if "imports" in suites:
+        from .imports import run_import_benchmarks
+
+        results.update(run_import_benchmarks(runs=args.import_runs))
+    if "stages" in suites:
+        from .stages import run_stage_benchmarks
+
+        results.update(
+            run_stage_benchmarks(
+                frames_source=args.frames,
+                iterations=args.iterations,
+                inference_iterations=args.inference_iterations,
+            )
+        )
+    if "allocations" in suites:
+        from .allocations import run_allocation_benchmarks
+
+        results.update(run_allocation_benchmarks(iterations=args.iterations))
+    if "server" in suites:
+        from .server import run_server_benchmarks
+
+        results.update(
+            run_server_benchmarks(
+                frames_source=args.frames,
+                clients=args.clients,
+                status_requests=args.status_requests,
+                stream_frames=args.stream_frames,
+                camera_fps=args.camera_fps,
+                session_cycles=args.session_cycles,
+            )
+        )
+    if "escalation" in suites:
+        from .escalation import run_escalation_benchmarks
+
+        results.update(run_escalation_benchmarks(alerts=args.alerts))
+    if "backends" in suites:
+        from .backends import run_backend_benchmarks
+
+        results.update(
+            run_backend_benchmarks(
+                frames_source=args.frames,
+                onnx_model=args.onnx_model,
+                face_landmarker_model=args.face_landmarker_model,
+                threads=args.threads,
+            )
+        )
+    if "replay" in suites:
+        from .replay import run_replay_benchmarks
+
+        results.update(run_replay_benchmarks(trace_path=args.trace))
+    if "logs" in suites:
+        from .logs import run_logging_benchmarks
+
+        results.update(run_logging_benchmarks(iterations=args.iterations * 10))
+    if "events" in suites:
+        from .eventlog import run_event_log_benchmarks
+
+        results.update(run_event_log_benchmarks(iterations=args.iterations))
+
+    meta = environment()
+    meta["suites"] = suites
+    meta["frames"] = str(args.frames) if args.frames else "synthetic"
+    report = write_report(args.output, meta, results)
+
+    if args.baseline is None:
+        return 0
+    return _report_comparison(load_report(args.baseline), report, args.tolerance)
+
+
+def _check_imports(args: argparse.Namespace) -> int:
+    from .imports import check_imports, run_import_benchmarks
+
+    results = run_import_benchmarks(runs=args.runs)
+    for name, result in results.items():
+        print(f"{name:<32} {result['p50'] * 1000:8.1f} ms  {result['modules_loaded']} modules", file=sys.stderr)
+    failures = check_imports(results, args.budget)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _loadtest(args: argparse.Namespace) -> int:
+    from .loadtest import run_load_test
+
+    results, failures = run_load_test(
+        mode=args.mode,
+        steps=args.steps,
+        duration=args.duration,
+        camera_fps=args.camera_fps,
+        stream_query=args.stream_query,
+        status_interval=args.status_interval,
+        max_rss_growth_mb=args.max_rss_growth,
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<24} streams {result['stream_fps_mean']:5.1f} fps (min {result['stream_fps_min']:5.1f})  "
+            f"status p50 {result['p50'] * 1000:6.1f} ms p99 {result['p99'] * 1000:6.1f} ms  "
+            f"rss {result['rss_max_mb'] or 0:6.1f} MB  threads {result['threads_max']}",
+            file=sys.stderr,
+        )
+    meta = environment()
+    meta.update(suites=["loadtest"], mode=args.mode, camera_fps=args.camera_fps, stream_query=args.stream_query)
+    write_report(args.output, meta, results)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _simulate(args: argparse.Namespace) -> int:
+    from .simulation import run_simulation
+
+    results, failures = run_simulation(
+        sessions=args.sessions,
+        mode=args.mode,
+        episodes=args.episodes,
+        time_scale=args.time_scale,
+        streams=args.streams,
+        status_interval=args.status_interval,
+        camera_fps=args.camera_fps,
+        seed=args.seed,
+    )
+    status, ticks = results["simulation.status"], results["simulation.ticks"]
+    print(
+        f"{args.sessions} sessions  status {status['throughput']:7.1f} req/s p50 {status['p50'] * 1000:6.1f} ms "
+        f"p99 {status['p99'] * 1000:6.1f} ms  ticks {ticks['value']:7.1f}/s ({ticks['tick_ratio']:.0%} of schedule)",
+        file=sys.stderr,
+    )
+    for state in ("sleeping", "looking_away", "not_present"):
+        result = results[f"simulation.escalation.{state}"]
+        late = f"  late p50 {result['p50']:.2f}s p99 {result['p99']:.2f}s" if "p50" in result else ""
+        print(f"{state:<14} fired {result['fired']}/{result['expected']}  unexpected {result['unexpected']}{late}",
+              file=sys.stderr)
+    meta = environment()
+    meta.update(suites=["simulation"], mode=args.mode, sessions=args.sessions, time_scale=args.time_scale)
+    write_report(args.output, meta, results)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _soak(args: argparse.Namespace) -> int:
+    from .soak import run_soak
+
+    results, failures = run_soak(
+        duration=args.duration,
+        sessions=args.sessions,
+        time_scale=args.time_scale,
+        camera_fps=args.camera_fps,
+        streams=args.streams,
+        status_interval=args.status_interval,
+        churn_interval=args.churn_interval,
+        churn_fraction=args.churn_fraction,
+        sample_interval=args.sample_interval,
+        warmup=args.warmup,
+        max_rss_growth_mb=args.max_rss_growth,
+        max_thread_growth=args.max_thread_growth,
+        max_fd_growth=args.max_fd_growth,
+        max_traced_growth_mb=args.max_traced_growth,
+        seed=args.seed,
+    )
+    for name in ("rss_mb", "threads", "fds", "traced_mb"):
+        result = results.get(f"soak.{name}")
+        if result is not None:
+            print(
+                f"{name:<10} {result['baseline']:9.1f} -> {result['final']:9.1f}  growth {result['growth']:+8.1f} "
+                f"(limit {result['limit']:g})  slope {result['slope_per_hour']:+8.1f}/h",
+                file=sys.stderr,
+            )
+    for site in results["soak.top_allocators"]["sites"][:5]:
+        print(f"  {site['size_diff_kib']:+9.1f} KiB  {site['site']}", file=sys.stderr)
+    meta = environment()
+    meta.update(suites=["soak"], duration=args.duration, sessions=args.sessions, time_scale=args.time_scale)
+    write_report(args.output, meta, results)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _capture_trace(args: argparse.Namespace) -> int:
+    from .replay import capture_trace
+
+    path = capture_trace(args.frames, args.output, args.count, args.fps, args.width, args.height)
+    print(f"wrote {path}", file=sys.stderr)
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    return _report_comparison(load_report(args.baseline), load_report(args.current), args.tolerance)
+
+
+def _report_comparison(baseline, current, tolerance: float) -> int:
+    rows = compare_reports(baseline, current, tolerance=tolerance)
+    print(format_comparison(rows), file=sys.stderr)
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed beyond {tolerance:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run benchmark suites and write a JSON report.")
+    run.add_argument("--suite", action="append", choices=SUITES, help="Suite to run (repeatable; default all).")
+    run.add_argument("--frames", type=Path, help="Video file or image directory; synthetic frames if omitted.")
+    run.add_argument("--output", type=Path, help="Report path; printed to stdout if omitted.")
+    run.add_argument("--baseline", type=Path, help="Compare against this saved report and fail on regressions.")
+    run.add_argument("--tolerance", type=float, default=0.15, help="Allowed fractional slowdown (default 0.15).")
+    run.add_argument("--iterations", type=int, default=200)
+    run.add_argument("--inference-iterations", type=int, default=50)
+    run.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    run.add_argument("--status-requests", type=int, default=200)
+    run.add_argument("--stream-frames", type=int, default=60)
+    run.add_argument("--camera-fps", type=float, default=30.0, help="Pace the synthetic camera (default 30).")
+    run.add_argument("--import-runs", type=int, default=5, help="Fresh interpreters per import benchmark.")
+    run.add_argument("--session-cycles", type=int, default=5, help="Start/stop cycles for session start latency.")
+    run.add_argument("--alerts", type=int, default=8, help="Escalations per fault scenario.")
+    run.add_argument("--onnx-model", type=Path, help="ONNX face-landmark model to compare against MediaPipe.")
+    run.add_argument(
+        "--face-landmarker-model", type=Path, help="face_landmarker.task bundle to compare against FaceMesh + PnP."
+    )
+    run.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4], help="ONNX Runtime intra-op thread counts.")
+    run.add_argument("--trace", type=Path, help="Landmark trace to replay; a scripted synthetic one if omitted.")
+    run.set_defaults(handler=_run)
+
+    check = commands.add_parser("check-imports", help="Fail if entry points import cv2/mediapipe or exceed a budget.")
+    check.add_argument("--budget", type=float, default=0.5, help="Median import budget in seconds (default 0.5).")
+    check.add_argument("--runs", type=int, default=5)
+    check.set_defaults(handler=_check_imports)
+
+    load = commands.add_parser("loadtest", help="Ramp concurrent stream/status clients against a local server.")
+    load.add_argument("--mode", choices=("asgi", "flask"), default="asgi", help="Serving mode (default asgi).")
+    load.add_argument("--steps", type=int, nargs="+", default=[1, 12, 24, 48], help="Clients of each kind per step.")
+    load.add_argument("--duration", type=float, default=10.0, help="Seconds per step (default 10).")
+    load.add_argument("--camera-fps", type=float, default=30.0)
+    load.add_argument("--stream-query", default="", help="Query string for /video_feed, e.g. '?width=320&fps=15'.")
+    load.add_argument("--status-interval", type=float, default=0.1, help="Seconds between polls per status client.")
+    load.add_argument("--max-rss-growth", type=float, default=64.0, help="Allowed server RSS growth in MB.")
+    load.add_argument("--output", type=Path, help="Report path; printed to stdout if omitted.")
+    load.set_defaults(handler=_loadtest)
+
+    simulate = commands.add_parser(
+        "simulate", help="Drive many scripted sessions through a local server and check their escalations."
+    )
+    simulate.add_argument("--sessions", type=int, default=200, help="Simulated sessions (default 200).")
+    simulate.add_argument("--mode", choices=("scripted", "random"), default="scripted", help="Episode scripts.")
+    simulate.add_argument("--episodes", type=int, default=6, help="Distraction episodes per random script.")
+    simulate.add_argument("--time-scale", type=float, default=0.2, help="Scale for thresholds and tick interval.")
+    simulate.add_argument("--streams", type=int, default=4, help="Sessions that also get a /video_feed viewer.")
+    simulate.add_argument("--status-interval", type=float, default=0.5, help="Seconds between polls per session.")
+    simulate.add_argument("--camera-fps", type=float, default=15.0, help="Frame rate of each synthetic camera.")
+    simulate.add_argument("--seed", type=int, default=0)
+    simulate.add_argument("--output", type=Path, help="Report path; printed to stdout if omitted.")
+    simulate.set_defaults(handler=_simulate)
+
+    soak = commands.add_parser("soak", help="Run simulated sessions for a long time; fail on resource growth.")
+    soak.add_argument("--duration", type=float, default=3600.0, help="Seconds to run (default 3600).")
+    soak.add_argument("--sessions", type=int, default=50)
+    soak.add_argument("--time-scale", type=float, default=0.1, help="Scale for thresholds and tick interval.")
+    soak.add_argument("--camera-fps", type=float, default=15.0)
+    soak.add_argument("--streams", type=int, default=2, help="Sessions with a /video_feed viewer.")
+    soak.add_argument("--status-interval", type=float, default=0.5)
+    soak.add_argument("--churn-interval", type=float, default=30.0, help="Seconds between session restarts.")
+    soak.add_argument("--churn-fraction", type=float, default=0.2, help="Share of sessions restarted each time.")
+    soak.add_argument("--sample-interval", type=float, default=5.0)
+    soak.add_argument("--warmup", type=float, default=60.0, help="Seconds before the baseline sample.")
+    soak.add_argument("--max-rss-growth", type=float, default=64.0, help="Allowed RSS growth in MB.")
+    soak.add_argument("--max-thread-growth", type=int, default=8)
+    soak.add_argument("--max-fd-growth", type=int, default=16)
+    soak.add_argument("--max-traced-growth", type=float, default=32.0, help="Allowed tracemalloc growth in MB.")
+    soak.add_argument("--seed", type=int, default=0)
+    soak.add_argument("--output", type=Path, help="Report path; printed to stdout if omitted.")
+    soak.set_defaults(handler=_soak)
+
+    capture = commands.add_parser("capture-trace", help="Record a landmark trace from a clip for the replay suite.")
+    capture.add_argument("--frames", type=Path, required=True, help="Video file or image directory.")
+    capture.add_argument("--output", type=Path, required=True, help="Trace archive to write (.npz).")
+    capture.add_argument("--count", type=int, default=900, help="Frames to record (default 900).")
+    capture.add_argument("--fps", type=float, default=30.0, help="Frame rate for the recorded timestamps.")
+    capture.add_argument("--width", type=int, default=640)
+    capture.add_argument("--height", type=int, default=480)
+    capture.set_defaults(handler=_capture_trace)
+
+    compare = commands.add_parser("compare", help="Compare two saved reports.")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("current", type=Path)
+    compare.add_argument("--tolerance", type=float, default=0.15)
+    compare.set_defaults(handler=_compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Per-frame allocation churn of the capture/resize/color-convert path, via tracemalloc."""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from attention_monitor.buffers import FrameBufferPool
+
+from .frames import SyntheticCapture, load_frames
+from .results import Result, summarize
+
+# (camera size, target size): the server keeps 640x480, the pipeline defaults to 640x360.
+SCENARIOS = {
+    "same_size": ((640, 480), (640, 480)),
+    "resize": ((640, 480), (640, 360)),
+}
+
+
+def _allocating_tick(cap: SyntheticCapture, width: int, height: int) -> Callable[[], Optional[np.ndarray]]:
+    """The pre-pool path: fresh capture, unconditional resize and a new RGB array each tick."""
+
+    def tick() -> Optional[np.ndarray]:
+        ret, frame = cap.read()
+        if not ret:
+            return None
+        resized = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+
+    return tick
+
+
+def _pooled_tick(cap: SyntheticCapture, width: int, height: int) -> Callable[[], Optional[np.ndarray]]:
+    buffers = FrameBufferPool(width, height)
+
+    def tick() -> Optional[np.ndarray]:
+        frame = buffers.read(cap)
+        if frame is None:
+            return None
+        return buffers.to_rgb(frame)
+
+    return tick
+
+
+def _profile(tick: Callable[[], Optional[np.ndarray]], iterations: int) -> Result:
+    for _ in range(5):
+        tick()
+    peaks: List[float] = []
+    durations: List[float] = []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            tick()
+            durations.append(time.perf_counter() - start)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(float(peak - before))
+    finally:
+        tracemalloc.stop()
+    result = summarize(durations)
+    result["bytes_per_frame"] = sum(peaks) / len(peaks)
+    result["max_bytes_per_frame"] = max(peaks)
+    result["primary"] = "bytes_per_frame"
+    return result
+
+
+def run_allocation_benchmarks(iterations: int = 200) -> Dict[str, Result]:
+    results: Dict[str, Result] = {}
+    for name, ((cam_w, cam_h), (width, height)) in SCENARIOS.items():
+        frames = load_frames(None, 5, (cam_w, cam_h))
+        for variant, factory in (("allocating", _allocating_tick), ("pooled", _pooled_tick)):
+            result = _profile(factory(SyntheticCapture(frames), width, height), iterations)
+            result.update(camera=f"{cam_w}x{cam_h}", target=f"{width}x{height}")
+            results[f"allocations.{name}.{variant}"] = result
+    return results
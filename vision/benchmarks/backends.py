@@ -0,0 +1,183 @@
+"""Landmark backends side by side: latency, CPU use and agreement with MediaPipe.
+
+Every frame goes through MediaPipe (the reference) and through ONNX Runtime at
+each intra-op thread count. Frames are fed in order, as a camera would deliver
+them, so both backends track the way they do in the pipeline. Latency covers
+one backend ``landmarks()`` call on an RGB frame.
+
+CPU is process CPU seconds per frame, ONNX Runtime's pool threads included,
+plus the average number of cores kept busy. Agreement compares each ONNX
+result with MediaPipe's on the same frame:
+- how often the two agree that a face is present;
+- landmark distance normalized by the reference inter-ocular distance (NME);
+- mean absolute yaw, pitch and EAR differences.
+
+With ``--face-landmarker-model`` the whole analyzer is compared as well:
+FrameAnalyzer (FaceMesh + solvePnP) against FaceLandmarkerAnalyzer (pose from
+the transformation matrix), per-frame ``analyze()`` latency plus how often the
+two agree on face presence and on the classified attention state.
+
+Pass a recorded clip with ``--frames``. Synthetic frames contain no face, so
+only latency and presence agreement mean anything on them.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from attention_monitor.analyzer import (
+    LANDMARK_SUBSET,
+    AttentionClassifier,
+    FrameAnalyzer,
+    _LEFT_EYE_ROWS,
+    _POSE_ROWS,
+    _RIGHT_EYE_ROWS,
+    _estimate_pose,
+    _eye_aspect_ratio,
+)
+from attention_monitor.backends import LandmarkBackend, MediaPipeBackend, OnnxLandmarkBackend
+from attention_monitor.configuration import PipelineConfig
+
+from .frames import load_frames
+from .results import Result, summarize
+
+# (landmarks or None, (yaw, pitch, ear)) per frame
+Outputs = List[Tuple[Optional[np.ndarray], Optional[Tuple[float, float, float]]]]
+
+_EYE_CORNERS = (LANDMARK_SUBSET.index(33), LANDMARK_SUBSET.index(263))
+
+
+def run_backend_benchmarks(
+    *,
+    frames_source: Optional[Path] = None,
+    onnx_model: Optional[Path] = None,
+    face_landmarker_model: Optional[Path] = None,
+    threads: Sequence[int] = (1, 2, 4),
+    frame_count: int = 60,
+    passes: int = 3,
+    width: int = 640,
+    height: int = 480,
+) -> Dict[str, Result]:
+    frames = load_frames(frames_source, frame_count, (width, height))
+    rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+
+    results: Dict[str, Result] = {}
+    samples, cpu, reference = _run(MediaPipeBackend(LANDMARK_SUBSET), rgb_frames, passes)
+    results["backends.mediapipe"] = summarize(samples, **cpu, face_rate=_face_rate(reference))
+    if face_landmarker_model is not None:
+        results.update(_compare_analyzers(frames, face_landmarker_model, passes, width, height))
+    if onnx_model is None:
+        results["backends.mediapipe"]["note"] = "pass --onnx-model to compare an ONNX Runtime landmark model"
+        return results
+
+    for count in threads:
+        backend = OnnxLandmarkBackend(LANDMARK_SUBSET, onnx_model, threads=count)
+        samples, cpu, outputs = _run(backend, rgb_frames, passes)
+        results[f"backends.onnx.t{count}"] = summarize(
+            samples, threads=count, **cpu, face_rate=_face_rate(outputs), **_agreement(reference, outputs)
+        )
+    return results
+
+
+def _run(backend: LandmarkBackend, rgb_frames: List[np.ndarray], passes: int) -> Tuple[List[float], Dict[str, float], Outputs]:
+    height, width = rgb_frames[0].shape[:2]
+    backend.warm_up(width, height)
+    samples: List[float] = []
+    outputs: Outputs = []
+    clock = time.perf_counter
+    cpu_start, wall_start = time.process_time(), clock()
+    try:
+        for _ in range(passes):
+            for rgb in rgb_frames:
+                start = clock()
+                landmarks = backend.landmarks(rgb)
+                samples.append(clock() - start)
+                outputs.append((landmarks, _metrics(landmarks, (height, width))))
+    finally:
+        backend.close()
+    cpu_seconds = time.process_time() - cpu_start
+    wall_seconds = clock() - wall_start
+    cpu = {
+        "cpu_seconds_per_frame": cpu_seconds / len(samples),
+        "cores_busy": cpu_seconds / wall_seconds if wall_seconds else 0.0,
+    }
+    return samples, cpu, outputs
+
+
+def _compare_analyzers(
+    frames: List[np.ndarray], model_path: Path, passes: int, width: int, height: int
+) -> Dict[str, Result]:
+    from attention_monitor.landmarker import FaceLandmarkerAnalyzer
+
+    config = PipelineConfig(frame_width=width, frame_height=height)
+    runs = {
+        "analyzer.facemesh_pnp": FrameAnalyzer(config),
+        "analyzer.face_landmarker": FaceLandmarkerAnalyzer(
+            config.with_overrides(inference_backend="face_landmarker", face_landmarker_model_path=model_path)
+        ),
+    }
+    results: Dict[str, Result] = {}
+    states: Dict[str, List[Tuple[bool, str]]] = {}
+    for name, analyzer in runs.items():
+        classifier = AttentionClassifier(config)
+        analyzer.warm_up()
+        samples: List[float] = []
+        states[name] = []
+        closed_frames = 0
+        try:
+            for _ in range(passes):
+                for frame in frames:
+                    start = time.perf_counter()
+                    analysis = analyzer.analyze(frame)
+                    samples.append(time.perf_counter() - start)
+                    state, closed_frames = classifier.classify(analysis, closed_frames)
+                    states[name].append((analysis.face_present, state))
+        finally:
+            analyzer.close()
+        results[name] = summarize(samples, face_rate=sum(present for present, _ in states[name]) / len(samples))
+
+    reference, candidate = states["analyzer.facemesh_pnp"], states["analyzer.face_landmarker"]
+    results["analyzer.face_landmarker"].update(
+        presence_agreement=sum(a[0] == b[0] for a, b in zip(reference, candidate)) / len(reference),
+        state_agreement=sum(a[1] == b[1] for a, b in zip(reference, candidate)) / len(reference),
+    )
+    return results
+
+
+def _metrics(landmarks: Optional[np.ndarray], shape: Tuple[int, int]) -> Optional[Tuple[float, float, float]]:
+    if landmarks is None:
+        return None
+    yaw, pitch, _ = _estimate_pose(landmarks, shape, _POSE_ROWS)
+    ear = (_eye_aspect_ratio(landmarks, _LEFT_EYE_ROWS) + _eye_aspect_ratio(landmarks, _RIGHT_EYE_ROWS)) / 2
+    return float(yaw), float(pitch), float(ear)
+
+
+def _face_rate(outputs: Outputs) -> float:
+    return sum(landmarks is not None for landmarks, _ in outputs) / len(outputs)
+
+
+def _agreement(reference: Outputs, candidate: Outputs) -> Dict[str, Optional[float]]:
+    presence = [(ref is None) == (got is None) for (ref, _), (got, _) in zip(reference, candidate)]
+    errors: List[float] = []
+    deltas: List[Tuple[float, float, float]] = []
+    for (ref, ref_metrics), (got, got_metrics) in zip(reference, candidate):
+        if ref is None or got is None:
+            continue
+        interocular = float(np.linalg.norm(ref[_EYE_CORNERS[0], :2] - ref[_EYE_CORNERS[1], :2]))
+        if interocular > 0:
+            errors.append(float(np.linalg.norm(ref[:, :2] - got[:, :2], axis=1).mean()) / interocular)
+        deltas.append(tuple(abs(a - b) for a, b in zip(ref_metrics, got_metrics)))  # type: ignore[arg-type]
+    both = np.array(deltas) if deltas else None
+    return {
+        "presence_agreement": sum(presence) / len(presence),
+        "frames_compared": len(deltas),
+        "nme": float(np.mean(errors)) if errors else None,
+        "yaw_mae": float(both[:, 0].mean()) if both is not None else None,
+        "pitch_mae": float(both[:, 1].mean()) if both is not None else None,
+        "ear_mae": float(both[:, 2].mean()) if both is not None else None,
+    }
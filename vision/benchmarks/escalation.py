@@ -0,0 +1,92 @@
+"""Escalation latency with the outbound services healthy, slow, failing or hung.
+
+Points the vision server's integrations at :mod:`benchmarks.stubs` and, for
+each fault scenario, times sleep alerts (``wake_up_audio``) and strikes
+(``increment_strikes_supabase`` under the escalation budget). A sleep alert
+must finish within its budget whatever the services do, falling back to the
+canned message or the local tone; once a breaker opens, later escalations
+should fail fast instead of paying the timeout again.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import logging
+import time
+from typing import Dict, List
+
+from .results import Result, summarize
+from .stubs import SERVICES, StubServices, point_server_at
+
+HANG = 60.0
+SCENARIOS = {
+    "healthy": {},
+    "gemini_slow": {"gemini": {"delay": HANG}},
+    "fish_error": {"fish": {"status": 503}},
+    "supabase_down": {"supabase": {"drop": True}},
+    "all_hung": {service: {"delay": HANG} for service in SERVICES},
+}
+
+
+def run_escalation_benchmarks(*, alerts: int = 8) -> Dict[str, Result]:
+    import vision_server as core
+    from attention_monitor.outbound import breaker, breaker_states, deadline_budget
+
+    results: Dict[str, Result] = {}
+    with StubServices() as stubs, contextlib.redirect_stdout(io.StringIO()), _quiet_logs():
+        point_server_at(core, stubs.url)
+        for name, faults in SCENARIOS.items():
+            stubs.heal()
+            for service in SERVICES:
+                breaker(service).reset()
+            for service, fault in faults.items():
+                stubs.inject(service, **fault)
+            before = dict(stubs.requests)
+
+            sleep_samples: List[float] = []
+            fallbacks = 0
+            for _ in range(alerts):
+                start = time.perf_counter()
+                audio = core.wake_up_audio("benchmarking")
+                sleep_samples.append(time.perf_counter() - start)
+                fallbacks += audio is None
+
+            sleep_upstream = {service: stubs.requests[service] - before[service] for service in SERVICES}
+            sleep_breakers = breaker_states()
+
+            strike_samples: List[float] = []
+            for _ in range(alerts):
+                start = time.perf_counter()
+                with deadline_budget(core.ESCALATION_BUDGET):
+                    core.increment_strikes_supabase()
+                strike_samples.append(time.perf_counter() - start)
+
+            upstream = {service: stubs.requests[service] - before[service] - sleep_upstream[service] for service in SERVICES}
+            results[f"escalation.sleep_alert.{name}"] = summarize(
+                sleep_samples,
+                budget=core.SLEEP_ALERT_BUDGET,
+                within_budget=max(sleep_samples) <= core.SLEEP_ALERT_BUDGET + 0.25,
+                tone_fallbacks=fallbacks,
+                breakers=sleep_breakers,
+                upstream_requests=sleep_upstream,
+            )
+            results[f"escalation.strike.{name}"] = summarize(
+                strike_samples,
+                budget=core.ESCALATION_BUDGET,
+                within_budget=max(strike_samples) <= core.ESCALATION_BUDGET + 0.25,
+                breakers=breaker_states(),
+                upstream_requests=upstream,
+            )
+        stubs.heal()
+    return results
+
+
+@contextlib.contextmanager
+def _quiet_logs():
+    # Every scenario fails on purpose; the server's warnings about it are noise here.
+    logging.disable(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,159 @@
+"""Cost of reading attention history back: a page from a cursor or a time, against scanning the log.
+
+Before the offset index, finding the events after some time meant reading and
+parsing the JSONL log from its first line; with it, a time query bisects the
+segment's sparse index and reads at most ``index_interval`` bytes before the
+first match, and a cursor query seeks straight to its byte offset. Both should
+stay flat as the log grows, while the scan grows with it.
+
+The ``history`` results summarize 90 days per hour, first from raw events
+alone and then once :class:`~attention_monitor.history.HistoryStore` has
+compacted them into minute and hour rollups, with the disk use of each;
+``history_idle_compaction`` compacts a log that has been idle past its raw
+retention and fails the run if that does not roll up and remove it.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from attention_monitor.eventlog import EventLog, parse_timestamp_ns
+from attention_monitor.events import AttentionEvent
+from attention_monitor.history import DAY, HOUR, MINUTE, HistoryStore
+
+from .results import Result, measure, summarize
+
+STATES = ("attentive", "looking_away", "sleeping", "not_present")
+
+
+def _event(index: int, start_ns: int) -> AttentionEvent:
+    return AttentionEvent(
+        start_ns + index * 500_000_000,
+        STATES[index // 40 % len(STATES)],
+        True,
+        float(index % 60 - 30),
+        float(index % 20 - 10),
+        0.0,
+        0.28,
+        0.29,
+        0.285,
+        0.5,
+        f"bench-{index % 8}",
+    )
+
+
+def _scan(log: EventLog, start_ns: int, limit: int) -> int:
+    """Lines at or after ``start_ns`` the way the unindexed log was read: every line parsed from the top."""
+
+    found = 0
+    for segment in log.segments():
+        with segment.path.open("rb") as handle:
+            for raw in handle:
+                if parse_timestamp_ns(json.loads(raw)["timestamp"]) >= start_ns:
+                    found += 1
+                    if found >= limit:
+                        return found
+    return found
+
+
+def run_event_log_benchmarks(*, iterations: int = 200, events: int = 50_000, limit: int = 100) -> Dict[str, Result]:
+    start_ns = 1_700_000_000_000_000_000
+    results: Dict[str, Result] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "events.jsonl"
+        log = EventLog(path, segment_bytes=4 << 20)
+        counter = itertools.count()
+        results["events.append"] = measure(
+            lambda: log.append(_event(next(counter), start_ns)), iterations=events - 5, warmup=5
+        )
+        meta = {"events": events, "limit": limit, "segments": len(log.segments())}
+
+        # Three quarters of the way through, so the scan has most of the log to get past.
+        target_ns = start_ns + events * 3 // 4 * 500_000_000
+        cursor = log.read(start_ns=target_ns, limit=1).next_cursor
+        results["events.page_from_cursor"] = measure(
+            lambda: log.read(cursor=cursor, limit=limit), iterations=iterations, **meta
+        )
+        results["events.page_from_time"] = measure(
+            lambda: log.read(start_ns=target_ns, limit=limit), iterations=iterations, **meta
+        )
+        results["events.page_one_session"] = measure(
+            lambda: log.read(cursor=cursor, limit=limit, session="bench-3"), iterations=iterations, **meta
+        )
+        results["events.full_scan_from_time"] = measure(
+            lambda: _scan(log, target_ns, limit), iterations=max(iterations // 20, 3), warmup=1, **meta
+        )
+        log.close()
+    results.update(_history_benchmarks(iterations=max(iterations // 20, 3)))
+    return results
+
+
+def _history_benchmarks(*, iterations: int, days: int = 120, sessions: int = 2, step: int = 300) -> Dict[str, Result]:
+    """``days`` of ``sessions`` logging every ``step`` seconds, queried before and after compaction."""
+
+    now = time.time()
+    start_ns = int((now - days * DAY) * 1e9)
+    results: Dict[str, Result] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        log = EventLog(Path(directory) / "events.jsonl", segment_bytes=4 << 20, segment_seconds=DAY)
+        for index in range(days * DAY // step):
+            for session in range(sessions):
+                event = _event(index, start_ns)
+                event.timestamp_ns = start_ns + index * step * 1_000_000_000
+                event.frame_interval_seconds = float(step)
+                event.session = f"bench-{session}"
+                log.append(event)
+        store = HistoryStore(log)
+        span = (int((now - 90 * DAY) * 1e9), int(now * 1e9))
+
+        def disk() -> int:
+            return sum(path.stat().st_size for path in Path(directory).iterdir())
+
+        meta = {"days": days, "sessions": sessions, "event_interval_s": step}
+        results["events.history_90d_raw"] = measure(
+            lambda: store.rollups(*span, seconds=HOUR), iterations=iterations, warmup=1, disk_bytes=disk(), **meta
+        )
+        store.compact(now)
+        results["events.history_90d_tiered"] = measure(
+            lambda: store.rollups(*span, seconds=HOUR), iterations=iterations, warmup=1, disk_bytes=disk(), **meta
+        )
+        last_day = (int((now - DAY) * 1e9), int(now * 1e9))
+        results["events.history_day_minutes"] = measure(
+            lambda: store.rollups(*last_day, seconds=MINUTE), iterations=iterations, warmup=1, **meta
+        )
+        log.close()
+    results["events.history_idle_compaction"] = _idle_compaction(now)
+    return results
+
+
+def _idle_compaction(now: float, *, hours: int = 2, step: int = 5) -> Result:
+    """Compaction of a log idle for longer than ``raw_seconds``: its active segment is rotated, rolled up and removed.
+
+    The first compaction after an idle stretch, and at startup after a long
+    break, takes this path; it must leave one empty active segment and the
+    events counted in minute rollups.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Hourly segments as the server writes them, so there are rotated segments before the active one.
+        log = EventLog(Path(directory) / "events.jsonl", segment_seconds=HOUR)
+        start_ns = int((now - 10 * DAY) * 1e9)
+        for index in range(hours * HOUR // step):
+            event = _event(index, start_ns)
+            event.timestamp_ns = start_ns + index * step * 1_000_000_000
+            log.append(event)
+        store = HistoryStore(log)
+        started = time.perf_counter()
+        done = store.compact(now)
+        elapsed = time.perf_counter() - started
+        frames = sum(rollup.frames for rollup in store.rollups(start_ns, int(now * 1e9)))
+        segments = log.segments()
+        log.close()
+    if done["segments_removed"] != hours or len(segments) != 1 or segments[0].size or frames != hours * HOUR // step:
+        raise RuntimeError(f"Idle compaction left {len(segments)} segment(s) and {frames} rolled-up frames: {done}")
+    return summarize([elapsed], frames=frames, **done)
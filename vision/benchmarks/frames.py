@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from attention_monitor.analyzer import LEFT_EYE_LANDMARKS, POSE_LANDMARK_INDEXES, RIGHT_EYE_LANDMARKS
+
+FACE_MESH_LANDMARK_COUNT = 478
+
+# Same reference model the analyzer feeds to solvePnP, keyed by landmark name.
+_MODEL_POINTS = {
+    "nose_tip": (0.0, 0.0, 0.0),
+    "chin": (0.0, -63.6, -12.5),
+    "left_eye_outer": (-43.3, 32.7, -26.0),
+    "right_eye_outer": (43.3, 32.7, -26.0),
+    "mouth_left": (-28.9, -28.9, -24.1),
+    "mouth_right": (28.9, -28.9, -24.1),
+}
+
+
+def synthetic_frame(width: int = 640, height: int = 480, seed: int = 0) -> np.ndarray:
+    """Draw a deterministic face-like BGR frame with sensor-style noise."""
+
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 3), (60, 70, 80), dtype=np.uint8)
+    center = (width // 2 + int(rng.integers(-10, 10)), height // 2)
+    axes = (width // 7, height // 4)
+    cv2.ellipse(frame, center, axes, 0, 0, 360, (140, 170, 210), -1)
+    eye_dy = axes[1] // 4
+    eye_dx = axes[0] // 2
+    for side in (-1, 1):
+        cv2.circle(frame, (center[0] + side * eye_dx, center[1] - eye_dy), axes[0] // 8, (40, 40, 40), -1)
+    cv2.ellipse(frame, (center[0], center[1] + axes[1] // 2), (axes[0] // 3, axes[1] // 10), 0, 0, 180, (60, 60, 150), -1)
+    noise = rng.integers(-8, 8, size=frame.shape, dtype=np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def synthetic_landmarks(
+    width: int = 640,
+    height: int = 480,
+    *,
+    yaw: float = 0.0,
+    pitch: float = 0.0,
+    eye_openness: float = 0.3,
+    seed: int = 0,
+) -> np.ndarray:
+    """Return a FaceMesh-shaped ``(478, 3)`` pixel-space landmark array.
+
+    The pose landmarks are projections of the analyzer's reference model under
+    the requested rotation, and the eye landmarks are laid out so the eye
+    aspect ratio is close to ``eye_openness``.
+    """
+
+    rng = np.random.default_rng(seed)
+    coords = np.zeros((FACE_MESH_LANDMARK_COUNT, 3), dtype=np.float64)
+    coords[:, 0] = rng.uniform(width * 0.35, width * 0.65, FACE_MESH_LANDMARK_COUNT)
+    coords[:, 1] = rng.uniform(height * 0.3, height * 0.7, FACE_MESH_LANDMARK_COUNT)
+
+    rotation, _ = cv2.Rodrigues(np.radians(np.array([pitch, yaw, 0.0], dtype=np.float64)))
+    camera_matrix = np.array([[width, 0, width / 2], [0, width, height / 2], [0, 0, 1]], dtype=np.float64)
+    translation = np.array([0.0, 0.0, 600.0])
+    for name, index in POSE_LANDMARK_INDEXES.items():
+        point = rotation @ np.array(_MODEL_POINTS[name]) + translation
+        projected = camera_matrix @ point
+        # Image y grows downwards while the model's y grows upwards.
+        coords[index] = (projected[0] / projected[2], height - projected[1] / projected[2], point[2] - translation[2])
+
+    for indices, cx in ((LEFT_EYE_LANDMARKS, width * 0.45), (RIGHT_EYE_LANDMARKS, width * 0.55)):
+        _place_eye(coords, indices, cx, height * 0.45, width * 0.04, eye_openness)
+    return coords
+
+
+def _place_eye(coords: np.ndarray, indices: Sequence[int], cx: float, cy: float, half_width: float, openness: float) -> None:
+    # Ordering follows _eye_aspect_ratio: corner, top, top, corner, bottom, bottom.
+    half_height = openness * half_width
+    outer, top_a, top_b, inner, bottom_b, bottom_a = indices
+    coords[outer, :2] = (cx - half_width, cy)
+    coords[inner, :2] = (cx + half_width, cy)
+    coords[top_a, :2] = (cx - half_width / 3, cy - half_height)
+    coords[top_b, :2] = (cx + half_width / 3, cy - half_height)
+    coords[bottom_b, :2] = (cx + half_width / 3, cy + half_height)
+    coords[bottom_a, :2] = (cx - half_width / 3, cy + half_height)
+
+
+def as_mediapipe_landmarks(coords: np.ndarray, width: int, height: int) -> List[SimpleNamespace]:
+    """Convert pixel-space landmarks to normalized objects shaped like FaceMesh output."""
+
+    return [SimpleNamespace(x=x / width, y=y / height, z=z / width) for x, y, z in coords]
+
+
+def load_frames(source: Optional[Path], count: int, size: Tuple[int, int] = (640, 480)) -> List[np.ndarray]:
+    """Load ``count`` frames from a video file or image directory, or synthesize them."""
+
+    width, height = size
+    if source is None:
+        return [synthetic_frame(width, height, seed=i) for i in range(count)]
+
+    frames: List[np.ndarray] = []
+    if source.is_dir():
+        for path in sorted(source.iterdir()):
+            image = cv2.imread(str(path))
+            if image is not None:
+                frames.append(cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA))
+            if len(frames) >= count:
+                break
+    else:
+        cap = cv2.VideoCapture(str(source))
+        while len(frames) < count:
+            ok, image = cap.read()
+            if not ok:
+                break
+            frames.append(cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA))
+        cap.release()
+
+    if not frames:
+        raise ValueError(f"No frames could be read from {source}")
+    return frames
+
+
+class SyntheticCapture:
+    """Stand-in for ``cv2.VideoCapture`` that cycles through in-memory frames."""
+
+    def __init__(self, frames: Sequence[np.ndarray], fps: float = 0.0) -> None:
+        self._frames = list(frames)
+        self._index = 0
+        self._interval = 1.0 / fps if fps > 0 else 0.0
+        self._next_due = 0.0
+        self._opened = True
+        self._props = {
+            cv2.CAP_PROP_FRAME_WIDTH: float(self._frames[0].shape[1]),
+            cv2.CAP_PROP_FRAME_HEIGHT: float(self._frames[0].shape[0]),
+        }
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def set(self, prop: int, value: float) -> bool:
+        self._props[prop] = float(value)
+        return True
+
+    def get(self, prop: int) -> float:
+        return self._props.get(prop, 0.0)
+
+    def grab(self) -> bool:
+        if not self._opened:
+            return False
+        if self._interval:
+            now = time.perf_counter()
+            if now < self._next_due:
+                time.sleep(self._next_due - now)
+            self._next_due = max(now, self._next_due) + self._interval
+        self._index = (self._index + 1) % len(self._frames)
+        return True
+
+    def retrieve(self, image: Optional[np.ndarray] = None):
+        if not self._opened:
+            return False, None
+        frame = self._frames[self._index]
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame.copy()
+
+    def read(self, image: Optional[np.ndarray] = None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self) -> None:
+        self._opened = False
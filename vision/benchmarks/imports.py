@@ -0,0 +1,97 @@
+"""Import-time cost of the entry points, measured with ``python -X importtime``."""
+
+from __future__ import annotations
+
+import functools
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from .results import Result, summarize
+
+VISION_DIR = Path(__file__).resolve().parent.parent
+
+# Statement to time, and modules that must not be loaded by it.
+TARGETS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "vision_server": ("import vision_server", ("cv2", "mediapipe", "numpy")),
+    "asgi_server": ("import asgi_server", ("cv2", "mediapipe", "numpy")),
+    "attention_monitor.config": ("from attention_monitor import PipelineConfig", ("cv2", "mediapipe", "numpy")),
+    "main": ("import main", ("cv2", "mediapipe")),
+}
+
+
+def measure_import(statement: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """Return total import seconds and ``(module, cumulative seconds)`` for one fresh interpreter.
+
+    Modules the interpreter imports for an empty program (``site`` and friends)
+    are excluded so that only the statement's own cost is counted.
+    """
+
+    startup = _startup_modules()
+    total = 0.0
+    modules: List[Tuple[str, float]] = []
+    for module, seconds, top_level in _importtime(statement):
+        if module in startup:
+            continue
+        modules.append((module, seconds))
+        if top_level:
+            total += seconds
+    return total, modules
+
+
+@functools.lru_cache(maxsize=None)
+def _startup_modules() -> FrozenSet[str]:
+    return frozenset(module for module, _, _ in _importtime("pass"))
+
+
+def _importtime(statement: str) -> List[Tuple[str, float, bool]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=VISION_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are indented by two extra spaces per level.
+        top_level = not name.startswith("   ")
+        entries.append((name.strip(), int(cumulative) / 1e6, top_level))
+    return entries
+
+
+def run_import_benchmarks(runs: int = 5, targets: Sequence[str] = tuple(TARGETS)) -> Dict[str, Result]:
+    results: Dict[str, Result] = {}
+    for name in targets:
+        statement, forbidden = TARGETS[name]
+        samples = []
+        modules: List[Tuple[str, float]] = []
+        for _ in range(runs):
+            total, modules = measure_import(statement)
+            samples.append(total)
+        loaded = {module for module, _ in modules}
+        heaviest = sorted(modules, key=lambda item: item[1], reverse=True)[:10]
+        results[f"imports.{name}"] = summarize(
+            samples,
+            statement=statement,
+            modules_loaded=len(loaded),
+            forbidden_loaded=sorted(module for module in forbidden if module in loaded),
+            heaviest=[{"module": module, "seconds": seconds} for module, seconds in heaviest],
+        )
+    return results
+
+
+def check_imports(results: Dict[str, Result], budget: float) -> List[str]:
+    """Return human-readable failures for forbidden modules or totals over ``budget`` seconds."""
+
+    failures = []
+    for name, result in results.items():
+        if result["forbidden_loaded"]:
+            failures.append(f"{name}: loads {', '.join(result['forbidden_loaded'])} at import time")
+        if result["p50"] > budget:
+            failures.append(f"{name}: median import {result['p50']:.3f}s exceeds budget {budget:.3f}s")
+    return failures
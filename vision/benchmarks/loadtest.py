@@ -0,0 +1,321 @@
+"""Concurrent stream/status load test against a local vision server with a synthetic camera.
+
+The server runs in a child process so its memory and thread count can be
+sampled from ``/proc`` without the clients' own allocations mixed in. Each step
+opens N ``/video_feed`` clients and N ``/status`` pollers, all as coroutines on
+one event loop, and records per-client frame rate, status latency, and the
+server's peak RSS and thread count.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .results import Result, summarize
+
+VISION_DIR = Path(__file__).resolve().parent.parent
+MODES = ("asgi", "flask")
+
+
+def run_load_test(
+    *,
+    mode: str = "asgi",
+    steps: Sequence[int] = (1, 12, 24, 48),
+    duration: float = 10.0,
+    camera_fps: float = 30.0,
+    stream_query: str = "",
+    status_interval: float = 0.1,
+    max_rss_growth_mb: float = 64.0,
+    min_fps_ratio: float = 0.5,
+) -> Tuple[Dict[str, Result], List[str]]:
+    """Ramp through ``steps`` concurrent clients; returns results and human-readable failures."""
+
+    port = _free_port()
+    # The server's event log, and the history compacted from it, go to a scratch directory, not vision/events.jsonl.
+    events_dir = tempfile.TemporaryDirectory()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.loadtest", "serve", "--mode", mode, "--port", str(port),
+         "--camera-fps", str(camera_fps)],
+        cwd=VISION_DIR,
+        env={**os.environ, "EVENT_LOG_PATH": str(Path(events_dir.name) / "events.jsonl")},
+        stdout=subprocess.DEVNULL,
+    )
+    results: Dict[str, Result] = {}
+    try:
+        _wait_for_health(port, server)
+        _post(port, "/start_session")
+        for count in steps:
+            results[f"loadtest.{mode}.c{count}"] = asyncio.run(
+                _run_step(port, server.pid, count, duration, stream_query, status_interval)
+            )
+        _post(port, "/stop_session")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        events_dir.cleanup()
+    return results, _check(results, steps, camera_fps, stream_query, max_rss_growth_mb, min_fps_ratio)
+
+
+def _check(
+    results: Dict[str, Result],
+    steps: Sequence[int],
+    camera_fps: float,
+    stream_query: str,
+    max_rss_growth_mb: float,
+    min_fps_ratio: float,
+) -> List[str]:
+    failures = []
+    ordered = [results[key] for key in results]
+    if not ordered:
+        return ["no steps ran"]
+    growth = (ordered[-1]["rss_max_mb"] or 0.0) - (ordered[0]["rss_max_mb"] or 0.0)
+    if growth > max_rss_growth_mb:
+        failures.append(
+            f"server RSS grew {growth:.1f} MB from {steps[0]} to {steps[-1]} clients (limit {max_rss_growth_mb:.0f} MB)"
+        )
+    target_fps = camera_fps
+    cap = dict(pair.split("=", 1) for pair in stream_query.lstrip("?").split("&") if "=" in pair).get("fps")
+    if cap:
+        target_fps = min(target_fps, float(cap))
+    for name, result in results.items():
+        if result["errors"]:
+            failures.append(f"{name}: {result['errors']} client errors")
+        if result["stream_fps_min"] < target_fps * min_fps_ratio:
+            failures.append(
+                f"{name}: slowest stream got {result['stream_fps_min']:.1f} fps (expected >= {target_fps * min_fps_ratio:.1f})"
+            )
+    return failures
+
+
+async def _run_step(
+    port: int, pid: int, count: int, duration: float, stream_query: str, status_interval: float
+) -> Result:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    errors: List[str] = []
+    latencies: List[float] = []
+    samples: List[Tuple[Optional[float], Optional[int], Optional[int]]] = []
+
+    streams = [_stream_client(port, "/video_feed" + stream_query, deadline, errors) for _ in range(count)]
+    pollers = [_status_client(port, deadline, status_interval, latencies, errors) for _ in range(count)]
+    sampler = _sample_process(pid, deadline, samples)
+    start = loop.time()
+    outcomes = await asyncio.gather(*streams, *pollers, sampler)
+    elapsed = loop.time() - start
+
+    frame_counts = outcomes[:count]
+    fps = [frames / elapsed for frames in frame_counts]
+    rss = [value for value, _, _ in samples if value is not None]
+    threads = [value for _, value, _ in samples if value is not None]
+    fds = [value for _, _, value in samples if value is not None]
+    result = summarize(latencies or [0.0], clients=count, unit_of_work="status request")
+    result.update(
+        stream_fps_mean=sum(fps) / len(fps),
+        stream_fps_min=min(fps),
+        frames=sum(frame_counts),
+        status_requests=len(latencies),
+        errors=len(errors),
+        error_samples=errors[:5],
+        rss_max_mb=max(rss) if rss else None,
+        rss_end_mb=rss[-1] if rss else None,
+        threads_max=max(threads) if threads else None,
+        fds_max=max(fds) if fds else None,
+        elapsed=elapsed,
+    )
+    return result
+
+
+async def _request(
+    port: int, path: str, connection: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+) -> Tuple[Tuple[asyncio.StreamReader, asyncio.StreamWriter], int, Dict[str, str]]:
+    if connection is None:
+        connection = await asyncio.open_connection("127.0.0.1", port)
+    reader, writer = connection
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n\r\n".encode("ascii"))
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    return connection, status, headers
+
+
+async def _stream_client(port: int, path: str, deadline: float, errors: List[str]) -> int:
+    """Count JPEG end-of-image markers received until ``deadline``."""
+
+    loop = asyncio.get_running_loop()
+    frames = 0
+    writer = None
+    try:
+        (reader, writer), status, _ = await _request(port, path)
+        if status != 200:
+            errors.append(f"{path}: HTTP {status}")
+            return 0
+        tail = b""
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                chunk = await asyncio.wait_for(reader.read(65536), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if not chunk:
+                errors.append(f"{path}: stream ended early")
+                break
+            data = tail + chunk
+            # JPEG data byte-stuffs 0xFF, so FF D9 only appears as the end-of-image marker.
+            frames += data.count(b"\xff\xd9")
+            tail = data[-1:]
+    except (OSError, asyncio.IncompleteReadError) as exc:
+        errors.append(f"{path}: {exc!r}")
+    finally:
+        if writer is not None:
+            writer.close()
+    return frames
+
+
+async def _status_client(
+    port: int, deadline: float, interval: float, latencies: List[float], errors: List[str], path: str = "/status"
+) -> int:
+    loop = asyncio.get_running_loop()
+    connection = None
+    while loop.time() < deadline:
+        start = time.perf_counter()
+        try:
+            connection, status, headers = await _request(port, path, connection)
+            reader, writer = connection
+            if "content-length" in headers:
+                body = await reader.readexactly(int(headers["content-length"]))
+            else:
+                body = await reader.read()
+            if headers.get("connection", "").lower() == "close" or "content-length" not in headers:
+                writer.close()
+                connection = None
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(f"{path}: HTTP {status}")
+            else:
+                json.loads(body)
+        except (OSError, ValueError, asyncio.IncompleteReadError) as exc:
+            errors.append(f"{path}: {exc!r}")
+            connection = None
+        await asyncio.sleep(interval)
+    if connection is not None:
+        connection[1].close()
+    return len(latencies)
+
+
+async def _sample_process(
+    pid: int, deadline: float, samples: List[Tuple[Optional[float], Optional[int], Optional[int]]]
+) -> int:
+    loop = asyncio.get_running_loop()
+    while loop.time() < deadline:
+        samples.append(process_stats(pid))
+        await asyncio.sleep(0.25)
+    samples.append(process_stats(pid))
+    return len(samples)
+
+
+def process_stats(pid: int) -> Tuple[Optional[float], Optional[int], Optional[int]]:
+    """Return (RSS in MB, thread count, open file descriptors) from ``/proc``; None where unavailable."""
+
+    rss = threads = fds = None
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) / 1024
+                elif line.startswith("Threads:"):
+                    threads = int(line.split()[1])
+        fds = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        pass
+    return rss, threads, fds
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_health(port: int, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not become healthy within {timeout:.0f}s")
+
+
+def _post(port: int, path: str) -> None:
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=b"", method="POST")
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+
+
+def serve(mode: str, port: int, camera_fps: float) -> None:
+    """Run one serving mode with a synthetic camera until terminated."""
+
+    import cv2
+
+    from .frames import SyntheticCapture, load_frames
+
+    frames = load_frames(None, 10, (640, 480))
+    cv2.VideoCapture = lambda *_args, **_kwargs: SyntheticCapture(frames, fps=camera_fps)
+    if mode == "asgi":
+        import uvicorn
+
+        import asgi_server
+
+        uvicorn.run(asgi_server.app, host="127.0.0.1", port=port, log_level="warning")
+    else:
+        import logging
+
+        from werkzeug.serving import make_server
+
+        import vision_server
+
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        make_server("127.0.0.1", port, vision_server.app, threaded=True).serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description="Serve a load-test target.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    target = commands.add_parser("serve")
+    target.add_argument("--mode", choices=MODES, default="asgi")
+    target.add_argument("--port", type=int, required=True)
+    target.add_argument("--camera-fps", type=float, default=30.0)
+    args = parser.parse_args(argv)
+    serve(args.mode, args.port, args.camera_fps)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
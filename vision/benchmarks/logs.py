@@ -0,0 +1,77 @@
+"""What a log line costs the thread that emits it, with a slow console or collector on the other end.
+
+``print`` writes synchronously, so every call pays the sink's latency;
+:func:`~attention_monitor.logging_utils.configure_logging` hands records to a
+queue and pays it on the listener thread instead. A disabled debug call with
+its ``isEnabledFor`` guard, and a message held back by the rate limiter, should
+both cost next to nothing.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import logging
+import time
+from typing import Dict
+
+from attention_monitor.logging_utils import configure_logging, stop_logging
+
+from .results import Result, measure
+
+
+class SlowStream(io.TextIOBase):
+    """A text sink that takes ``delay`` seconds per write, like a slow terminal or a blocking pipe."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.writes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        # Sleeping releases the GIL, as a write blocked on a terminal or pipe does.
+        time.sleep(self.delay)
+        self.writes += 1
+        return len(text)
+
+
+def run_logging_benchmarks(*, iterations: int = 2000, sink_delay: float = 200e-6) -> Dict[str, Result]:
+    meta = {"sink_delay_s": sink_delay}
+    results: Dict[str, Result] = {}
+    fields = {"session": "bench", "state": "looking_away", "yaw": 31.5, "pitch": -4.25}
+
+    sink = SlowStream(sink_delay)
+    with contextlib.redirect_stdout(sink):
+        results["logs.print"] = measure(
+            lambda: print(f"🔄 {fields['session']}: attentive → {fields['state']} yaw={fields['yaw']}"),
+            iterations=iterations,
+            **meta,
+        )
+
+    logger = logging.getLogger("benchmarks.logs")
+    root = logging.getLogger()
+    saved = (list(root.handlers), root.level)
+    try:
+        handler = configure_logging("INFO", rate_limit=0, stream=SlowStream(sink_delay), queue_size=iterations * 2)
+        results["logs.queued"] = measure(
+            lambda: logger.info("State changed", extra=fields), iterations=iterations, **meta
+        )
+
+        def disabled_debug() -> None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Frame", extra=dict(fields, latency_ms=12.5))
+
+        results["logs.debug_disabled"] = measure(disabled_debug, iterations=iterations, **meta)
+
+        configure_logging("INFO", rate_limit=60, stream=SlowStream(sink_delay))
+        results["logs.rate_limited"] = measure(
+            lambda: logger.info("State changed", extra=fields), iterations=iterations, **meta
+        )
+        results["logs.queued"]["dropped"] = handler.dropped
+    finally:
+        stop_logging()
+        root.handlers[:] = saved[0]
+        root.setLevel(saved[1])
+    return results
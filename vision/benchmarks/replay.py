@@ -0,0 +1,123 @@
+"""The post-inference path (pose, EAR, classification, windows, logging) replayed from a landmark trace.
+
+No MediaPipe or video decoding is involved: frames come from a trace archive
+recorded by ``FrameAnalyzer`` (``LANDMARK_TRACE_PATH`` on ``main.py``, or the
+``capture-trace`` command on a clip). Without ``--trace`` a synthetic one is
+scripted from attentive, looking-away, eyes-closed and absent episodes.
+
+Each result also carries the per-state frame counts, so a change that shifts
+classification on a recorded trace shows up next to the timing.
+"""
+
+from __future__ import annotations
+
+import itertools
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from attention_monitor.analyzer import LANDMARK_SUBSET, FrameAnalyzer
+from attention_monitor.configuration import PipelineConfig
+from attention_monitor.handlers import EventLogHandler
+from attention_monitor.traces import LandmarkRecorder, LandmarkTrace, ReplayAnalyzer, replay
+
+from .frames import load_frames, synthetic_landmarks
+from .results import Result, summarize
+
+# (frames, yaw, pitch, eye openness); openness None means no face
+_EPISODES: List[Tuple[int, float, float, Optional[float]]] = [
+    (90, 5.0, -3.0, 0.3),
+    (30, 40.0, 0.0, 0.3),
+    (60, 0.0, 2.0, 0.3),
+    (20, 0.0, 0.0, 0.05),
+    (30, 0.0, 0.0, None),
+    (45, -10.0, 30.0, 0.3),
+]
+
+
+def run_replay_benchmarks(
+    *,
+    trace_path: Optional[Path] = None,
+    frame_count: int = 3000,
+    fps: float = 30.0,
+) -> Dict[str, Result]:
+    with tempfile.TemporaryDirectory() as tmp:
+        if trace_path is None:
+            trace_path = synthetic_trace(Path(tmp) / "synthetic.npz", frame_count, fps)
+        trace = LandmarkTrace.load(trace_path)
+        height, width = trace.frame_shape
+        config = PipelineConfig(frame_width=width, frame_height=height, frame_process_interval=1 / fps)
+        meta = {"frames": len(trace), "face_rate": float(trace.present.mean()) if len(trace) else 0.0}
+
+        results: Dict[str, Result] = {}
+        analyzer = ReplayAnalyzer(trace)
+        samples: List[float] = []
+        clock = time.perf_counter
+        while not analyzer.exhausted:
+            start = clock()
+            analyzer.analyze()
+            samples.append(clock() - start)
+        results["replay.analysis"] = summarize(samples, **meta)
+        results["replay.pipeline"] = _timed_replay(trace, config, [], meta)
+        results["replay.pipeline_logged"] = _timed_replay(
+            trace, config, [EventLogHandler(Path(tmp) / "events.jsonl")], meta
+        )
+    return results
+
+
+def capture_trace(frames_source: Path, output: Path, frame_count: int, fps: float, width: int, height: int) -> Path:
+    """Run the live analyzer over a clip and write its landmark trace, timed at ``fps``."""
+
+    frames = load_frames(frames_source, frame_count, (width, height))
+    recorder = LandmarkRecorder(output, clock=_frame_clock(fps))
+    analyzer = FrameAnalyzer(PipelineConfig(frame_width=width, frame_height=height), recorder=recorder)
+    analyzer.warm_up()
+    try:
+        for frame in frames:
+            analyzer.analyze(frame)
+    finally:
+        analyzer.close()
+    return output
+
+
+def synthetic_trace(path: Path, frame_count: int, fps: float = 30.0, width: int = 640, height: int = 480) -> Path:
+    """Write a scripted trace cycling through :data:`_EPISODES` without running any model."""
+
+    recorder = LandmarkRecorder(path, clock=_frame_clock(fps))
+    templates: Dict[Tuple[float, float, Optional[float]], Optional[np.ndarray]] = {}
+    script = itertools.cycle(_EPISODES)
+    while len(recorder) < frame_count:
+        frames, yaw, pitch, openness = next(script)
+        key = (yaw, pitch, openness)
+        if key not in templates:
+            templates[key] = (
+                None
+                if openness is None
+                else synthetic_landmarks(width, height, yaw=yaw, pitch=pitch, eye_openness=openness)[LANDMARK_SUBSET]
+            )
+        for _ in range(min(frames, frame_count - len(recorder))):
+            recorder.record(templates[key], (height, width))
+    return recorder.save()
+
+
+def _timed_replay(trace: LandmarkTrace, config: PipelineConfig, handlers, meta) -> Result:
+    samples: List[float] = []
+    states: Counter = Counter()
+    clock = time.perf_counter
+    updates = replay(trace, config, handlers)
+    start = clock()
+    for update in updates:
+        now = clock()
+        samples.append(now - start)
+        states[update.state] += 1
+        start = clock()
+    return summarize(samples, **meta, states=dict(sorted(states.items())))
+
+
+def _frame_clock(fps: float) -> Callable[[], float]:
+    ticks = itertools.count()
+    return lambda: next(ticks) / fps
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+Result = Dict[str, Any]
+
+
+def summarize(samples: Iterable[float], **extra: Any) -> Result:
+    """Summarize latency samples (seconds) into the JSON result shape."""
+
+    ordered = sorted(samples)
+    if not ordered:
+        raise ValueError("No samples collected")
+    total = sum(ordered)
+    result: Result = {
+        "unit": "s",
+        "iterations": len(ordered),
+        "mean": total / len(ordered),
+        "stdev": statistics.pstdev(ordered),
+        "min": ordered[0],
+        "p50": _percentile(ordered, 0.50),
+        "p95": _percentile(ordered, 0.95),
+        "p99": _percentile(ordered, 0.99),
+        "max": ordered[-1],
+        "ops_per_sec": len(ordered) / total if total else float("inf"),
+        "primary": "p50",
+        "higher_is_better": False,
+    }
+    result.update(extra)
+    return result
+
+
+def measure(fn: Callable[[], Any], *, iterations: int, warmup: int = 5, **extra: Any) -> Result:
+    """Time ``fn`` over ``iterations`` calls after ``warmup`` untimed calls."""
+
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    clock = time.perf_counter
+    for _ in range(iterations):
+        start = clock()
+        fn()
+        samples.append(clock() - start)
+    return summarize(samples, **extra)
+
+
+def environment() -> Dict[str, Any]:
+    info: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    for module in ("numpy", "cv2", "mediapipe", "flask"):
+        try:
+            info[module] = __import__(module).__version__
+        except Exception:
+            info[module] = None
+    return info
+
+
+def write_report(path: Optional[Path], meta: Mapping[str, Any], results: Mapping[str, Result]) -> Dict[str, Any]:
+    report = {"meta": dict(meta), "results": dict(results)}
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path is None:
+        print(text)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text + "\n", encoding="utf-8")
+    return report
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare_reports(
+    baseline: Mapping[str, Any],
+    current: Mapping[str, Any],
+    *,
+    tolerance: float = 0.15,
+) -> List[Dict[str, Any]]:
+    """Compare the primary metric of every benchmark present in both reports.
+
+    A benchmark regresses when its primary metric is worse than the baseline by
+    more than ``tolerance`` (a fraction, so 0.15 means 15%).
+    """
+
+    rows: List[Dict[str, Any]] = []
+    base_results = baseline.get("results", {})
+    for name, result in sorted(current.get("results", {}).items()):
+        base = base_results.get(name)
+        if base is None:
+            rows.append({"name": name, "status": "new"})
+            continue
+        metric = result.get("primary", "p50")
+        higher_is_better = bool(result.get("higher_is_better", False))
+        old, new = base.get(metric), result.get(metric)
+        if not old or new is None:
+            rows.append({"name": name, "status": "skipped", "metric": metric})
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        status = "regression" if worse > tolerance else "improvement" if worse < -tolerance else "ok"
+        rows.append({"name": name, "status": status, "metric": metric, "baseline": old, "current": new, "change": change})
+    for name in sorted(set(base_results) - set(current.get("results", {}))):
+        rows.append({"name": name, "status": "missing"})
+    return rows
+
+
+def format_comparison(rows: Iterable[Mapping[str, Any]]) -> str:
+    lines = []
+    for row in rows:
+        if "change" in row:
+            lines.append(
+                f"{row['status']:<12} {row['name']:<40} {row['metric']:>12} "
+                f"{row['baseline']:.6g} -> {row['current']:.6g} ({row['change']:+.1%})"
+            )
+        else:
+            lines.append(f"{row['status']:<12} {row['name']}")
+    return "\n".join(lines)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = position - lower
+    return ordered[lower] * (1 - weight) + ordered[upper] * weight
@@ -0,0 +1,230 @@
+"""HTTP throughput of ``vision_server`` under concurrent clients, without a camera."""
+
+from __future__ import annotations
+
+import contextlib
+import http.client
+import json
+import logging
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .frames import SyntheticCapture, load_frames
+from .results import Result, summarize
+
+# /video_feed query strings; "full" keeps the historical result names.
+STREAM_PROFILES = {
+    "full": "",
+    "thumb": "?width=160&quality=60&fps=10",
+}
+
+
+@contextlib.contextmanager
+def serve_vision_server(
+    frames: Sequence[np.ndarray],
+    *,
+    fps: float = 30.0,
+    capture: Optional[Callable[..., object]] = None,
+) -> Iterator[Tuple[object, int]]:
+    """Run ``vision_server.app`` on an ephemeral port with a synthetic camera.
+
+    ``capture`` replaces ``cv2.VideoCapture`` (it gets the camera source) when
+    cameras need to differ; otherwise every camera cycles through ``frames``.
+    Sessions log their events to a temporary directory rather than the
+    server's event log.
+    """
+
+    import cv2
+    from werkzeug.serving import make_server
+
+    import vision_server
+    from attention_monitor.eventlog import EventLog
+    from attention_monitor.history import HistoryStore
+    from attention_monitor.resources import WarmResource
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    original_capture = cv2.VideoCapture
+    cv2.VideoCapture = capture or (lambda *_args, **_kwargs: SyntheticCapture(frames, fps=fps))
+    events_dir = tempfile.TemporaryDirectory()
+    original_events = vision_server.event_log_resource, vision_server.history_resource
+    # Left open: sessions finishing after shutdown may still append; the directory goes with it.
+    vision_server.event_log_resource = WarmResource(lambda: EventLog(Path(events_dir.name) / "events.jsonl"))
+    vision_server.history_resource = WarmResource(lambda: HistoryStore(vision_server.event_log_resource.get()))
+    server = make_server("127.0.0.1", 0, vision_server.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield vision_server, server.server_port
+    finally:
+        for session in list(vision_server.sessions.values()):
+            session.active = False
+        server.shutdown()
+        thread.join(timeout=5)
+        vision_server.stop_camera()
+        cv2.VideoCapture = original_capture
+        vision_server.event_log_resource, vision_server.history_resource = original_events
+        events_dir.cleanup()
+
+
+def run_server_benchmarks(
+    *,
+    frames_source: Optional[Path] = None,
+    clients: Sequence[int] = (1, 8, 32),
+    status_requests: int = 200,
+    stream_frames: int = 60,
+    camera_fps: float = 30.0,
+    session_cycles: int = 5,
+) -> Dict[str, Result]:
+    frames = load_frames(frames_source, 10, (640, 480))
+    results: Dict[str, Result] = {}
+    with serve_vision_server(frames, fps=camera_fps) as (module, port):
+        if session_cycles:
+            results["server.session_start"] = _session_start_benchmark(module, port, session_cycles)
+        # Streaming requires an active session; skip /start_session so no model is loaded.
+        module.default_session().active = True
+        for count in clients:
+            results[f"server.status.c{count}"] = _run_clients(
+                count, lambda: _status_client(port, status_requests)
+            )
+            for name, query in STREAM_PROFILES.items():
+                key = "server.video_feed" if name == "full" else f"server.video_feed_{name}"
+                results[f"{key}.c{count}"] = _stream_benchmark(module, port, count, query, stream_frames)
+            results[f"server.snapshot.c{count}"] = _run_clients(
+                count, lambda: _get_client(port, "/snapshot?width=320", status_requests)
+            )
+    return results
+
+
+def _stream_benchmark(module, port: int, count: int, query: str, frame_limit: int) -> Result:
+    """Run ``count`` stream clients on one profile and report how many encodes they shared."""
+
+    from attention_monitor.metrics import STREAM_ENCODES
+    from attention_monitor.streaming import StreamProfile
+
+    profile = StreamProfile.from_query(_query_args(query), module.FRAME_WIDTH, module.FRAME_HEIGHT)
+    encoded = STREAM_ENCODES.labels(profile.label, "encoded")
+    shared = STREAM_ENCODES.labels(profile.label, "shared")
+    before = encoded.value, shared.value
+    result = _run_clients(count, lambda: _stream_client(port, frame_limit, query), unit="frame")
+    result.update(
+        profile=profile.label,
+        max_fps=profile.max_fps,
+        encodes=encoded.value - before[0],
+        shared_encodes=shared.value - before[1],
+    )
+    return result
+
+
+def _query_args(query: str) -> Dict[str, str]:
+    from urllib.parse import parse_qsl
+
+    return dict(parse_qsl(query.lstrip("?")))
+
+
+def _session_start_benchmark(module, port: int, cycles: int) -> Result:
+    """Time /start_session until /status reports a classified frame, then stop the session."""
+
+    if module.WARM_MODE:
+        # Mirror server startup, which begins loading the model before any request.
+        module.analyzer_resource.get()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    samples: List[float] = []
+    try:
+        for _ in range(cycles):
+            start = time.perf_counter()
+            conn.request("POST", "/start_session")
+            conn.getresponse().read()
+            while True:
+                conn.request("GET", "/status")
+                body = json.loads(conn.getresponse().read())
+                if body["status"] != "Looking for face...":
+                    break
+                if time.perf_counter() - start > 30:
+                    raise RuntimeError("No classified frame within 30s of /start_session")
+                time.sleep(0.005)
+            samples.append(time.perf_counter() - start)
+            conn.request("POST", "/stop_session")
+            conn.getresponse().read()
+            # Wait for the last tick to hand back the camera and model.
+            deadline = time.perf_counter() + 5
+            while module.scheduler.is_scheduled(module.DEFAULT_SESSION_ID) and time.perf_counter() < deadline:
+                time.sleep(0.005)
+    finally:
+        conn.close()
+    return summarize(samples, warm_mode=module.WARM_MODE)
+
+
+def _run_clients(count: int, client: Callable[[], Tuple[List[float], int]], unit: str = "request") -> Result:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        outcomes = list(pool.map(lambda _: client(), range(count)))
+    elapsed = time.perf_counter() - start
+    latencies = [sample for samples, _ in outcomes for sample in samples]
+    transferred = sum(size for _, size in outcomes)
+    result = summarize(latencies, clients=count, unit_of_work=unit, bytes=transferred, elapsed=elapsed)
+    result["throughput"] = len(latencies) / elapsed
+    result["primary"] = "throughput"
+    result["higher_is_better"] = True
+    return result
+
+
+def _status_client(port: int, requests: int) -> Tuple[List[float], int]:
+    return _get_client(port, "/status", requests)
+
+
+def _get_client(port: int, path: str, requests: int) -> Tuple[List[float], int]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    samples: List[float] = []
+    transferred = 0
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            conn.request("GET", path)
+            response = conn.getresponse()
+            body = response.read()
+            if response.status != 200:
+                raise RuntimeError(f"{path} returned HTTP {response.status}")
+            samples.append(time.perf_counter() - start)
+            transferred += len(body)
+    finally:
+        conn.close()
+    return samples, transferred
+
+
+def _stream_client(port: int, frame_limit: int, query: str = "") -> Tuple[List[float], int]:
+    """Read ``frame_limit`` multipart JPEG parts and record inter-frame gaps."""
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    samples: List[float] = []
+    transferred = 0
+    try:
+        conn.request("GET", "/video_feed" + query)
+        response = conn.getresponse()
+        last = time.perf_counter()
+        buffer = b""
+        while len(samples) < frame_limit:
+            chunk = response.read1(65536)
+            if not chunk:
+                break
+            transferred += len(chunk)
+            buffer += chunk
+            while len(samples) < frame_limit:
+                end = buffer.find(b"\xff\xd9")
+                if end < 0:
+                    break
+                buffer = buffer[end + 2 :]
+                now = time.perf_counter()
+                samples.append(now - last)
+                last = now
+    finally:
+        conn.close()
+    if not samples:
+        raise RuntimeError("/video_feed returned no frames")
+    return samples, transferred
+
@@ -0,0 +1,489 @@
+"""Hundreds of simulated sessions against an in-process vision server, escalations included.
+
+Each session gets its own synthetic camera (``sim:<n>``) that plays an episode
+script (attentive, sleeping, looking away, absent for so many seconds) by
+stamping the current state into the frames it delivers. ``MarkerAnalyzer``
+reads the stamp back as the ``FrameAnalysis`` that state would produce, so the
+session scheduler, the attention pipeline, the escalation timers, incident
+clips and the HTTP routes all run for real with no model and no face. Gemini,
+Fish Audio, Supabase and Vapi are :mod:`benchmarks.stubs`; audio playback is
+counted instead of played.
+
+Scripts are either one fixed script exercising every escalation (``scripted``)
+or a random mix per session (``random``), with every episode clearly shorter or
+clearly longer than its threshold so the escalations each session should see
+are known in advance. ``time_scale`` shrinks the thresholds and the analysis
+interval together, so a 5 s threshold at 0.2 is reached in 1 s.
+
+Reports ``/status`` and ``/video_feed`` throughput and tail latency while the
+sessions run, analysis ticks per second against the scheduled rate, and per
+escalation kind how many fired against how many were due, plus how late they
+fired after their threshold passed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from attention_monitor.analyzer import FrameAnalysis
+from attention_monitor.metrics import FRAMES
+
+from .frames import SyntheticCapture, synthetic_frame
+from .loadtest import _status_client, _stream_client, process_stats
+from .results import Result, summarize
+from .server import serve_vision_server
+from .stubs import SERVICES, StubServices, point_server_at
+
+STATES = ("attentive", "sleeping", "looking_away", "not_present")
+ESCALATIONS = {"sleeping": "_sleep_alert", "looking_away": "_looking_away_strike", "not_present": "_absence_call"}
+_ANALYSES = {
+    "attentive": FrameAnalysis(face_present=True, yaw=3.0, pitch=-2.0, ear_left=0.3, ear_right=0.31),
+    "sleeping": FrameAnalysis(face_present=True, yaw=1.0, pitch=4.0, ear_left=0.08, ear_right=0.07),
+    "looking_away": FrameAnalysis(face_present=True, yaw=48.0, pitch=3.0, ear_left=0.29, ear_right=0.3),
+    "not_present": FrameAnalysis(face_present=False),
+}
+
+
+@dataclass(slots=True)
+class Episode:
+    state: str
+    seconds: float
+
+
+class MarkerAnalyzer:
+    """Turns the state stamped into a ``ScriptedCamera`` frame back into that state's analysis."""
+
+    def analyze(self, frame: np.ndarray) -> FrameAnalysis:
+        return _ANALYSES[STATES[int(frame[0, 0, 0]) % len(STATES)]]
+
+    def warm_up(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class ScriptedCamera(SyntheticCapture):
+    """A synthetic camera whose frames follow ``episodes`` from ``started_at`` (default: its first grab).
+
+    After the script ends it stays attentive, or starts over with ``repeat``.
+    """
+
+    def __init__(
+        self,
+        frames: Sequence[np.ndarray],
+        episodes: Sequence[Episode],
+        fps: float,
+        started_at: Optional[float] = None,
+        repeat: bool = False,
+    ) -> None:
+        super().__init__(frames, fps=fps)
+        self.started_at = started_at
+        self._ends = list(itertools.accumulate(episode.seconds for episode in episodes))
+        self._codes = [STATES.index(episode.state) for episode in episodes]
+        self._repeat = repeat and bool(self._ends) and self._ends[-1] > 0
+
+    def grab(self) -> bool:
+        if not super().grab():
+            return False
+        now = time.monotonic()
+        if self.started_at is None:
+            self.started_at = now
+        elapsed = now - self.started_at
+        if self._repeat:
+            elapsed %= self._ends[-1]
+        for end, code in zip(self._ends, self._codes):
+            if elapsed < end:
+                self._index = code
+                break
+        else:
+            self._index = 0
+        return True
+
+
+def scripted_episodes(thresholds: Dict[str, float], interval: float) -> List[Episode]:
+    """One pass over every escalation: each distraction once below and once above its threshold."""
+
+    gap = 3 * interval
+    episodes = [Episode("attentive", gap)]
+    for state in ESCALATIONS:
+        episodes += [
+            Episode(state, thresholds[state] / 2),
+            Episode("attentive", gap),
+            Episode(state, thresholds[state] + _margin(state, interval)),
+            Episode("attentive", gap),
+        ]
+    return episodes
+
+
+def random_episodes(rng: random.Random, thresholds: Dict[str, float], interval: float, count: int) -> List[Episode]:
+    """``count`` distraction episodes separated by attentive spells, each clearly under or over its threshold."""
+
+    episodes = [Episode("attentive", rng.uniform(1, 4) * interval)]
+    for _ in range(count):
+        state = rng.choice(list(ESCALATIONS))
+        threshold = thresholds[state]
+        if rng.random() < 0.5:
+            seconds = rng.uniform(0.2, 0.5) * threshold
+        else:
+            seconds = threshold + _margin(state, interval) + rng.uniform(0, 2) * interval
+        episodes += [Episode(state, seconds), Episode("attentive", rng.uniform(3, 6) * interval)]
+    return episodes
+
+
+def expected_escalations(episodes: Sequence[Episode], thresholds: Dict[str, float]) -> List[Tuple[str, float]]:
+    """(state, seconds into the script when its threshold passes) for every escalation that should fire."""
+
+    due = []
+    offset = 0.0
+    for episode in episodes:
+        threshold = thresholds.get(episode.state)
+        if threshold is not None and episode.seconds > threshold:
+            due.append((episode.state, offset + threshold))
+        offset += episode.seconds
+    return due
+
+
+class SimulatedServer:
+    """``vision_server`` on a local port with scripted cameras, ``MarkerAnalyzer`` and the stub APIs.
+
+    A context manager: entering patches the server module (thresholds and the
+    analysis interval scaled by ``time_scale``, audio playback counted instead
+    of played, output discarded) and starts serving; leaving undoes all of it.
+    Session ``sim-<n>`` plays ``scripts["sim-<n>"]`` on camera ``sim:<n>``,
+    looping it with ``repeat``. Escalations are counted per state, and with
+    ``record`` also kept as ``(session, state, monotonic time)`` in ``fired``.
+    """
+
+    def __init__(
+        self,
+        scripts: Dict[str, List[Episode]],
+        *,
+        time_scale: float,
+        camera_fps: float = 15.0,
+        repeat: bool = False,
+        record: bool = True,
+    ) -> None:
+        import vision_server as core
+
+        self.core = core
+        self.scripts = scripts
+        self.interval = core.ANALYSIS_INTERVAL * time_scale
+        self.thresholds = scaled_thresholds(time_scale)
+        self.camera_fps = camera_fps
+        self.repeat = repeat
+        self.record = record
+        self.port = 0
+        self.cameras: Dict[str, ScriptedCamera] = {}
+        self.fired: List[Tuple[str, str, float]] = []
+        self.escalations: Counter = Counter()
+        self.playback: Counter = Counter()
+        self.stubs = StubServices()
+        self._frames = [_stamped_frame(code) for code in range(len(STATES))]
+        self._lock = threading.Lock()
+        self._stack = contextlib.ExitStack()
+
+    def __enter__(self) -> "SimulatedServer":
+        core = self.core
+        stack = self._stack
+        try:
+            stack.enter_context(self.stubs)
+            clip_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            sink = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(sink))
+            stack.enter_context(contextlib.redirect_stderr(sink))
+            point_server_at(core, self.stubs.url)
+            from attention_monitor.outbound import breaker
+
+            for service in SERVICES:
+                breaker(service).reset()
+            self._patch(core, "WARM_MODE", False)
+            self._patch(core, "create_analyzer", MarkerAnalyzer)
+            self._patch(core, "play_audio_alert", lambda _audio: self._count(self.playback, "audio"))
+            self._patch(core, "play_fallback_tone", lambda: self._count(self.playback, "tone"))
+            self._patch(core, "SLEEP_THRESHOLD", self.thresholds["sleeping"])
+            self._patch(core, "LOOKING_AWAY_THRESHOLD", self.thresholds["looking_away"])
+            self._patch(core, "ABSENCE_THRESHOLD", self.thresholds["not_present"])
+            self._patch(core, "CLIP_DIR", clip_dir)
+            self._patch(core.scheduler, "interval", self.interval)
+            for state, name in ESCALATIONS.items():
+                self._patch(core.VisionSession, name, self._recorded(state, getattr(core.VisionSession, name)))
+            stack.callback(core.camera_pools.clear)
+            stack.callback(core.sessions.clear)
+            _, self.port = stack.enter_context(serve_vision_server(self._frames, capture=self._capture))
+        except BaseException:
+            stack.close()
+            raise
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stack.close()
+
+    def start_sessions(self, session_ids: Sequence[str]) -> List[float]:
+        """POST each session's start (on its scripted camera) concurrently; returns the request latencies."""
+
+        def start(session_id: str) -> float:
+            began = time.perf_counter()
+            _post(self.port, f"/sessions/{session_id}/start", {"camera": session_id.replace("sim-", "sim:", 1)})
+            return time.perf_counter() - began
+
+        with ThreadPoolExecutor(max_workers=min(32, len(session_ids))) as pool:
+            return list(pool.map(start, session_ids))
+
+    def stop_sessions(self, session_ids: Sequence[str]) -> None:
+        with ThreadPoolExecutor(max_workers=min(32, len(session_ids))) as pool:
+            list(pool.map(lambda session_id: _post(self.port, f"/sessions/{session_id}/stop", {}), session_ids))
+
+    def _patch(self, owner, name: str, value) -> None:
+        saved = getattr(owner, name)
+        setattr(owner, name, value)
+        self._stack.callback(setattr, owner, name, saved)
+
+    def _count(self, counter: Counter, key: str) -> None:
+        with self._lock:
+            counter[key] += 1
+
+    def _capture(self, source, *_args, **_kwargs) -> ScriptedCamera:
+        session_id = str(source).replace("sim:", "sim-", 1)
+        # A session that drops its camera (a failed read) and reopens it carries on with the same script.
+        previous = self.cameras.get(session_id)
+        camera = self.cameras[session_id] = ScriptedCamera(
+            self._frames,
+            self.scripts[session_id],
+            fps=self.camera_fps,
+            started_at=previous.started_at if previous else None,
+            repeat=self.repeat,
+        )
+        return camera
+
+    def _recorded(self, state: str, action):
+        server = self
+
+        def escalate(self, update):
+            with server._lock:
+                server.escalations[state] += 1
+                if server.record:
+                    server.fired.append((self.session_id, state, time.monotonic()))
+            return action(self, update)
+
+        return escalate
+
+
+def scaled_thresholds(time_scale: float) -> Dict[str, float]:
+    """The server's escalation thresholds, in seconds, at ``time_scale``."""
+
+    import vision_server as core
+
+    return {
+        "sleeping": core.SLEEP_THRESHOLD * time_scale,
+        "looking_away": core.LOOKING_AWAY_THRESHOLD * time_scale,
+        "not_present": core.ABSENCE_THRESHOLD * time_scale,
+    }
+
+
+def run_simulation(
+    *,
+    sessions: int = 200,
+    mode: str = "scripted",
+    episodes: int = 6,
+    time_scale: float = 0.2,
+    streams: int = 4,
+    status_interval: float = 0.5,
+    camera_fps: float = 15.0,
+    seed: int = 0,
+) -> Tuple[Dict[str, Result], List[str]]:
+    """Run the simulation; returns results and human-readable failures (missed or unexpected escalations)."""
+
+    import vision_server as core
+
+    interval = core.ANALYSIS_INTERVAL * time_scale
+    thresholds = scaled_thresholds(time_scale)
+    rng = random.Random(seed)
+    scripts = {
+        f"sim-{n}": (
+            scripted_episodes(thresholds, interval)
+            if mode == "scripted"
+            else random_episodes(rng, thresholds, interval, episodes)
+        )
+        for n in range(sessions)
+    }
+    duration = max(sum(episode.seconds for episode in script) for script in scripts.values()) + 4 * interval
+
+    from attention_monitor.outbound import breaker_states
+
+    analyzed = FRAMES.labels("analyzed")
+    with SimulatedServer(scripts, time_scale=time_scale, camera_fps=camera_fps) as server:
+        start_latency = server.start_sessions(list(scripts))
+        ticks_before = analyzed.value
+        step = asyncio.run(_drive(server.port, list(scripts), streams, duration, status_interval, core.scheduler))
+        ticks = analyzed.value - ticks_before
+        server.stop_sessions(list(scripts))
+        breakers = breaker_states()
+
+    results: Dict[str, Result] = {}
+    meta = {"sessions": sessions, "mode": mode, "time_scale": time_scale, "interval": interval}
+    results["simulation.session_start"] = summarize(start_latency, **meta)
+    results["simulation.status"] = step["status"]
+    if step["video_feed"] is not None:
+        results["simulation.video_feed"] = step["video_feed"]
+    results["simulation.ticks"] = {
+        "unit": "ticks/s",
+        "value": ticks / step["elapsed"],
+        "scheduled": sessions / interval,
+        "tick_ratio": ticks / step["elapsed"] / (sessions / interval),
+        "backlog_max": step["backlog_max"],
+        "workers": core.scheduler.workers,
+        "rss_max_mb": step["rss_max_mb"],
+        "threads_max": step["threads_max"],
+        "primary": "value",
+        "higher_is_better": True,
+        **meta,
+    }
+    escalation_results, failures = _check_escalations(scripts, server.cameras, server.fired, thresholds, interval)
+    results.update(escalation_results)
+    results["simulation.escalation.summary"] = {
+        "unit": "count",
+        "value": len(server.fired),
+        "playback": dict(server.playback),
+        "upstream_requests": dict(server.stubs.requests),
+        "breakers": breakers,
+        "primary": "value",
+        "higher_is_better": True,
+    }
+    failures += [f"{name}: {result['errors']} client errors" for name, result in step.items()
+                 if isinstance(result, dict) and result.get("errors")]
+    return results, failures
+
+
+def _check_escalations(
+    scripts: Dict[str, List[Episode]],
+    cameras: Dict[str, ScriptedCamera],
+    fired: List[Tuple[str, str, float]],
+    thresholds: Dict[str, float],
+    interval: float,
+) -> Tuple[Dict[str, Result], List[str]]:
+    by_session: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+    for session_id, state, at in fired:
+        by_session[(session_id, state)].append(at)
+
+    delays: Dict[str, List[float]] = defaultdict(list)
+    counts = {state: Counter() for state in ESCALATIONS}
+    failures: List[str] = []
+    for session_id, script in scripts.items():
+        camera = cameras.get(session_id)
+        due = expected_escalations(script, thresholds)
+        for state in ESCALATIONS:
+            expected = [offset for kind, offset in due if kind == state]
+            actual = sorted(by_session.get((session_id, state), []))
+            counts[state]["expected"] += len(expected)
+            counts[state]["fired"] += len(actual)
+            matched = min(len(expected), len(actual))
+            counts[state]["missed"] += len(expected) - matched
+            counts[state]["unexpected"] += len(actual) - matched
+            if camera is not None and camera.started_at is not None:
+                delays[state] += [at - (camera.started_at + offset) for offset, at in zip(expected, actual)]
+            if len(expected) != len(actual):
+                failures.append(f"{session_id}: {state} escalated {len(actual)}x, expected {len(expected)}x")
+
+    results: Dict[str, Result] = {}
+    for state in ESCALATIONS:
+        extra = dict(counts[state], threshold=thresholds[state], correct=not counts[state]["missed"] and not counts[state]["unexpected"])
+        if delays[state]:
+            results[f"simulation.escalation.{state}"] = summarize(delays[state], **extra)
+        else:
+            results[f"simulation.escalation.{state}"] = {"unit": "s", "primary": "fired", "higher_is_better": True, **extra}
+    if len(failures) > 10:
+        failures = failures[:10] + [f"... and {len(failures) - 10} more"]
+    return results, failures
+
+
+async def _drive(port: int, session_ids: Sequence[str], streams: int, duration: float, status_interval: float, scheduler):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    latencies: List[float] = []
+    errors: List[str] = []
+    stream_errors: List[str] = []
+    samples: List[Tuple[Optional[float], Optional[int], Optional[int]]] = []
+    backlog: List[int] = []
+
+    async def sample() -> None:
+        while loop.time() < deadline:
+            samples.append(process_stats(os.getpid()))
+            backlog.append(scheduler.backlog)
+            await asyncio.sleep(0.25)
+
+    pollers = [
+        _status_client(port, deadline, status_interval, latencies, errors, f"/sessions/{session_id}/status")
+        for session_id in session_ids
+    ]
+    viewers = [
+        _stream_client(port, f"/sessions/{session_id}/video_feed?width=320&fps=10", deadline, stream_errors)
+        for session_id in session_ids[:streams]
+    ]
+    start = loop.time()
+    outcomes = await asyncio.gather(*viewers, *pollers, sample())
+    elapsed = loop.time() - start
+
+    status = summarize(latencies or [0.0], clients=len(pollers), errors=len(errors), error_samples=errors[:5])
+    status["throughput"] = len(latencies) / elapsed
+    video_feed = None
+    if viewers:
+        fps = [frames / elapsed for frames in outcomes[: len(viewers)]]
+        video_feed = {
+            "unit": "fps",
+            "value": sum(fps) / len(fps),
+            "stream_fps_min": min(fps),
+            "clients": len(viewers),
+            "errors": len(stream_errors),
+            "error_samples": stream_errors[:5],
+            "primary": "value",
+            "higher_is_better": True,
+        }
+    rss = [value for value, _, _ in samples if value is not None]
+    threads = [value for _, value, _ in samples if value is not None]
+    return {
+        "status": status,
+        "video_feed": video_feed,
+        "elapsed": elapsed,
+        "backlog_max": max(backlog, default=0),
+        "rss_max_mb": max(rss, default=None),
+        "threads_max": max(threads, default=None),
+    }
+
+
+def _post(port: int, path: str, body: Dict[str, object]) -> None:
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}{path}",
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+
+
+def _margin(state: str, interval: float) -> float:
+    # A timer starts on the first tick that sees the state (up to one interval late) and fires on the
+    # first tick past the threshold; sleeping also needs a second closed-eye tick before it is classified.
+    return (4 if state == "sleeping" else 3) * interval
+
+
+def _stamped_frame(code: int) -> np.ndarray:
+    frame = synthetic_frame(640, 480, seed=code)
+    frame[0, 0, 0] = code
+    return frame
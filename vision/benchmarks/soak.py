@@ -0,0 +1,268 @@
+"""Long-running soak of the vision server, failing on memory, thread or file-descriptor growth.
+
+Runs the :mod:`benchmarks.simulation` setup for ``duration`` seconds:
+- scripted cameras on a loop, with thresholds and ticks sped up by ``time_scale``,
+  so escalations fire far more often than in real use;
+- stub APIs;
+- a status poller per session and a few ``/video_feed`` viewers;
+- every ``churn_interval`` seconds, a share of the sessions stopped and started
+  again, so per-session setup and teardown repeat all run long.
+
+Every ``sample_interval`` seconds it records RSS, thread count, open file
+descriptors and tracemalloc's traced total. After ``warmup`` the harness takes
+a baseline. At the end, growth is the median of the last three samples minus
+the median of the first three after warm-up; any growth past its bound is a
+failure.
+
+The report also has the allocation sites that grew most between the baseline
+and final tracemalloc snapshots, and a least-squares slope per hour for each
+quantity.
+
+Everything shares one process, so the harness's own clients are in the
+numbers. They keep bounded state: latencies go into a fixed-size reservoir, and
+escalations are counted rather than listed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from .loadtest import _request, _stream_client, process_stats
+from .results import Result, summarize
+from .simulation import SimulatedServer, random_episodes, scaled_thresholds
+
+# (seconds since start, RSS MB, threads, fds, traced MB)
+Sample = Tuple[float, Optional[float], Optional[int], Optional[int], float]
+QUANTITIES = {"rss_mb": "MB", "threads": "threads", "fds": "fds", "traced_mb": "MB"}
+
+
+def run_soak(
+    *,
+    duration: float = 3600.0,
+    sessions: int = 50,
+    time_scale: float = 0.1,
+    camera_fps: float = 15.0,
+    streams: int = 2,
+    status_interval: float = 0.5,
+    churn_interval: float = 30.0,
+    churn_fraction: float = 0.2,
+    sample_interval: float = 5.0,
+    warmup: float = 60.0,
+    max_rss_growth_mb: float = 64.0,
+    max_thread_growth: int = 8,
+    max_fd_growth: int = 16,
+    max_traced_growth_mb: float = 32.0,
+    top: int = 10,
+    seed: int = 0,
+) -> Tuple[Dict[str, Result], List[str]]:
+    """Soak the server; returns results and human-readable failures (growth past a bound)."""
+
+    import vision_server as core
+
+    interval = core.ANALYSIS_INTERVAL * time_scale
+    thresholds = scaled_thresholds(time_scale)
+    rng = random.Random(seed)
+    scripts = {f"sim-{n}": random_episodes(rng, thresholds, interval, 12) for n in range(sessions)}
+    bounds = {
+        "rss_mb": max_rss_growth_mb,
+        "threads": max_thread_growth,
+        "fds": max_fd_growth,
+        "traced_mb": max_traced_growth_mb,
+    }
+
+    tracemalloc.start()
+    try:
+        with SimulatedServer(
+            scripts, time_scale=time_scale, camera_fps=camera_fps, repeat=True, record=False
+        ) as server:
+            server.start_sessions(list(scripts))
+            run = asyncio.run(
+                _soak(
+                    server,
+                    list(scripts),
+                    duration=duration,
+                    streams=streams,
+                    status_interval=status_interval,
+                    churn_interval=churn_interval,
+                    churn_fraction=churn_fraction,
+                    sample_interval=sample_interval,
+                    warmup=warmup,
+                    rng=rng,
+                )
+            )
+            server.stop_sessions(list(scripts))
+            escalations, playback = dict(server.escalations), dict(server.playback)
+    finally:
+        tracemalloc.stop()
+
+    samples: List[Sample] = run["samples"]
+    settled = [sample for sample in samples if sample[0] >= warmup] or samples
+    meta = {"duration": duration, "sessions": sessions, "time_scale": time_scale, "warmup": warmup}
+    results: Dict[str, Result] = {}
+    failures: List[str] = []
+    for column, name in enumerate(QUANTITIES, start=1):
+        points = [(sample[0], sample[column]) for sample in settled if sample[column] is not None]
+        if len(points) < 2:
+            continue
+        values = [value for _, value in points]
+        growth = statistics.median(values[-3:]) - statistics.median(values[:3])
+        results[f"soak.{name}"] = {
+            "unit": QUANTITIES[name],
+            "growth": growth,
+            "limit": bounds[name],
+            "baseline": statistics.median(values[:3]),
+            "final": statistics.median(values[-3:]),
+            "max": max(values),
+            "slope_per_hour": _slope(points) * 3600,
+            "primary": "growth",
+            "higher_is_better": False,
+            **meta,
+        }
+        if growth > bounds[name]:
+            failures.append(f"{name} grew {growth:.1f} after warm-up (limit {bounds[name]:g})")
+
+    status = summarize(run["latencies"] or [0.0], requests=run["requests"], errors=run["errors"],
+                       error_samples=run["error_samples"], **meta)
+    status["throughput"] = run["requests"] / run["elapsed"]
+    results["soak.status"] = status
+    results["soak.activity"] = {
+        "unit": "count",
+        "value": sum(escalations.values()),
+        "escalations": escalations,
+        "playback": playback,
+        "churned_sessions": run["churned"],
+        "stream_frames": run["stream_frames"],
+        "samples": len(samples),
+        "primary": "value",
+        "higher_is_better": True,
+    }
+    results["soak.top_allocators"] = {"unit": "KiB", "sites": run["top_allocators"][:top], "primary": "none"}
+    if run["errors"]:
+        failures.append(f"/status: {run['errors']} errors, e.g. {run['error_samples'][:1]}")
+    return results, failures
+
+
+async def _soak(
+    server: SimulatedServer,
+    session_ids: Sequence[str],
+    *,
+    duration: float,
+    streams: int,
+    status_interval: float,
+    churn_interval: float,
+    churn_fraction: float,
+    sample_interval: float,
+    warmup: float,
+    rng: random.Random,
+) -> Dict[str, object]:
+    loop = asyncio.get_running_loop()
+    began = loop.time()
+    deadline = began + duration
+    latencies: Deque[float] = deque(maxlen=20000)
+    counters = {"requests": 0, "errors": 0, "churned": 0}
+    error_samples: List[str] = []
+    samples: List[Sample] = []
+    snapshots: Dict[str, tracemalloc.Snapshot] = {}
+
+    async def poll(session_id: str) -> None:
+        path = f"/sessions/{session_id}/status"
+        connection = None
+        while loop.time() < deadline:
+            start = time.perf_counter()
+            try:
+                connection, status, headers = await _request(server.port, path, connection)
+                reader, writer = connection
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                if headers.get("connection", "").lower() == "close":
+                    writer.close()
+                    connection = None
+                latencies.append(time.perf_counter() - start)
+                counters["requests"] += 1
+                if status != 200:
+                    raise ValueError(f"HTTP {status}")
+            except (OSError, ValueError, asyncio.IncompleteReadError) as exc:
+                counters["errors"] += 1
+                if len(error_samples) < 5:
+                    error_samples.append(f"{path}: {exc!r}")
+                if connection is not None:
+                    connection[1].close()
+                connection = None
+            await asyncio.sleep(status_interval)
+        if connection is not None:
+            connection[1].close()
+
+    async def churn() -> None:
+        # Viewed sessions stay up: stopping one ends its stream, which the viewer counts as an error.
+        churnable = list(session_ids[streams:])
+        count = max(1, int(len(session_ids) * churn_fraction))
+        while churnable and loop.time() + churn_interval < deadline:
+            await asyncio.sleep(churn_interval)
+            chosen = rng.sample(churnable, min(count, len(churnable)))
+            await loop.run_in_executor(None, server.stop_sessions, chosen)
+            await loop.run_in_executor(None, server.start_sessions, chosen)
+            counters["churned"] += len(chosen)
+
+    async def sample() -> None:
+        pid = os.getpid()
+        while True:
+            now = loop.time()
+            rss, threads, fds = process_stats(pid)
+            samples.append((now - began, rss, threads, fds, tracemalloc.get_traced_memory()[0] / 2**20))
+            if "baseline" not in snapshots and now - began >= warmup:
+                snapshots["baseline"] = _snapshot()
+            if now >= deadline:
+                break
+            await asyncio.sleep(min(sample_interval, max(0.0, deadline - now)))
+
+    stream_errors: List[str] = []
+    viewers = [
+        _stream_client(server.port, f"/sessions/{session_id}/video_feed?width=320&fps=10", deadline, stream_errors)
+        for session_id in session_ids[:streams]
+    ]
+    outcomes = await asyncio.gather(
+        *viewers, *(poll(session_id) for session_id in session_ids), churn(), sample()
+    )
+    final = _snapshot()
+    baseline = snapshots.get("baseline", final)
+    top_allocators = [
+        {"site": str(stat.traceback), "size_diff_kib": stat.size_diff / 1024, "count_diff": stat.count_diff}
+        for stat in final.compare_to(baseline, "lineno")[:25]
+        if stat.size_diff > 0
+    ]
+    return {
+        "samples": samples,
+        "latencies": list(latencies),
+        "requests": counters["requests"],
+        "errors": counters["errors"] + len(stream_errors),
+        "error_samples": (error_samples + stream_errors)[:5],
+        "churned": counters["churned"],
+        "stream_frames": sum(outcomes[: len(viewers)]),
+        "elapsed": loop.time() - began,
+        "top_allocators": top_allocators,
+    }
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+    )
+
+
+def _slope(points: Sequence[Tuple[float, float]]) -> float:
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_v = sum(v for _, v in points) / len(points)
+    spread = sum((t - mean_t) ** 2 for t, _ in points)
+    if not spread:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / spread
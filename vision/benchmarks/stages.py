@@ -0,0 +1,151 @@
+"""Per-stage timings for the single-frame analysis path."""
+
+from __future__ import annotations
+
+import itertools
+import json
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import cv2
+
+from attention_monitor.analyzer import (
+    LANDMARK_SUBSET,
+    LEFT_EYE_LANDMARKS,
+    RIGHT_EYE_LANDMARKS,
+    AttentionClassifier,
+    FrameAnalysis,
+    _estimate_pose,
+    _eye_aspect_ratio,
+)
+from attention_monitor.backends import mesh_subset
+from attention_monitor.configuration import PipelineConfig
+from attention_monitor.bus import EventBus
+from attention_monitor.handlers import AttentionHandler, AttentionUpdate, CallbackHandler, EventLogHandler
+from attention_monitor.pipeline import AttentionMonitorPipeline
+
+from .frames import as_mediapipe_landmarks, load_frames, synthetic_landmarks
+from .results import Result, measure
+
+
+def run_stage_benchmarks(
+    *,
+    frames_source: Optional[Path] = None,
+    frame_count: int = 30,
+    iterations: int = 200,
+    inference_iterations: int = 50,
+    width: int = 640,
+    height: int = 480,
+) -> Dict[str, Result]:
+    config = PipelineConfig(frame_width=width, frame_height=height)
+    frames = load_frames(frames_source, frame_count, (width, height))
+    frame_cycle = itertools.cycle(frames)
+    shape = (height, width)
+    landmarks = synthetic_landmarks(width, height, yaw=8.0, pitch=-4.0)
+    mesh = as_mediapipe_landmarks(landmarks, width, height)
+    analysis = FrameAnalysis(face_present=True, yaw=8.0, pitch=-4.0, roll=1.0, ear_left=0.3, ear_right=0.28)
+    classifier = AttentionClassifier(config)
+    # _build_event only reads the config and session id, so bypass the camera/model setup in __init__.
+    event_builder = SimpleNamespace(_config=config, _session_id=None)
+
+    results: Dict[str, Result] = {}
+    # get_frame() resizes camera output to the pipeline's default 640x360.
+    default_size = (PipelineConfig().frame_width, PipelineConfig().frame_height)
+    results["stages.resize"] = measure(
+        lambda: cv2.resize(next(frame_cycle), default_size, interpolation=cv2.INTER_AREA),
+        iterations=iterations,
+    )
+    results["stages.color_conversion"] = measure(
+        lambda: cv2.cvtColor(next(frame_cycle), cv2.COLOR_BGR2RGB),
+        iterations=iterations,
+    )
+    results.update(_face_mesh_benchmark(frames, inference_iterations))
+    results["stages.landmark_extraction"] = measure(
+        lambda: mesh_subset(mesh, LANDMARK_SUBSET, shape),
+        iterations=iterations,
+        landmarks=len(LANDMARK_SUBSET),
+    )
+    results["stages.solve_pnp"] = measure(lambda: _estimate_pose(landmarks, shape), iterations=iterations)
+    results["stages.ear"] = measure(
+        lambda: (_eye_aspect_ratio(landmarks, LEFT_EYE_LANDMARKS), _eye_aspect_ratio(landmarks, RIGHT_EYE_LANDMARKS)),
+        iterations=iterations,
+    )
+    results["stages.classification"] = measure(lambda: classifier.classify(analysis, 0), iterations=iterations)
+
+    event = AttentionMonitorPipeline._build_event(event_builder, "attentive", analysis)  # type: ignore[arg-type]
+    results["stages.event_build"] = measure(
+        lambda: AttentionMonitorPipeline._build_event(event_builder, "attentive", analysis),  # type: ignore[arg-type]
+        iterations=iterations,
+    )
+    # Rendered from scratch each time: an event caches its JSON line after the first sink asks.
+    results["stages.event_serialization"] = measure(lambda: json.dumps(event.to_dict()), iterations=iterations)
+    with tempfile.TemporaryDirectory() as tmp:
+        log = EventLogHandler(Path(tmp) / "events.jsonl")
+        update = AttentionUpdate("attentive", analysis, event, 0.0)
+        try:
+            # The write itself, as the log's bus thread does it; the pipeline thread only queues the update.
+            results["stages.event_log_append"] = measure(lambda: log.handle(update), iterations=iterations)
+        finally:
+            log.close()
+
+    results["stages.bus_publish_slow_sink"] = _slow_sink_publish(update, iterations)
+
+    for quality in (85, 60):
+        results[f"stages.jpeg_encode.q{quality}"] = measure(
+            lambda: cv2.imencode(".jpg", next(frame_cycle), [cv2.IMWRITE_JPEG_QUALITY, quality]),
+            iterations=iterations,
+            quality=quality,
+        )
+    return results
+
+
+class _SlowSink(AttentionHandler):
+    """A background subscriber that takes 5 ms per update, like a log on a busy disk."""
+
+    inline = False
+
+    def handle(self, update: AttentionUpdate) -> None:
+        time.sleep(0.005)
+
+
+def _slow_sink_publish(update: AttentionUpdate, iterations: int) -> Result:
+    """What publishing costs the frame loop when one subscriber is slow: the inline one still runs at once."""
+
+    bus = EventBus(queue_size=iterations)
+    bus.subscribe(_SlowSink())
+    bus.subscribe(CallbackHandler(lambda _: None, stage="status"))
+    try:
+        return measure(lambda: bus.publish(update), iterations=iterations)
+    finally:
+        bus.close(timeout=0)
+
+
+def _face_mesh_benchmark(frames, iterations: int) -> Dict[str, Result]:
+    import mediapipe as mp
+
+    face_mesh = mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+    )
+    rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    rgb_cycle = itertools.cycle(rgb_frames)
+    detected = 0
+
+    def step() -> None:
+        nonlocal detected
+        if face_mesh.process(next(rgb_cycle)).multi_face_landmarks:
+            detected += 1
+
+    try:
+        result = measure(step, iterations=iterations, warmup=3)
+    finally:
+        face_mesh.close()
+    # Warmup calls also count towards ``detected``; report it relative to all calls.
+    result["face_detection_rate"] = detected / (iterations + 3)
+    return {"stages.face_mesh": result}
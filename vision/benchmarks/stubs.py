@@ -0,0 +1,156 @@
+"""Local stand-ins for Gemini, Fish Audio, Supabase and Vapi with injectable faults.
+
+One threaded HTTP server answers all four APIs with canned responses, routed by
+path. Per service it can add latency, return an error status, or hang up
+without answering, so breaker, deadline and fallback behaviour can be measured
+without touching the real services.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+SERVICES = ("gemini", "fish", "supabase", "vapi")
+
+
+@dataclass(slots=True)
+class Fault:
+    delay: float = 0.0
+    status: Optional[int] = None
+    drop: bool = False
+
+
+class StubServices:
+    """Serve the stub APIs on ``127.0.0.1`` in a background thread; use as a context manager."""
+
+    def __init__(self, port: int = 0) -> None:
+        self.faults: Dict[str, Fault] = {service: Fault() for service in SERVICES}
+        self.requests: Dict[str, int] = {service: 0 for service in SERVICES}
+        self.strikes = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def inject(self, service: str, *, delay: float = 0.0, status: Optional[int] = None, drop: bool = False) -> None:
+        self.faults[service] = Fault(delay, status, drop)
+
+    def heal(self) -> None:
+        for service in SERVICES:
+            self.faults[service] = Fault()
+
+    def add_strike(self) -> int:
+        with self._lock:
+            self.strikes += 1
+            return self.strikes
+
+    def count(self, service: str) -> int:
+        with self._lock:
+            self.requests[service] += 1
+            return self.requests[service]
+
+    def start(self) -> "StubServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServices":
+        return self.start()
+
+    def __exit__(self, *_exc) -> None:
+        self.stop()
+
+
+def point_server_at(core, url: str) -> None:
+    """Aim the ``vision_server`` module's integrations (keys, URLs) at stubs serving ``url``."""
+
+    core.GEMINI_API_KEY = core.FISH_API_KEY = "stub"
+    core.GEMINI_API_URL = core.FISH_API_URL = core.SUPABASE_URL = core.VAPI_API_URL = url
+    core.SUPABASE_SERVICE_ROLE_KEY = "stub"
+    core.VAPI_API_KEY = core.VAPI_PHONE_NUMBER_ID = core.VAPI_SLACK_OFF_ASSISTANT_ID = "stub"
+
+
+def service_for(path: str) -> Optional[str]:
+    if path.startswith("/v1beta/"):
+        return "gemini"
+    if path.startswith("/v1/tts"):
+        return "fish"
+    if path.startswith("/rest/v1/"):
+        return "supabase"
+    if path.startswith("/call"):
+        return "vapi"
+    return None
+
+
+def _handler(stubs: StubServices):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            self._respond()
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            self._respond()
+
+        def _respond(self) -> None:
+            service = service_for(self.path)
+            if service is None:
+                self._send(404, b"{}")
+                return
+            stubs.count(service)
+            fault = stubs.faults[service]
+            if fault.delay:
+                time.sleep(fault.delay)
+            if fault.drop:
+                self.close_connection = True
+                self.connection.close()
+                return
+            if fault.status is not None:
+                self._send(fault.status, json.dumps({"error": "injected"}).encode())
+                return
+            if service == "fish":
+                self._send(200, b"RIFF" + b"\0" * 1024, "audio/wav")
+                return
+            self._send(200, json.dumps(_body(stubs, self.path)).encode())
+
+        def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def _body(stubs: StubServices, path: str):
+    if path.startswith("/v1beta/"):
+        return {"candidates": [{"content": {"parts": [{"text": "WAKE UP. The stub believes in you."}]}}]}
+    if path.startswith("/rest/v1/user_sessions"):
+        return [{"user_id": "stub-user"}]
+    if path.startswith("/rest/v1/user_settings"):
+        return [{"your_phone": "+15550100"}]
+    if path.startswith("/rest/v1/rpc/increment_strikes"):
+        return [{"total_strikes": stubs.add_strike()}]
+    if path.startswith("/call"):
+        return {"id": "stub-call"}
+    return {}
@@ -9,15 +9,16 @@
 from __future__ import annotations
 
 import asyncio
-import logging
 import os
+import threading
 from pathlib import Path
+from typing import Tuple
 
 from dotenv import load_dotenv
 
-from attention_monitor import PipelineConfig, AttentionMonitorPipeline
-from attention_monitor.audio import SoundManager
-from attention_monitor.notifications import NotificationClient
+from attention_monitor import PipelineConfig
+from attention_monitor.logging_utils import configure_logging
+from attention_monitor.profiler import SamplingProfiler, install_profile_signal
 
 
 def _get_int(name: str, default: int) -> int:
@@ -40,6 +41,16 @@ def _get_float(name: str, default: float) -> float:
         return default
 
 
+def _get_floats(name: str, default: Tuple[float, ...]) -> Tuple[float, ...]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return tuple(float(part) for part in value.split(",") if part.strip())
+    except ValueError:
+        return default
+
+
 def _get_bool(name: str, default: bool) -> bool:
     value = os.getenv(name)
     if value is None:
@@ -52,6 +63,9 @@ def build_config() -> PipelineConfig:
 
     base = PipelineConfig()
     event_log_path = Path(os.getenv("EVENT_LOG_PATH", str(base.event_log_path)))
+    onnx_model_path = os.getenv("ONNX_MODEL_PATH")
+    face_landmarker_model_path = os.getenv("FACE_LANDMARKER_MODEL_PATH")
+    landmark_trace_path = os.getenv("LANDMARK_TRACE_PATH")
 
     return base.with_overrides(
         frame_width=_get_int("FRAME_WIDTH", base.frame_width),
@@ -61,17 +75,35 @@ def build_config() -> PipelineConfig:
         ear_threshold=_get_float("EAR_THRESHOLD", base.ear_threshold),
         yaw_threshold=_get_float("YAW_THRESHOLD", base.yaw_threshold),
         pitch_threshold=_get_float("PITCH_THRESHOLD", base.pitch_threshold),
-        history_window=_get_int("HISTORY_WINDOW", base.history_window),
-        distraction_threshold=_get_int("DISTRACTION_THRESHOLD", base.distraction_threshold),
+        distraction_window_seconds=_get_float("DISTRACTION_WINDOW_SECONDS", base.distraction_window_seconds),
+        distraction_fraction=_get_float("DISTRACTION_FRACTION", base.distraction_fraction),
+        attention_windows=_get_floats("ATTENTION_WINDOWS", base.attention_windows),
         event_log_path=event_log_path,
+        event_log_segment_bytes=_get_int("EVENT_LOG_SEGMENT_BYTES", base.event_log_segment_bytes),
         notification_api_key=os.getenv("NOTIFICATION_API_KEY", base.notification_api_key),
+        notification_heartbeat_seconds=_get_float("NOTIFICATION_HEARTBEAT_SECONDS", base.notification_heartbeat_seconds),
+        notification_min_interval_seconds=_get_float(
+            "NOTIFICATION_MIN_INTERVAL_SECONDS", base.notification_min_interval_seconds
+        ),
         enable_sounds=_get_bool("ENABLE_SOUNDS", base.enable_sounds),
+        inference_backend=os.getenv("INFERENCE_BACKEND", base.inference_backend),
+        onnx_model_path=Path(onnx_model_path) if onnx_model_path else None,
+        inference_threads=_get_int("INFERENCE_THREADS", base.inference_threads),
+        face_landmarker_model_path=Path(face_landmarker_model_path) if face_landmarker_model_path else None,
+        use_blendshapes=_get_bool("USE_BLENDSHAPES", base.use_blendshapes),
+        blink_threshold=_get_float("BLINK_THRESHOLD", base.blink_threshold),
+        landmark_trace_path=Path(landmark_trace_path) if landmark_trace_path else None,
     )
 
 
 async def main() -> None:
+    # Deferred so that importing this module (or a config-only run) skips cv2 and mediapipe.
+    from attention_monitor import AttentionMonitorPipeline
+    from attention_monitor.audio import SoundManager
+    from attention_monitor.notifications import NotificationClient
+
     config = build_config()
-    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    configure_logging()
     sound_manager = SoundManager(enabled=config.enable_sounds)
     notification_client = NotificationClient(config.notification_api_key)
 
@@ -81,6 +113,15 @@ async def main() -> None:
         notification_client=notification_client,
     )
 
+    # The pipeline runs on the event loop in the main thread; SIGUSR1 samples it.
+    main_ident = threading.main_thread().ident
+    install_profile_signal(
+        SamplingProfiler(),
+        lambda: main_ident,
+        Path(os.getenv("PROFILE_OUTPUT_DIR", "profiles")),
+        duration=_get_float("PROFILE_SECONDS", 10.0),
+    )
+
     try:
         await pipeline.run()
     except asyncio.CancelledError:  # pragma: no cover - defensive
@@ -6,38 +6,56 @@ Integrates with Chrome extension overlay.
 
 from flask import Flask, Response, jsonify
 from flask_cors import CORS
-import cv2
+import atexit
+import logging
+import subprocess
 import threading
 import time
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import sys
 import os
+from pathlib import Path
 
 # Add vision directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'vision'))
 
-from attention_monitor import PipelineConfig, AttentionMonitorPipeline
-from attention_monitor.audio import SoundManager
+from attention_monitor.metrics import (
+    FRAMES,
+    PROMETHEUS_CONTENT_TYPE,
+    CLIP_BUFFER_BYTES,
+    QUEUE_DEPTH,
+    REGISTRY,
+    SESSION_START_LATENCY,
+    STREAM_CLIENTS,
+    record_outbound,
+    stage_timer,
+)
+from attention_monitor.status import StatusSnapshot, status_type_for
+from attention_monitor.streaming import FramePacer, SharedEncoder, StreamProfile, mjpeg_part
+from attention_monitor.sessions import SessionScheduler
+from attention_monitor.clips import ClipRecorder
+from attention_monitor.configuration import PipelineConfig
+from attention_monitor.eventlog import MAX_PAGE, EventLog, format_sse, parse_timestamp_ns
+from attention_monitor.handlers import CallbackHandler, EscalationTimer, EventLogHandler
+from attention_monitor.history import HOUR, MINUTE, HistoryStore
+from attention_monitor.outbound import Deadline, DeadlineExceeded, breaker, breaker_states, budget_timeout, deadline_budget, guarded
+from attention_monitor.resources import CameraPool, WarmResource, open_camera
+from attention_monitor.profiler import SamplingProfiler, default_profile_path, install_profile_signal
+from attention_monitor.logging_utils import configure_logging
 from dotenv import load_dotenv
 
+# Named explicitly: run as a script, __name__ is "__main__".
+logger = logging.getLogger("vision_server")
+
 app = Flask(__name__)
 CORS(app)
 
-# Global state
-camera = None
-camera_running = False
-session_active = False
-current_status = "Looking for face..."
-alert_countdown = None
-alert_canceled = False
-frame_queue = deque(maxlen=1)
-analysis_thread = None
-
 # Load config from root .env file
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 # Fish Audio API key and models
 FISH_API_KEY = os.getenv("FISH_LABS_API_KEY", "")
+FISH_API_URL = os.getenv("FISH_API_URL", "https://api.fish.audio")
 FISH_MODEL_IDS = [
     os.getenv("FISH_LABS_MODEL_ID", ""),
     "c3ab3d55ad154918ad44418770803848",
@@ -47,9 +65,11 @@ FISH_MODEL_IDS = [
 
 # Gemini API for personalized messages
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GEMINI_API_URL = os.getenv("GEMINI_API_URL", "https://generativelanguage.googleapis.com")
 
 # Vapi configuration
 VAPI_API_KEY = os.getenv("VAPI_API_KEY", "")
+VAPI_API_URL = os.getenv("VAPI_API_URL", "https://api.vapi.ai")
 VAPI_PHONE_NUMBER_ID = os.getenv("VAPI_PHONE_NUMBER_ID", "")
 VAPI_SLACK_OFF_ASSISTANT_ID = os.getenv("VAPI_SLACK_OFF_ASSISTANT_ID", "")
 
@@ -57,37 +77,125 @@ VAPI_SLACK_OFF_ASSISTANT_ID = os.getenv("VAPI_SLACK_OFF_ASSISTANT_ID", "")
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
-print(f"Debug: Current working directory: {os.getcwd()}")
-print(f"Debug: Looking for .env file at: {os.path.join(os.path.dirname(__file__), '.env')}")
-print(f"Debug: FISH_API_KEY loaded: {bool(FISH_API_KEY)}")
-print(f"Debug: FISH_MODEL_ID loaded: {bool(FISH_MODEL_IDS[0])}")
-print(f"Debug: VAPI_API_KEY loaded: {bool(VAPI_API_KEY)}")
-print(f"Debug: VAPI_PHONE_NUMBER_ID loaded: {bool(VAPI_PHONE_NUMBER_ID)}")
-print(f"Debug: VAPI_SLACK_OFF_ASSISTANT_ID loaded: {bool(VAPI_SLACK_OFF_ASSISTANT_ID)}")
+# Time budgets for escalations. Every outbound call goes through a per-service circuit breaker;
+# a sleep alert that cannot get personalized audio in time plays the local tone instead.
+SLEEP_ALERT_BUDGET = float(os.getenv("SLEEP_ALERT_BUDGET_SECONDS", "4"))
+ESCALATION_BUDGET = float(os.getenv("ESCALATION_BUDGET_SECONDS", "10"))
+escalation_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="escalation")
+# Escalation actions (alerts, strikes, calls) run here rather than on the analysis workers,
+# so one session's alert does not hold up frame ticks for the other sessions on that worker.
+ALERT_WORKERS = int(os.getenv("ALERT_WORKERS", "4"))
+alert_pool = ThreadPoolExecutor(max_workers=ALERT_WORKERS, thread_name_prefix="alert")
+for service in ("gemini", "fish", "supabase", "vapi"):
+    breaker(service)
 
-# Detection variables
-current_task = "work"
+def print_config_debug():
+    """Report which integrations are configured; called at startup, not on import."""
+    logger.info(
+        "Integrations configured",
+        extra={
+            "cwd": os.getcwd(),
+            "env_file": os.path.join(os.path.dirname(__file__), '..', '.env'),
+            "fish_api_key": bool(FISH_API_KEY),
+            "fish_model_id": bool(FISH_MODEL_IDS[0]),
+            "gemini_api_key": bool(GEMINI_API_KEY),
+            "vapi_api_key": bool(VAPI_API_KEY),
+            "vapi_phone_number_id": bool(VAPI_PHONE_NUMBER_ID),
+            "vapi_assistant_id": bool(VAPI_SLACK_OFF_ASSISTANT_ID),
+            "supabase": bool(SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY),
+        },
+    )
 
-# State tracking with consecutive time
-sleep_start_time = None
-SLEEP_THRESHOLD = 5
-sleep_alert_triggered = False
-sleep_countdown = None
+# On-demand sampling profiler for the analysis thread
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+profiler = SamplingProfiler()
 
-absence_start_time = None
-ABSENCE_THRESHOLD = 5  # Changed to 5 seconds
-absence_alert_triggered = False
-absence_countdown = None
+# Warm mode: load the face model at startup and keep the camera open between sessions
+WARM_MODE = os.getenv("VISION_WARM_MODE", "1").lower() in {"1", "true", "yes", "on"}
+CAMERA_IDLE_GRACE_SECONDS = float(os.getenv("CAMERA_IDLE_GRACE_SECONDS", "30"))
+FRAME_WIDTH = 640
+FRAME_HEIGHT = 480
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "0.5"))
+
+# Sessions: the legacy routes drive DEFAULT_SESSION_ID on VISION_CAMERA (index or URL);
+# /sessions/<id>/... routes drive any number of sessions on any cameras.
+DEFAULT_SESSION_ID = "default"
+DEFAULT_CAMERA = os.getenv("VISION_CAMERA", "0")
+ANALYSIS_INTERVAL = 0.5
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0")) or None  # default: one per core
+# Consecutive failed reads a session rides out (one per tick) before it releases the camera and pipeline
+MAX_READ_FAILURES = int(os.getenv("CAMERA_READ_FAILURES", "10"))
+camera_pools = {}
+camera_pools_lock = threading.Lock()
+sessions = {}
+sessions_lock = threading.Lock()
+scheduler = SessionScheduler(interval=ANALYSIS_INTERVAL, workers=ANALYSIS_WORKERS)
+QUEUE_DEPTH.set_function(lambda: scheduler.backlog, "analysis_backlog")
+
+# Incident clips: each session keeps its last CLIP_PRE_SECONDS of analyzed frames as small JPEGs
+# in memory and writes them, plus CLIP_POST_SECONDS after, when a strike, call or sleep alert fires.
+CLIPS_ENABLED = os.getenv("VISION_CLIPS", "1").lower() in {"1", "true", "yes", "on"}
+CLIP_DIR = os.getenv("CLIP_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "clips"))
+CLIP_PRE_SECONDS = float(os.getenv("CLIP_PRE_SECONDS", "10"))
+CLIP_POST_SECONDS = float(os.getenv("CLIP_POST_SECONDS", "5"))
+CLIP_PROFILE = StreamProfile(320, 240, quality=60)
+clip_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clip-writer")
+
+# Attention history: every session's classified frames go to one segmented log, read back through
+# /events (pages from a cursor or a time) and /events/tail (server-sent events as they are written).
+EVENT_LOG_PATH = os.getenv("EVENT_LOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "events.jsonl"))
+EVENT_LOG_SEGMENT_BYTES = int(os.getenv("EVENT_LOG_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+EVENT_LOG_SEGMENT_SECONDS = float(os.getenv("EVENT_LOG_SEGMENT_SECONDS", "3600"))
+EVENTS_TAIL_HEARTBEAT = 15.0
+event_log_resource = WarmResource(lambda: EventLog(Path(EVENT_LOG_PATH), segment_bytes=EVENT_LOG_SEGMENT_BYTES,
+                                                   segment_seconds=EVENT_LOG_SEGMENT_SECONDS))
+
+# Tiered retention: raw events for HISTORY_RAW_DAYS, per-minute rollups for HISTORY_MINUTE_DAYS, then per-hour
+# rollups for HISTORY_HOUR_DAYS, compacted every HISTORY_COMPACT_INTERVAL_SECONDS; /history reads all of them.
+HISTORY_RAW_DAYS = float(os.getenv("HISTORY_RAW_DAYS", "3"))
+HISTORY_MINUTE_DAYS = float(os.getenv("HISTORY_MINUTE_DAYS", "90"))
+HISTORY_HOUR_DAYS = float(os.getenv("HISTORY_HOUR_DAYS", "730"))
+HISTORY_COMPACT_INTERVAL = float(os.getenv("HISTORY_COMPACT_INTERVAL_SECONDS", "300"))
+HISTORY_MINUTES_UP_TO = 2 * 86400  # longer ranges default to hourly rollups
+history_resource = WarmResource(lambda: HistoryStore(
+    event_log_resource.get(), raw_seconds=HISTORY_RAW_DAYS * 86400,
+    minute_seconds=HISTORY_MINUTE_DAYS * 86400, hour_seconds=HISTORY_HOUR_DAYS * 86400,
+))
+CLIP_BUFFER_BYTES.set_function(lambda: sum(session.clips.buffered_bytes for session in list(sessions.values())))
 
-looking_away_start_time = None
+# Time in a state before escalating
+SLEEP_THRESHOLD = 5
+ABSENCE_THRESHOLD = 5  # Changed to 5 seconds
 LOOKING_AWAY_THRESHOLD = 10
-looking_away_strike_triggered = False
-looking_away_countdown = None
+CONSEQUENCES = {"not_present": "phone call", "sleeping": "loud wake-up call", "looking_away": "strike added"}
 
-# Thresholds for state detection
+# Thresholds for state detection; EAR is attention_monitor's six-point eye aspect ratio
 YAW_THRESHOLD = 30.0  
 PITCH_THRESHOLD = 30.0 
-EAR_THRESHOLD = 0.01
+EAR_THRESHOLD = float(os.getenv("EAR_THRESHOLD", "0.2"))
+
+# Every session runs the attention_monitor engine; escalations below are its handlers.
+ENGINE_CONFIG = PipelineConfig(
+    frame_width=FRAME_WIDTH,
+    frame_height=FRAME_HEIGHT,
+    frame_process_interval=ANALYSIS_INTERVAL,
+    # Two closed-eye ticks in a row (1s) count as sleeping, so a blink does not.
+    max_consecutive_closed=1,
+    ear_threshold=EAR_THRESHOLD,
+    yaw_threshold=YAW_THRESHOLD,
+    pitch_threshold=PITCH_THRESHOLD,
+    # Sliding windows (seconds) for the distraction fractions reported by /status, plus the whole session
+    attention_windows=(30.0, 300.0),
+    enable_sounds=False,
+    # INFERENCE_BACKEND=onnx (+ ONNX_MODEL_PATH) runs an ONNX Runtime landmark model instead of FaceMesh;
+    # INFERENCE_BACKEND=face_landmarker (+ FACE_LANDMARKER_MODEL_PATH) the MediaPipe Tasks FaceLandmarker
+    inference_backend=os.getenv("INFERENCE_BACKEND", "mediapipe"),
+    onnx_model_path=Path(os.environ["ONNX_MODEL_PATH"]) if os.getenv("ONNX_MODEL_PATH") else None,
+    inference_threads=int(os.getenv("INFERENCE_THREADS", "0")),
+    face_landmarker_model_path=(Path(os.environ["FACE_LANDMARKER_MODEL_PATH"])
+                                if os.getenv("FACE_LANDMARKER_MODEL_PATH") else None),
+    use_blendshapes=os.getenv("USE_BLENDSHAPES", "0").lower() in {"1", "true", "yes", "on"},
+)
 
 # Wake-up messages
 WAKE_UP_MESSAGES = [
@@ -99,6 +207,58 @@ WAKE_UP_MESSAGES = [
     "ALERT! LAZINESS DETECTED! Wake up before I report this to your future employer! Get moving and start being productive like a responsible adult!",
 ]
 
+def parse_camera_source(source):
+    """Camera indexes arrive as strings; anything else (an RTSP URL, a file) is passed through."""
+    source = str(source).strip()
+    return int(source) if source.isdigit() else source
+
+
+def camera_pool_for(source):
+    """Return the shared CameraPool for a camera source, creating it on first use."""
+    source = parse_camera_source(source)
+    with camera_pools_lock:
+        pool = camera_pools.get(source)
+        if pool is None:
+            pool = camera_pools[source] = CameraPool(
+                lambda: open_camera(source, FRAME_WIDTH, FRAME_HEIGHT),
+                idle_grace=CAMERA_IDLE_GRACE_SECONDS if WARM_MODE else 0.0,
+            )
+        return pool
+
+
+camera_pool = camera_pool_for(DEFAULT_CAMERA)
+
+
+def outbound_request(service, method, url, **kwargs):
+    """Issue an HTTP request to an external service, recording latency and outcome.
+
+    Goes through the service's circuit breaker (CircuitOpenError while it is open),
+    and the timeout is clipped to the current escalation budget. A timeout that the
+    budget shortened raises DeadlineExceeded and does not count against the service.
+    """
+    import requests
+
+    with guarded(service) as call:
+        requested = kwargs.get("timeout")
+        kwargs["timeout"] = budget_timeout(requested)
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, url, **kwargs)
+        except requests.Timeout as e:
+            if kwargs["timeout"] != requested:
+                record_outbound(service, "deadline", time.perf_counter() - start)
+                raise DeadlineExceeded(f"escalation budget spent waiting for {service}") from e
+            record_outbound(service, "timeout", time.perf_counter() - start)
+            raise
+        except requests.RequestException:
+            record_outbound(service, "error", time.perf_counter() - start)
+            raise
+        outcome = "success" if response.status_code < 400 else "http_error"
+        record_outbound(service, outcome, time.perf_counter() - start)
+        if response.status_code >= 500 or response.status_code == 429:
+            call.fail()
+        return response
+
 def generate_personalized_message(activity="work"):
     """Generate a personalized wake-up message using Gemini."""
     if not GEMINI_API_KEY:
@@ -106,9 +266,7 @@ def generate_personalized_message(activity="work"):
         return random.choice(WAKE_UP_MESSAGES)
     
     try:
-        import requests
-        
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={GEMINI_API_KEY}"
+        url = f"{GEMINI_API_URL}/v1beta/models/gemini-1.5-flash-latest:generateContent?key={GEMINI_API_KEY}"
         
         prompt = f"""Create a UNHINGED, EXTREMELY HARSH wake-up message for someone who fell asleep while doing {activity}. 
 
@@ -128,26 +286,24 @@ Generate ONLY the wake-up message, nothing else."""
             }]
         }
         
-        response = requests.post(url, json=payload, timeout=5)
+        response = outbound_request("gemini", "POST", url, json=payload, timeout=5)
         if response.status_code == 200:
             data = response.json()
             message = data['candidates'][0]['content']['parts'][0]['text'].strip()
-            print(f"✨ Gemini generated personalized message: {message}")
+            logger.info("Gemini generated a wake-up message: %s", message)
             return message
         else:
             raise Exception(f"Gemini API error: {response.status_code}")
             
     except Exception as e:
-        print(f"Error calling Gemini API: {e}")
+        logger.warning("Gemini request failed, using a canned message: %s", e)
         import random
         return random.choice(WAKE_UP_MESSAGES)
 
 def generate_fish_audio(text, model_id=None):
     """Generate audio using Fish Audio SDK with random voice model."""
-    print(f"generate_fish_audio called with text: {text}")
-    
     if not FISH_API_KEY:
-        print("Fish Audio API key not configured")
+        logger.warning("Fish Audio API key not configured")
         return None
     
     if not model_id:
@@ -156,68 +312,125 @@ def generate_fish_audio(text, model_id=None):
         if available_models:
             model_id = random.choice(available_models)
         else:
-            print("Fish Audio model ID not configured")
+            logger.warning("Fish Audio model ID not configured")
             return None
     
-    print(f"Using model ID: {model_id}")
-    print(f"Using API key: {FISH_API_KEY[:10]}...")
-    
+    logger.debug("Generating wake-up audio", extra={"model_id": model_id, "chars": len(text)})
+
     try:
-        print("Importing fish_audio_sdk...")
-        from fish_audio_sdk import Session, TTSRequest
+        import ormsgpack
+        from fish_audio_sdk import TTSRequest
         
-        print("Creating Fish Audio session...")
-        session = Session(FISH_API_KEY)
-        
-        print("Generating audio using TTS...")
-        audio_data = b""
-        for chunk in session.tts(TTSRequest(text=text, model_id=model_id)):
-            audio_data += chunk
+        # Same request the SDK's Session.tts() sends, but through outbound_request so the
+        # breaker and escalation budget apply (the SDK client cannot be given a timeout).
+        response = outbound_request(
+            "fish", "POST", f"{FISH_API_URL}/v1/tts",
+            data=ormsgpack.packb(TTSRequest(text=text, model_id=model_id), option=ormsgpack.OPT_SERIALIZE_PYDANTIC),
+            headers={"Authorization": f"Bearer {FISH_API_KEY}", "Content-Type": "application/msgpack"},
+            timeout=10,
+        )
+        if response.status_code != 200:
+            raise Exception(f"Fish Audio API error: {response.status_code}")
+        audio_data = response.content
         
-        print(f"Audio generation completed, total bytes: {len(audio_data)}")
+        logger.info("Fish Audio generated wake-up audio", extra={"bytes": len(audio_data)})
         return audio_data
             
-    except Exception as e:
-        print(f"Error generating Fish Audio: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Fish Audio generation failed")
         return None
 
+# Alert audio plays in a background player so an alert never waits for playback to end;
+# each file is deleted once its player exits, checked on the next alert or at exit.
+pending_audio_files = []
+pending_audio_lock = threading.Lock()
+
+
 def play_audio_alert(audio_data):
     """Play audio alert using system audio."""
+    import tempfile
+
+    remove_audio_files()
+    temp_file_path = None
     try:
-        import tempfile
-        import os
-        
         with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
             temp_file.write(audio_data)
             temp_file_path = temp_file.name
         
         if os.name == 'posix':
-            os.system(f"afplay '{temp_file_path}'")
+            player = subprocess.Popen(["afplay", temp_file_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         else:
+            player = None
             os.system(f"start {temp_file_path}")
-        
-        import threading
-        def cleanup():
-            time.sleep(5)
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
-        
-        threading.Thread(target=cleanup, daemon=True).start()
+        with pending_audio_lock:
+            pending_audio_files.append((player, temp_file_path))
             
     except Exception as e:
-        print(f"Error playing audio: {e}")
-        import os
-        os.system("afplay /System/Library/Sounds/Alarm.aiff" if os.name == "posix" else "echo \a")
+        logger.warning("Playing alert audio failed, using the local tone: %s", e)
+        if temp_file_path is not None:
+            with pending_audio_lock:
+                pending_audio_files.append((None, temp_file_path))
+            remove_audio_files()
+        play_fallback_tone()
+
+
+def remove_audio_files(wait=False):
+    """Delete alert files whose player has exited; ones still playing or locked stay listed for the next try."""
+    with pending_audio_lock:
+        for entry in list(pending_audio_files):
+            player, path = entry
+            if player is not None and player.poll() is None and not wait:
+                continue
+            if player is not None:
+                player.wait()
+            if path is not None:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    continue
+            pending_audio_files.remove(entry)
+
+
+atexit.register(remove_audio_files, wait=True)
+
+def play_fallback_tone():
+    """Local alarm used when personalized audio is unavailable or late."""
+    if os.name == "posix":
+        player = subprocess.Popen(["afplay", "/System/Library/Sounds/Alarm.aiff"],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with pending_audio_lock:
+            pending_audio_files.append((player, None))
+    else:
+        os.system("echo \a")
+
+def wake_up_audio(activity="work"):
+    """Personalized wake-up audio within SLEEP_ALERT_BUDGET seconds, or None so the caller plays the tone.
+
+    Gemini gets half the budget (falling back to WAKE_UP_MESSAGES), Fish Audio the
+    rest. Work that overruns keeps going on the escalation pool, but the alert does
+    not wait for it.
+    """
+    deadline = Deadline(SLEEP_ALERT_BUDGET)
+    future = escalation_pool.submit(_build_wake_up_audio, activity, deadline)
+    try:
+        return future.result(timeout=deadline.remaining())
+    except FutureTimeout:
+        logger.warning("Wake-up audio not ready in time, playing the local tone", extra={"budget_s": SLEEP_ALERT_BUDGET})
+        return None
+
+def _build_wake_up_audio(activity, deadline):
+    with deadline_budget(deadline.remaining() / 2):
+        wake_up_message = generate_personalized_message(activity)
+    if deadline.remaining() <= 0:
+        return None
+    with deadline_budget(deadline):
+        return generate_fish_audio(wake_up_message)
 
 def get_user_phone_from_supabase():
     """Get the user's phone number from Supabase for the active session."""
     try:
-        import requests
-        
         # First, get the user_id from user_sessions table
         sessions_url = f"{SUPABASE_URL}/rest/v1/user_sessions?select=user_id&is_active=eq.true&limit=1"
         headers = {
@@ -225,49 +438,44 @@ def get_user_phone_from_supabase():
             "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
         }
         
-        sessions_response = requests.get(sessions_url, headers=headers, timeout=5)
-        print(f"🔍 Active sessions query response: {sessions_response.status_code}")
-        
+        sessions_response = outbound_request("supabase", "GET", sessions_url, headers=headers, timeout=5)
         if sessions_response.status_code == 200:
             sessions_data = sessions_response.json()
-            print(f"📊 Active sessions found: {len(sessions_data)}")
             if sessions_data and len(sessions_data) > 0:
                 user_id = sessions_data[0].get('user_id')
-                print(f"👤 Found active user_id: {user_id}")
+                logger.debug("Found the active user", extra={"user_id": user_id})
                 
                 # Now get the phone number for this specific user
                 phone_url = f"{SUPABASE_URL}/rest/v1/user_settings?select=your_phone&user_id=eq.{user_id}&limit=1"
-                phone_response = requests.get(phone_url, headers=headers, timeout=5)
+                phone_response = outbound_request("supabase", "GET", phone_url, headers=headers, timeout=5)
                 
                 if phone_response.status_code == 200:
                     phone_data = phone_response.json()
-                    print(f"📊 Phone data found: {len(phone_data)}")
                     if phone_data and len(phone_data) > 0:
-                        phone_number = phone_data[0].get('your_phone', '')
-                        print(f"📞 Retrieved user phone number: {phone_number}")
-                        return phone_number
+                        return phone_data[0].get('your_phone', '')
                     else:
-                        print("No phone number found for this user")
+                        logger.warning("No phone number found for this user", extra={"user_id": user_id})
                 else:
-                    print(f"Phone query failed: {phone_response.text}")
+                    logger.warning("Phone query failed", extra={"status": phone_response.status_code,
+                                                                "body": phone_response.text[:200]})
             else:
-                print("No active sessions found")
+                logger.warning("No active sessions found")
         else:
-            print(f"Sessions query failed: {sessions_response.text}")
+            logger.warning("Sessions query failed", extra={"status": sessions_response.status_code,
+                                                           "body": sessions_response.text[:200]})
         
         return None
         
-    except Exception as e:
-        print(f"Error fetching phone number from Supabase: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Fetching the phone number from Supabase failed")
         return None
 
-def increment_strikes_supabase():
+def increment_strikes_supabase(session=None):
     """Increment strikes in Supabase and check if call is needed."""
+    if session is not None:
+        session.record_incident("strike")
+    
     try:
-        import requests
-        
         # Get user_id from active session
         sessions_url = f"{SUPABASE_URL}/rest/v1/user_sessions?select=user_id&is_active=eq.true&limit=1"
         headers = {
@@ -276,32 +484,24 @@ def increment_strikes_supabase():
             "Content-Type": "application/json"
         }
         
-        sessions_response = requests.get(sessions_url, headers=headers, timeout=5)
+        sessions_response = outbound_request("supabase", "GET", sessions_url, headers=headers, timeout=5)
         if sessions_response.status_code == 200:
             sessions_data = sessions_response.json()
             if sessions_data and len(sessions_data) > 0:
                 user_id = sessions_data[0].get('user_id')
-                print(f"👤 Found active user_id: {user_id}")
             else:
-                print("❌ No active session found, cannot increment strikes")
+                logger.warning("No active session found, cannot increment strikes")
                 return 0
         else:
-            print(f"❌ Failed to get user_id: {sessions_response.status_code}")
+            logger.warning("Failed to get the active user", extra={"status": sessions_response.status_code})
             return 0
         
         # Increment strikes for this user
         url = f"{SUPABASE_URL}/rest/v1/rpc/increment_strikes"
-        print(f"📤 Calling Supabase RPC: {url}")
-        print(f"📤 Request body: {{'target_user_id': '{user_id}'}}")
-        
-        response = requests.post(url, json={"target_user_id": user_id}, headers=headers, timeout=5)
-        
-        print(f"📤 Response status: {response.status_code}")
-        print(f"📤 Response text: {response.text[:200]}")
-        
+        response = outbound_request("supabase", "POST", url, json={"target_user_id": user_id}, headers=headers, timeout=5)
+
         if response.status_code == 200:
             data = response.json()
-            print(f"📊 Strike increment response: {data}")
             
             # Extract total_strikes from response
             if isinstance(data, list) and len(data) > 0:
@@ -311,52 +511,42 @@ def increment_strikes_supabase():
             else:
                 new_strike_count = 0
             
-            print(f"✅ Strike incremented in Supabase. New total: {new_strike_count}")
-            
+            logger.info("Strike recorded", extra={"user_id": user_id, "strikes": new_strike_count})
+
             # Check if we should call after 2 strikes
             if new_strike_count >= 2:
-                print(f"🚨 User has reached 2+ strikes. Calling now...")
-                call_user_vapi()
+                logger.info("Two or more strikes, calling the user", extra={"user_id": user_id})
+                call_user_vapi(session)
                 return new_strike_count
         else:
-            print(f"❌ Failed to increment strike: {response.status_code} - {response.text}")
-            
-    except Exception as e:
-        print(f"Error incrementing strikes: {e}")
-        import traceback
-        traceback.print_exc()
+            logger.warning("Failed to increment strikes", extra={"status": response.status_code,
+                                                                 "body": response.text[:200]})
+
+    except Exception:
+        logger.exception("Incrementing strikes failed")
     
     return 0
 
-def call_user_vapi():
+def call_user_vapi(session=None):
     """Call the user via Vapi when they're away."""
-    global absence_alert_triggered
-    
-    print("📞📞📞 [ABSENCE CALL] call_user_vapi() called 📞📞📞")
-    
-    if absence_alert_triggered:
-        print("📞 [ABSENCE CALL] Call already triggered in this absence period, skipping")
+    if session is not None and session.absence_alert_triggered:
+        logger.info("Call already placed in this absence period, skipping", extra={"session": session.session_id})
         return
     
-    print(f"📞 [ABSENCE CALL] VAPI_API_KEY: {bool(VAPI_API_KEY)}")
-    print(f"📞 [ABSENCE CALL] VAPI_PHONE_NUMBER_ID: {bool(VAPI_PHONE_NUMBER_ID)}")
-    print(f"📞 [ABSENCE CALL] VAPI_SLACK_OFF_ASSISTANT_ID: {bool(VAPI_SLACK_OFF_ASSISTANT_ID)}")
+    if session is not None:
+        session.record_incident("call")
     
     if not VAPI_API_KEY or not VAPI_PHONE_NUMBER_ID or not VAPI_SLACK_OFF_ASSISTANT_ID:
-        print("❌ [ABSENCE CALL] Vapi configuration missing, skipping call")
+        logger.warning("Vapi configuration missing, skipping the call")
         return
-    
+
     user_phone = get_user_phone_from_supabase()
     if not user_phone:
-        print("❌ [ABSENCE CALL] Could not retrieve user phone number from Supabase")
+        logger.warning("Could not get the user's phone number from Supabase, skipping the call")
         return
     
-    print(f"📞 [ABSENCE CALL] Retrieved user phone: {user_phone}")
-    
     try:
-        import requests
-        
-        url = "https://api.vapi.ai/call"
+        url = f"{VAPI_API_URL}/call"
         headers = {
             "Authorization": f"Bearer {VAPI_API_KEY}",
             "Content-Type": "application/json"
@@ -370,459 +560,740 @@ def call_user_vapi():
             }
         }
         
-        print(f"📞 [ABSENCE CALL] Sending request to Vapi API...")
-        print(f"📞 [ABSENCE CALL] Phone number: {user_phone}")
-        print(f"📞 [ABSENCE CALL] Assistant ID: {VAPI_SLACK_OFF_ASSISTANT_ID}")
-        
         # Use async call with longer timeout
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        
-        print(f"📞 [ABSENCE CALL] Response status: {response.status_code}")
-        
+        response = outbound_request("vapi", "POST", url, json=payload, headers=headers, timeout=30)
+
         if response.status_code in [200, 201]:
-            print(f"✅ [ABSENCE CALL] Vapi call initiated successfully to {user_phone}")
+            logger.info("Vapi call placed")
         else:
-            print(f"❌ [ABSENCE CALL] Vapi call failed: {response.status_code} - {response.text}")
-            
-    except Exception as e:
-        print(f"❌ [ABSENCE CALL] Error calling Vapi: {e}")
-        import traceback
-        traceback.print_exc()
+            logger.warning("Vapi call failed", extra={"status": response.status_code, "body": response.text[:200]})
 
-def generate_frames():
-    """Generate camera frames for video streaming."""
-    global camera, camera_running
-    
-    if not session_active:
-        print("Session not active, camera not started")
-        return
-    
-    camera = cv2.VideoCapture(0)
-    if not camera.isOpened():
-        print("Camera not available")
+    except Exception:
+        logger.exception("Calling Vapi failed")
+
+def create_analyzer():
+    """Build the attention_monitor analyzer (for ENGINE_CONFIG's inference backend) that sessions share out."""
+    from attention_monitor import analyzer
+
+    return analyzer.create_analyzer(ENGINE_CONFIG)
+
+
+analyzer_resource = WarmResource(create_analyzer, lambda analyzer: analyzer.warm_up())
+
+
+warm_analyzer_in_use = False
+warm_analyzer_lock = threading.Lock()
+
+
+def acquire_analyzer():
+    """Hand out the preloaded analyzer to the first session that asks, a new one to the rest."""
+    global warm_analyzer_in_use
+
+    if WARM_MODE:
+        with warm_analyzer_lock:
+            take_warm = not warm_analyzer_in_use
+            warm_analyzer_in_use = True
+        if take_warm:
+            # Reuse the preloaded model; the pipeline's reset() clears tracking from the last session.
+            return analyzer_resource.get()
+    return create_analyzer()
+
+
+def release_analyzer(analyzer):
+    global warm_analyzer_in_use
+
+    if WARM_MODE and analyzer_resource.ready and analyzer is analyzer_resource.get():
+        with warm_analyzer_lock:
+            warm_analyzer_in_use = False
         return
-    
-    camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    
-    camera_running = True
-    print("Camera started")
-    
-    while camera_running and session_active:
-        success, frame = camera.read()
-        if not success:
-            break
-        
-        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        if not ret:
-            continue
-        
-        frame_bytes = buffer.tobytes()
-        frame_queue.append(frame_bytes)
-        
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-    
-    print("Camera stopped")
-    if camera:
-        camera.release()
+    analyzer.close()
 
-def estimate_head_pose(landmarks, image_shape):
-    """Estimate head pose (yaw, pitch) from face landmarks using proper 3D geometry."""
-    import numpy as np
-    
-    # Use the same landmark indices as the dormant system
-    # Key points for pose estimation
-    nose_tip_idx = 1
-    chin_idx = 199
-    left_eye_outer_idx = 33
-    right_eye_outer_idx = 263
-    mouth_left_idx = 61
-    mouth_right_idx = 291
-    
-    # Convert landmarks to 2D points (normalized coordinates)
-    height, width = image_shape[:2]
-    
-    # Extract 2D points
-    points_2d = np.array([
-        [landmarks[nose_tip_idx].x * width, landmarks[nose_tip_idx].y * height],
-        [landmarks[chin_idx].x * width, landmarks[chin_idx].y * height],
-        [landmarks[left_eye_outer_idx].x * width, landmarks[left_eye_outer_idx].y * height],
-        [landmarks[right_eye_outer_idx].x * width, landmarks[right_eye_outer_idx].y * height],
-        [landmarks[mouth_left_idx].x * width, landmarks[mouth_left_idx].y * height],
-        [landmarks[mouth_right_idx].x * width, landmarks[mouth_right_idx].y * height],
-    ], dtype=np.float64)
-    
-    # 3D model points (standard face model in mm)
-    points_3d = np.array([
-        (0.0, 0.0, 0.0),           # Nose tip
-        (0.0, -63.6, -12.5),       # Chin
-        (-43.3, 32.7, -26.0),      # Left eye outer corner
-        (43.3, 32.7, -26.0),       # Right eye outer corner
-        (-28.9, -28.9, -24.1),     # Left mouth corner
-        (28.9, -28.9, -24.1),      # Right mouth corner
-    ], dtype=np.float64)
-    
-    # Camera internals
-    focal_length = width
-    center = (width / 2, height / 2)
-    camera_matrix = np.array([
-        [focal_length, 0, center[0]],
-        [0, focal_length, center[1]],
-        [0, 0, 1]
-    ], dtype=np.float64)
-    
-    dist_coeffs = np.zeros((4, 1), dtype=np.float64)
-    
-    try:
-        # Solve PnP
-        success, rotation_vector, _ = cv2.solvePnP(
-            points_3d, 
-            points_2d, 
-            camera_matrix, 
-            dist_coeffs, 
-            flags=cv2.SOLVEPNP_ITERATIVE
+
+def status_text(update):
+    """The human-readable status line for a classified frame."""
+    if update.state == "looking_away":
+        return f"Looking away (yaw={update.analysis.yaw:.1f}°, pitch={update.analysis.pitch:.1f}°)"
+    return {"attentive": "Focused", "sleeping": "Sleeping", "not_present": "Not present"}.get(update.state, "Focused")
+
+
+class VisionSession:
+    """One monitored user on one camera: its engine, status, streams and analysis ticks.
+
+    Each tick feeds one frame to an attention_monitor pipeline whose handlers are
+    this session's escalation timers (sleep alert, looking-away strike, absence
+    call, each run on alert_pool once due) and then its status publisher. Ticks run on the shared scheduler's worker pool, one at a time per
+    session, so the pipeline and timers are only touched by whichever worker runs
+    the tick. Readers on other threads go through `snapshot`, which each tick
+    replaces wholesale.
+    """
+
+    def __init__(self, session_id, source=DEFAULT_CAMERA):
+        self.session_id = session_id
+        self.source = parse_camera_source(source)
+        self.camera_pool = camera_pool_for(self.source)
+        self.lock = threading.Lock()
+        self.active = False
+        self.task = "work"
+        self.started_at = None
+        self.current_status = "Looking for face..."
+        self.snapshot = StatusSnapshot()
+        # One encode per camera frame per stream profile, shared by every client asking for it
+        self.encoder = SharedEncoder()
+        self.clips = ClipRecorder(session_id, Path(CLIP_DIR), clip_writer, CLIP_PRE_SECONDS, CLIP_POST_SECONDS)
+        self.escalations = {
+            "sleeping": EscalationTimer("sleeping", SLEEP_THRESHOLD, self._sleep_alert, executor=alert_pool),
+            "looking_away": EscalationTimer("looking_away", LOOKING_AWAY_THRESHOLD, self._looking_away_strike,
+                                            executor=alert_pool),
+            "not_present": EscalationTimer("not_present", ABSENCE_THRESHOLD, self._absence_call, executor=alert_pool),
+        }
+        self._state = None
+        self._distraction = None
+
+        self._analyzer = None
+        self._pipeline = None
+        self._camera = None
+        self._buffers = None
+        self._read_failures = 0
+
+    def start(self):
+        with self.lock:
+            self.started_at = time.perf_counter()
+            self.active = True
+            self.publish_status()
+            scheduler.add(self)
+        logger.info("Session started", extra={"session": self.session_id, "camera": self.source})
+
+    def stop(self):
+        with self.lock:
+            self.active = False
+            self.current_status = "Looking for face..."
+            self.reset_alerts()
+            self.publish_status()
+            # Streams and the analysis tick hand the camera back to the pool as they exit.
+            self.encoder.clear()
+            self.clips.flush()
+            self.clips.clear()
+        logger.info("Session stopped", extra={"session": self.session_id})
+
+    def reset_alerts(self):
+        """Clear every timer and pending alert."""
+        for timer in self.escalations.values():
+            timer.reset()
+
+    @property
+    def absence_alert_triggered(self):
+        return self.escalations["not_present"].triggered
+
+    def record_incident(self, reason):
+        """Save a clip of what the camera saw around a strike, call or sleep alert."""
+        if CLIPS_ENABLED:
+            self.clips.trigger(reason)
+
+    def cancel_alert(self):
+        self.reset_alerts()
+        self.publish_status()
+
+    def set_task(self, data):
+        if data and 'task' in data:
+            self.task = data['task']
+            logger.info("Task updated", extra={"session": self.session_id, "task": self.task})
+            return {"success": True, "task": self.task}
+
+        return {"success": False, "error": "No task provided"}
+
+    def publish_status(self):
+        """Swap in a new status snapshot built from the current state and timers."""
+        status_type = status_type_for(self.current_status)
+        timer = self.escalations.get(status_type)
+        deadline = timer.deadline if timer is not None else None
+        # A single reference assignment, so readers on other threads see all or nothing.
+        self.snapshot = StatusSnapshot(self.current_status, status_type, deadline, CONSEQUENCES.get(status_type),
+                                       self.active, self._distraction)
+
+    def health(self):
+        return {
+            "session_id": self.session_id,
+            "camera": self.source,
+            "session_active": self.active,
+            "camera_open": self.camera_pool.is_open,
+            "frame_age": self.camera_pool.last_frame_age,
+        }
+
+    def tick(self):
+        """Capture one frame and run it through the engine.
+
+        Returns False when the session should leave the scheduler.
+        """
+        if not self.active:
+            return False
+        if self._camera is None and not self._open():
+            self.active = False
+            self.publish_status()
+            return False
+
+        with stage_timer("capture"):
+            frame = self._buffers.read(self._camera)
+        if frame is None:
+            FRAMES.labels("failed").inc()
+            # A dropped frame or a slow read is retried on the next tick; only a camera that keeps failing
+            # is handed back, since reopening it means a new pipeline too.
+            self._read_failures += 1
+            if self._read_failures < MAX_READ_FAILURES:
+                return True
+            logger.warning("Camera keeps failing to deliver frames, stopping analysis",
+                           extra={"session": self.session_id, "camera": self.source, "failures": self._read_failures})
+            return False
+        self._read_failures = 0
+        FRAMES.labels("captured").inc()
+        if CLIPS_ENABLED:
+            self._record_clip_frame(frame)
+
+        # Analysis, classification, the escalation timers and the status publisher all run in here.
+        self._pipeline.process(frame)
+        if self.started_at is not None:
+            SESSION_START_LATENCY.observe(time.perf_counter() - self.started_at)
+            self.started_at = None
+        return True
+
+    def _publish_update(self, update):
+        """Bus subscriber, after the escalation timers: log transitions and swap in the new status."""
+        if update.state != self._state:
+            logger.info(
+                "State changed",
+                extra={"session": self.session_id, "previous": self._state, "state": update.state,
+                       "yaw": update.analysis.yaw, "pitch": update.analysis.pitch,
+                       "rate_key": ("state", self.session_id, update.state)},
+            )
+            self._state = update.state
+        self.current_status = status_text(update)
+        self._distraction = self._pipeline.distraction(update.now)
+        if self.active:
+            self.publish_status()
+
+    def _record_clip_frame(self, frame):
+        # Reuses a stream's encode of this frame when one exists at the clip size.
+        seq = self._camera.seq
+        if seq is None:
+            return
+        encoded = self.encoder.encode(seq, CLIP_PROFILE, lambda: frame, lambda: self._camera.seq)
+        if encoded is not None:
+            self.clips.add(encoded[1])
+
+    def finish(self):
+        """Return the camera and model after the last tick."""
+        if self._camera is not None:
+            self._camera.release()
+            self._camera = None
+        if self._analyzer is not None:
+            # Flushes the event log subscriber and ends its thread; the analyzer goes back to the pool.
+            self._pipeline.close(analyzer=False)
+            release_analyzer(self._analyzer)
+            self._analyzer = None
+            self._pipeline = None
+        logger.info("Attention analysis stopped", extra={"session": self.session_id})
+
+    def _open(self):
+        from attention_monitor.buffers import FrameBufferPool
+        from attention_monitor.pipeline import AttentionMonitorPipeline
+
+        logger.info(
+            "Starting attention analysis",
+            extra={"session": self.session_id, "camera": self.source, "yaw_threshold": YAW_THRESHOLD,
+                   "pitch_threshold": PITCH_THRESHOLD, "ear_threshold": EAR_THRESHOLD},
         )
-        
-        if not success:
-            return 0.0, 0.0
-        
-        # Convert rotation vector to rotation matrix
-        rotation_matrix, _ = cv2.Rodrigues(rotation_vector)
-        
-        # Calculate Euler angles
-        sy = np.sqrt(rotation_matrix[0, 0] ** 2 + rotation_matrix[1, 0] ** 2)
-        
-        pitch = np.degrees(np.arctan2(-rotation_matrix[2, 0], sy))
-        yaw = np.degrees(np.arctan2(rotation_matrix[1, 0], rotation_matrix[0, 0]))
-        
-        # Debug output to see actual values
-        if abs(yaw) > 10 or abs(pitch) > 10:
-            print(f"📐 Head pose: yaw={yaw:.1f}°, pitch={pitch:.1f}°")
-        
-        return yaw, pitch
-        
-    except Exception as e:
-        print(f"Error in pose estimation: {e}")
-        return 0.0, 0.0
-
-def run_attention_analysis():
-    """Run attention analysis with 4 states: focused, sleeping, looking_away, not_present."""
-    global current_status
-    global sleep_start_time, sleep_alert_triggered, sleep_countdown
-    global absence_start_time, absence_alert_triggered, absence_countdown
-    global looking_away_start_time, looking_away_strike_triggered, looking_away_countdown
-    
-    import mediapipe as mp
-    
-    print("Starting attention analysis...")
-    print(f"📊 Detection thresholds: YAW={YAW_THRESHOLD}°, PITCH={PITCH_THRESHOLD}°, EAR={EAR_THRESHOLD}")
-    
-    mp_face_mesh = mp.solutions.face_mesh
-    face_mesh = mp_face_mesh.FaceMesh(
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    )
-    
-    cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    
-    while session_active:
-        success, frame = cap.read()
-        if not success:
-            break
-        
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh.process(rgb_frame)
-        
-        if results.multi_face_landmarks:
-            landmarks = results.multi_face_landmarks[0].landmark
-            
-            # Calculate eye aspect ratio
-            left_eye_top = landmarks[159].y
-            left_eye_bottom = landmarks[145].y
-            right_eye_top = landmarks[386].y
-            right_eye_bottom = landmarks[374].y
-            left_ear = abs(left_eye_top - left_eye_bottom)
-            right_ear = abs(right_eye_top - right_eye_bottom)
-            avg_ear = (left_ear + right_ear) / 2
-            
-            # Estimate head pose
-            yaw, pitch = estimate_head_pose(landmarks, frame.shape[:2])
-            
-            # Determine state priority: sleeping > looking_away > focused
-            if avg_ear < EAR_THRESHOLD:
-                # SLEEPING state
-                current_status = "Sleeping"
-                if sleep_start_time is None:
-                    sleep_start_time = time.time()
-                    print("😴 Sleep detected")
-                
-                sleep_duration = time.time() - sleep_start_time
-                
-                if sleep_duration < SLEEP_THRESHOLD:
-                    sleep_countdown = time.time() + (SLEEP_THRESHOLD - sleep_duration)
-                else:
-                    sleep_countdown = None
-                
-                if sleep_duration >= SLEEP_THRESHOLD and not sleep_alert_triggered:
-                    print(f"🚨 Sleep alert after {sleep_duration:.1f}s")
-                    sleep_alert_triggered = True
-                    wake_up_message = generate_personalized_message(current_task)
-                    audio_data = generate_fish_audio(wake_up_message)
-                    if audio_data:
-                        play_audio_alert(audio_data)
-                
-                # Reset looking_away when sleeping
-                looking_away_start_time = None
-                looking_away_strike_triggered = False
-                looking_away_countdown = None
-                
-            elif abs(yaw) > YAW_THRESHOLD or abs(pitch) > PITCH_THRESHOLD:
-                # LOOKING_AWAY state
-                current_status = f"Looking away (yaw={yaw:.1f}°, pitch={pitch:.1f}°)"
-                if looking_away_start_time is None:
-                    looking_away_start_time = time.time()
-                    print(f"👀 Looking away detected: yaw={yaw:.1f}°, pitch={pitch:.1f}°")
-                
-                looking_away_duration = time.time() - looking_away_start_time
-                
-                if looking_away_duration < LOOKING_AWAY_THRESHOLD:
-                    looking_away_countdown = time.time() + (LOOKING_AWAY_THRESHOLD - looking_away_duration)
-                else:
-                    looking_away_countdown = None
-                
-                if looking_away_duration >= LOOKING_AWAY_THRESHOLD and not looking_away_strike_triggered:
-                    print(f"⚠️ Looking away too long ({looking_away_duration:.1f}s) - adding strike")
-                    increment_strikes_supabase()
-                    looking_away_strike_triggered = True
-                    # Reset timer after strike
-                    looking_away_start_time = None
-                    looking_away_countdown = None
-                
-                # Reset sleep when looking away
-                sleep_start_time = None
-                sleep_alert_triggered = False
-                sleep_countdown = None
-                
-            else:
-                # FOCUSED state
-                current_status = "Focused"
-                
-                # Reset all timers
-                if sleep_start_time is not None:
-                    print(f"✅ Woke up after {time.time() - sleep_start_time:.1f}s")
-                sleep_start_time = None
-                sleep_alert_triggered = False
-                sleep_countdown = None
-                
-                if looking_away_start_time is not None:
-                    print(f"✅ Focused again after {time.time() - looking_away_start_time:.1f}s")
-                looking_away_start_time = None
-                looking_away_strike_triggered = False
-                looking_away_countdown = None
-            
-            # Reset absence when face is detected
-            if absence_start_time is not None:
-                print(f"✅ User returned after {time.time() - absence_start_time:.1f}s")
-            absence_start_time = None
-            absence_alert_triggered = False
-            absence_countdown = None
-            
+
+        camera = self.camera_pool.acquire()
+        if camera is None:
+            logger.warning("Camera not available", extra={"session": self.session_id, "camera": self.source})
+            return False
+        self._camera = camera
+        self._analyzer = acquire_analyzer()
+        self._pipeline = AttentionMonitorPipeline(
+            ENGINE_CONFIG, frame_analyzer=self._analyzer, session_id=self.session_id,
+            handlers=[*self.escalations.values(), CallbackHandler(self._publish_update, stage="status"),
+                      EventLogHandler(event_log_resource.get())],
+        )
+        self._pipeline.reset()
+        self._buffers = FrameBufferPool(FRAME_WIDTH, FRAME_HEIGHT)
+        self._read_failures = 0
+        self._state = None
+        self._distraction = None
+        return True
+
+    def _sleep_alert(self, update):
+        logger.warning("Sleep alert", extra=self._escalation_fields(update, SLEEP_THRESHOLD))
+        self.record_incident("sleep")
+        audio_data = wake_up_audio(self.task)
+        if audio_data:
+            play_audio_alert(audio_data)
         else:
-            # NOT_PRESENT state (no face detected)
-            current_status = "Not present"
-            
-            if absence_start_time is None:
-                absence_start_time = time.time()
-                print("👻 User not present - timer started")
-            
-            absence_duration = time.time() - absence_start_time
-            
-            # Set countdown if we haven't triggered the alert yet
-            if not absence_alert_triggered and absence_duration < ABSENCE_THRESHOLD:
-                remaining_time = ABSENCE_THRESHOLD - absence_duration
-                absence_countdown = time.time() + remaining_time
-                print(f"⏳ User absent - {remaining_time:.1f}s until call")
-            elif not absence_alert_triggered:
-                absence_countdown = None
-                print(f"🚨 User absent for {absence_duration:.1f}s - calling via Vapi")
-                call_user_vapi()
-                absence_alert_triggered = True
-            else:
-                absence_countdown = None
-            
-            # Reset other timers when not present
-            sleep_start_time = None
-            sleep_alert_triggered = False
-            sleep_countdown = None
-            
-            looking_away_start_time = None
-            looking_away_strike_triggered = False
-            looking_away_countdown = None
-        
-        time.sleep(0.5)
+            play_fallback_tone()
+
+    def _looking_away_strike(self, update):
+        logger.warning("Looking away too long, adding a strike",
+                       extra=self._escalation_fields(update, LOOKING_AWAY_THRESHOLD))
+        with deadline_budget(ESCALATION_BUDGET):
+            increment_strikes_supabase(self)
+
+    def _absence_call(self, update):
+        logger.warning("User absent, calling via Vapi", extra=self._escalation_fields(update, ABSENCE_THRESHOLD))
+        with deadline_budget(ESCALATION_BUDGET):
+            call_user_vapi(self)
+
+    def _escalation_fields(self, update, threshold):
+        return {"session": self.session_id, "state": update.state, "threshold_s": threshold,
+                "yaw": update.analysis.yaw, "pitch": update.analysis.pitch}
+
+    def encoded_frames(self, profile, wanted):
+        """Yield (sequence, JPEG bytes) for a stream profile while ``wanted()`` and the session last.
+
+        Both serving modes stream from here: Flask iterates it per client, the ASGI
+        server runs one per profile and fans the bytes out to its clients.
+        """
+        from attention_monitor.buffers import FrameBufferPool
+
+        if not self.active:
+            logger.info("Session not active, camera not started", extra={"session": self.session_id})
+            return
+
+        camera = self.camera_pool.acquire()
+        if camera is None:
+            logger.warning("Camera not available", extra={"session": self.session_id, "camera": self.source})
+            return
+
+        logger.info("Stream started", extra={"session": self.session_id, "profile": profile.label})
+        buffers = FrameBufferPool(FRAME_WIDTH, FRAME_HEIGHT)
+
+        def read_frame():
+            frame = buffers.read(camera)
+            if frame is None:
+                FRAMES.labels("failed").inc()
+                return None
+            # Stream frames are never analyzed; the analysis tick reads its own.
+            FRAMES.labels("captured").inc()
+            FRAMES.labels("skipped").inc()
+            return frame
+
+        pacer = FramePacer(profile.max_fps)
+        last_seq = 0
+        try:
+            while wanted() and self.active:
+                pacer.wait()
+                # Send each camera frame once; clients with the same profile share its encode.
+                encoded = self.encoder.encode(camera.wait_for_frame(last_seq), profile, read_frame, lambda: camera.seq)
+                if encoded is None:
+                    break
+                last_seq = encoded[0]
+                pacer.sent()
+                yield encoded
+        finally:
+            logger.info("Stream stopped", extra={"session": self.session_id, "profile": profile.label})
+            camera.release()
+
+    def snapshot_jpeg(self, profile):
+        """Return (JPEG bytes, None) for a snapshot, or (None, error message)."""
+        if not self.active:
+            return None, "Session not active"
+
+        frame_bytes = self.encoder.latest(profile, SNAPSHOT_MAX_AGE)
+        if frame_bytes is None:
+            frame_bytes = self._capture_snapshot(profile)
+        if frame_bytes is None:
+            return None, "Camera not available"
+        return frame_bytes, None
+
+    def _capture_snapshot(self, profile):
+        """Encode one frame for a snapshot when no stream has a fresh one cached."""
+        from attention_monitor.buffers import FrameBufferPool
+
+        camera = self.camera_pool.acquire()
+        if camera is None:
+            return None
+        try:
+            buffers = FrameBufferPool(FRAME_WIDTH, FRAME_HEIGHT)
+            encoded = self.encoder.encode(camera.wait_for_frame(0), profile, lambda: buffers.read(camera), lambda: camera.seq)
+            return encoded[1] if encoded is not None else None
+        finally:
+            camera.release()
+
+
+def get_session(session_id, source=None, create=False):
+    """Look up a session; with ``create`` make it (on ``source``, default camera otherwise)."""
+    with sessions_lock:
+        session = sessions.get(session_id)
+        if session is None and create:
+            session = sessions[session_id] = VisionSession(session_id, DEFAULT_CAMERA if source is None else source)
+        return session
+
+
+def default_session():
+    return get_session(DEFAULT_SESSION_ID, create=True)
+
+
+def stream_profile_from_request():
+    """Parse width/height/quality/fps query parameters; returns (profile, error response)."""
+    from flask import request
     
-    cap.release()
-    face_mesh.close()
-    print("Attention analysis stopped")
+    try:
+        return StreamProfile.from_query(request.args, FRAME_WIDTH, FRAME_HEIGHT), None
+    except ValueError as e:
+        return None, (jsonify({"success": False, "error": str(e)}), 400)
+
+
+def generate_frames(session, profile):
+    """Generate camera frames for one stream client at its requested size, quality and rate."""
+    clients = STREAM_CLIENTS.labels(profile.label)
+    clients.inc()
+    try:
+        for _, frame_bytes in session.encoded_frames(profile, lambda: True):
+            yield mjpeg_part(frame_bytes)
+    finally:
+        clients.dec()
 
 
-@app.route('/video_feed')
-def video_feed():
-    """Video streaming route."""
-    return Response(generate_frames(),
+def lookup_session(session_id):
+    """Return (session, error response); the default session always exists."""
+    session = get_session(session_id, create=session_id == DEFAULT_SESSION_ID)
+    if session is None:
+        return None, (jsonify({"success": False, "error": f"Unknown session: {session_id}"}), 404)
+    return session, None
+
+
+@app.route('/video_feed', defaults={'session_id': DEFAULT_SESSION_ID})
+@app.route('/sessions/<session_id>/video_feed')
+def video_feed(session_id):
+    """Video streaming route, e.g. /video_feed?width=160&quality=60&fps=5 for a thumbnail."""
+    session, error = lookup_session(session_id)
+    if error:
+        return error
+    profile, error = stream_profile_from_request()
+    if error:
+        return error
+    return Response(generate_frames(session, profile),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
-@app.route('/status')
-def status():
+@app.route('/snapshot', defaults={'session_id': DEFAULT_SESSION_ID})
+@app.route('/sessions/<session_id>/snapshot')
+def snapshot(session_id):
+    """Latest frame as a single JPEG, served from the stream cache when it is fresh."""
+    session, error = lookup_session(session_id)
+    if error:
+        return error
+    profile, error = stream_profile_from_request()
+    if error:
+        return error
+    frame_bytes, error = session.snapshot_jpeg(profile)
+    if error:
+        return jsonify({"success": False, "error": error}), 503
+    return Response(frame_bytes, mimetype='image/jpeg', headers={"Cache-Control": "no-store"})
+
+
+@app.route('/status', defaults={'session_id': DEFAULT_SESSION_ID})
+@app.route('/sessions/<session_id>/status')
+def status(session_id):
     """Get current status and countdown."""
-    global sleep_countdown, absence_countdown, looking_away_countdown, current_status, session_active
+    session, error = lookup_session(session_id)
+    if error:
+        return error
+    return jsonify(session.snapshot.to_json(time.time()))
+
+
+@app.route('/sessions')
+def list_sessions():
+    """List known sessions with their camera and current status."""
+    return jsonify(sessions_payload())
+
+
+def sessions_payload():
+    now = time.time()
+    with sessions_lock:
+        known = list(sessions.values())
+    return {
+        "analysis_workers": scheduler.workers,
+        "sessions": [dict(session.snapshot.to_json(now), session_id=session.session_id, camera=session.source)
+                     for session in known],
+    }
+
+
+@app.route('/health')
+def health():
+    """Liveness check that never touches the camera or the model."""
+    return jsonify(health_payload())
+
+
+def health_payload():
+    payload = default_session().health()
+    payload.update(
+        ok=True,
+        model_ready=analyzer_resource.ready,
+        active_sessions=sum(1 for session in list(sessions.values()) if session.active),
+        analysis_backlog=scheduler.backlog,
+        breakers=breaker_states(),
+    )
+    return payload
+
+
+@app.route('/events')
+def events():
+    """Attention history, a page at a time: /events?start=<ISO time>&limit=100, then ?since=<next_cursor>.
+
+    ``session=<id>`` keeps one session's events. Cursors are opaque, survive
+    log rotation, and a cursor older than the kept history resumes at the
+    oldest event with ``truncated`` set. A ``start`` older than the raw events
+    kept adds ``rollups`` summarizing the time up to them.
+    """
+    from flask import request
+
+    query, error = events_query(request.args)
+    if error:
+        return jsonify({"success": False, "error": error}), 400
+    page = event_log_resource.get().read(**query)
+    page.rollups = events_rollups(query)
+    return Response(page.to_json(), mimetype='application/json')
+
+
+@app.route('/events/tail')
+def events_tail():
+    """New events as server-sent events; each carries its cursor as the id, so reconnecting resumes after it."""
+    from flask import request
+
+    query, error = events_query(request.args, request.headers.get('Last-Event-ID'))
+    if error:
+        return jsonify({"success": False, "error": error}), 400
+    return Response(tail_events(query), mimetype='text/event-stream', headers={"Cache-Control": "no-store"})
+
+
+def events_query(args, last_event_id=None):
+    """Parse since/start/limit/session parameters into EventLog.read() arguments; returns (query, error)."""
+    since = last_event_id or args.get('since')
+    start = args.get('start')
+    try:
+        return {
+            "cursor": int(since) if since else None,
+            "start_ns": parse_timestamp_ns(start) if start and not since else None,
+            "limit": min(max(int(args.get('limit', 100)), 1), MAX_PAGE),
+            "session": args.get('session') or None,
+        }, None
+    except ValueError:
+        return None, "since and limit must be integers and start an ISO-8601 time or epoch seconds"
+
+
+def events_rollups(query):
+    """Rollups for the part of an /events?start= range older than the oldest raw event kept, else None."""
+    if query["cursor"] is not None or query["start_ns"] is None:
+        return None
+    oldest = event_log_resource.get().segments()[0].first_timestamp
+    end_ns = time.time_ns() if oldest is None else oldest
+    if query["start_ns"] >= end_ns:
+        return None
+    # Up to the minute before the raw events: the raw events carry on from there, and a minute they share would
+    # count twice. The last bucket then covers only part of its minute or hour.
+    end_ns = end_ns // (MINUTE * 10**9) * MINUTE * 10**9
+    seconds = history_resolution(query["start_ns"], end_ns)
+    rollups = history_resource.get().rollups(query["start_ns"], end_ns, query["session"], seconds)
+    return [rollup.to_dict() for rollup in rollups]
+
+
+@app.route('/history')
+def history():
+    """Attention per minute or hour over any range, e.g. /history?start=<time>&end=<time>&session=<id>.
+
+    Reads raw events and the minute and hour rollups alike; ``start`` defaults
+    to a day ago, ``end`` to now, and ``resolution`` (minute or hour) to
+    minutes for ranges up to two days.
+    """
+    from flask import request
+
+    payload, code = history_payload(request.args)
+    return jsonify(payload), code
+
+
+def history_payload(args):
+    """Rollups for /history query parameters; returns (payload, HTTP status)."""
+    try:
+        end_ns = parse_timestamp_ns(args['end']) if args.get('end') else time.time_ns()
+        start_ns = parse_timestamp_ns(args['start']) if args.get('start') else end_ns - 86400 * 10**9
+    except ValueError:
+        return {"success": False, "error": "start and end must be ISO-8601 times or epoch seconds"}, 400
+    resolution = args.get('resolution', 'auto')
+    if resolution not in ('auto', 'minute', 'hour'):
+        return {"success": False, "error": f"Unknown resolution: {resolution}"}, 400
+    seconds = history_resolution(start_ns, end_ns, resolution)
+    store = history_resource.get()
+    rollups = store.rollups(start_ns, end_ns, args.get('session') or None, seconds)
+    return {
+        "resolution": "minute" if seconds == MINUTE else "hour",
+        "coverage": store.coverage(),
+        "rollups": [rollup.to_dict() for rollup in rollups],
+    }, 200
+
+
+def history_resolution(start_ns, end_ns, resolution='auto'):
+    if resolution == 'auto':
+        return MINUTE if end_ns - start_ns <= HISTORY_MINUTES_UP_TO * 10**9 else HOUR
+    return MINUTE if resolution == 'minute' else HOUR
+
+
+def start_history_compaction():
+    """Roll raw events into minute and hour rollups in the background, dropping what retention allows."""
+    history_resource.get().start(HISTORY_COMPACT_INTERVAL)
+    logger.info("History compaction started", extra={"raw_days": HISTORY_RAW_DAYS, "minute_days": HISTORY_MINUTE_DAYS,
+                                                      "hour_days": HISTORY_HOUR_DAYS})
+
+
+def tail_events(query):
+    """Server-sent events from the query's position (default: the end of the log) as they are written."""
+    log = event_log_resource.get()
+    if query["cursor"] is None and query["start_ns"] is None:
+        query = dict(query, cursor=log.end)
+    yield b"retry: 2000\n\n"
+    while not log.closed:
+        page = log.read(**query)
+        if page.lines:
+            yield format_sse(page)
+        query = dict(query, cursor=page.next_cursor, start_ns=None)
+        if not page.more and not log.wait(page.next_cursor, EVENTS_TAIL_HEARTBEAT):
+            # Keeps proxies from closing an idle stream.
+            yield b": keep-alive\n\n"
+
+
+@app.route('/metrics')
+def metrics():
+    """Expose latency histograms and counters in Prometheus text format."""
+    return Response(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def analysis_thread_idents():
+    """Return the idents of the analysis workers while any session is active, else None."""
+    if not any(session.active for session in list(sessions.values())):
+        return None
+    return scheduler.worker_idents() or None
+
+
+@app.route('/profile', methods=['POST'])
+def profile():
+    """Sample the analysis workers for N seconds and write a collapsed-stack or speedscope file."""
+    from flask import request
     
-    countdown_val = None
-    consequence = None
+    payload, code = start_profile(request.args.get('seconds', 10.0, type=float),
+                                  request.args.get('format', 'collapsed'))
+    return jsonify(payload), code
+
+
+def start_profile(seconds, fmt):
+    """Start profiling the analysis workers; returns (payload, HTTP status)."""
+    idents = analysis_thread_idents()
+    if idents is None:
+        return {"success": False, "error": "Analysis thread is not running"}, 409
     
-    # Determine which countdown to show based on status
-    if "not present" in current_status.lower():
-        if absence_countdown is not None:
-            remaining = max(0, int(absence_countdown - time.time()))
-            if remaining > 0:
-                countdown_val = remaining
-                consequence = "phone call"
-    elif "sleep" in current_status.lower():
-        if sleep_countdown is not None:
-            remaining = max(0, int(sleep_countdown - time.time()))
-            if remaining > 0:
-                countdown_val = remaining
-                consequence = "loud wake-up call"
-    elif "looking away" in current_status.lower():
-        if looking_away_countdown is not None:
-            remaining = max(0, int(looking_away_countdown - time.time()))
-            if remaining > 0:
-                countdown_val = remaining
-                consequence = "strike added"
+    seconds = min(max(seconds, 0.1), 300.0)
+    if fmt not in ("collapsed", "speedscope"):
+        return {"success": False, "error": f"Unknown format: {fmt}"}, 400
     
-    # Determine status type
-    status_type = "focused"
-    if "sleep" in current_status.lower():
-        status_type = "sleeping"
-    elif "not present" in current_status.lower():
-        status_type = "not_present"
-    elif "looking away" in current_status.lower():
-        status_type = "looking_away"
+    output_path = default_profile_path(Path(PROFILE_OUTPUT_DIR), fmt)
+    if not profiler.start(idents, seconds, output_path, fmt):
+        return {"success": False, "error": "A profile is already running"}, 409
     
-    return jsonify({
-        "status": current_status,
-        "statusType": status_type,
-        "countdown": countdown_val,
-        "consequence": consequence,
-        "session_active": session_active
-    })
+    return {"success": True, "seconds": seconds, "format": fmt, "output": str(output_path)}, 200
 
 
-@app.route('/cancel_alert', methods=['POST'])
-def cancel_alert():
+@app.route('/cancel_alert', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@app.route('/sessions/<session_id>/cancel_alert', methods=['POST'])
+def cancel_alert(session_id):
     """Cancel the pending alert."""
-    global sleep_start_time, sleep_alert_triggered, sleep_countdown
-    global absence_start_time, absence_alert_triggered, absence_countdown
-    global looking_away_start_time, looking_away_strike_triggered, looking_away_countdown
-    
-    # Reset all alerts
-    sleep_start_time = None
-    sleep_alert_triggered = False
-    sleep_countdown = None
-    
-    absence_start_time = None
-    absence_alert_triggered = False
-    absence_countdown = None
-    
-    looking_away_start_time = None
-    looking_away_strike_triggered = False
-    looking_away_countdown = None
-    
+    session, error = lookup_session(session_id)
+    if error:
+        return error
+    session.cancel_alert()
     return jsonify({"success": True})
 
 
-@app.route('/update_task', methods=['POST'])
-def update_task():
+@app.route('/update_task', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@app.route('/sessions/<session_id>/update_task', methods=['POST'])
+def update_task(session_id):
     """Update the current task for personalized messages."""
-    global current_task
-    
     from flask import request
-    data = request.get_json()
-    if data and 'task' in data:
-        current_task = data['task']
-        print(f"📝 Task updated to: {current_task}")
-        return jsonify({"success": True, "task": current_task})
-    
-    return jsonify({"success": False, "error": "No task provided"})
+    session, error = lookup_session(session_id)
+    if error:
+        return error
+    return jsonify(session.set_task(request.get_json(silent=True)))
 
 
-@app.route('/start_session', methods=['POST'])
-def start_session():
-    """Start the vision monitoring session."""
-    global session_active, analysis_thread
-    
-    print("=== START SESSION CALLED ===")
-    session_active = True
-    print("Vision session started")
-    
-    if not analysis_thread or not analysis_thread.is_alive():
-        analysis_thread = threading.Thread(target=run_attention_analysis, daemon=True)
-        analysis_thread.start()
-    
-    return jsonify({"success": True, "message": "Session started"})
+@app.route('/start_session', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@app.route('/sessions/<session_id>/start', methods=['POST'])
+def start_session(session_id):
+    """Start a vision monitoring session; JSON {"camera": index or URL} picks the camera."""
+    from flask import request
+    data = request.get_json(silent=True) or {}
+    _, error = begin_session(session_id, data.get('camera', request.args.get('camera')))
+    if error:
+        return jsonify({"success": False, "error": error}), 409
+    return jsonify({"success": True, "message": "Session started", "session_id": session_id})
+
+
+def begin_session(session_id=DEFAULT_SESSION_ID, camera=None):
+    """Start (creating if needed) a session; returns (session, error).
 
+    A stopped session can move to another camera. One still scheduled (running,
+    or stopped but not yet finished) keeps its camera, and asking for another
+    is an error rather than a start on the old one.
+    """
+    with sessions_lock:
+        session = sessions.get(session_id)
+        source = None if camera is None else parse_camera_source(camera)
+        if session is not None and source is not None and source != session.source:
+            if scheduler.is_scheduled(session_id):
+                return None, (f"Session {session_id} is still running on camera {session.source}; "
+                              "stop it before switching cameras")
+            session = None
+        if session is None:
+            session = sessions[session_id] = VisionSession(
+                session_id, DEFAULT_CAMERA if source is None else source)
+    session.start()
+    return session, None
 
-@app.route('/stop_session', methods=['POST'])
-def stop_session():
+
+@app.route('/stop_session', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@app.route('/sessions/<session_id>/stop', methods=['POST'])
+def stop_session(session_id):
     """Stop the vision monitoring session."""
-    global session_active, camera_running, camera
-    global sleep_start_time, sleep_alert_triggered, sleep_countdown
-    global absence_start_time, absence_alert_triggered, absence_countdown
-    global looking_away_start_time, looking_away_strike_triggered, looking_away_countdown
-    
-    session_active = False
-    camera_running = False
-    
-    # Reset all timers
-    sleep_start_time = None
-    sleep_alert_triggered = False
-    sleep_countdown = None
-    
-    absence_start_time = None
-    absence_alert_triggered = False
-    absence_countdown = None
-    
-    looking_away_start_time = None
-    looking_away_strike_triggered = False
-    looking_away_countdown = None
-    
-    if camera:
-        camera.release()
-        camera = None
-    
-    print("Vision session stopped")
-    
-    return jsonify({"success": True, "message": "Session stopped"})
+    session, error = lookup_session(session_id)
+    if error:
+        return error
+    session.stop()
+    return jsonify({"success": True, "message": "Session stopped", "session_id": session_id})
+
+
+def end_session(session_id=DEFAULT_SESSION_ID):
+    session = get_session(session_id)
+    if session is not None:
+        session.stop()
 
 
 def stop_camera():
-    """Stop the camera."""
-    global camera_running, camera
-    camera_running = False
-    if camera:
-        camera.release()
-        camera = None
+    """Stop every session and close all cameras."""
+    for session in list(sessions.values()):
+        session.stop()
+    for pool in list(camera_pools.values()):
+        pool.close()
 
 
 if __name__ == '__main__':
-    print("Starting Vision Monitor Server...")
-    print("Camera feed will be available at http://localhost:8080/video_feed")
-    print("Extension overlay will use this server for camera feed")
+    configure_logging()
+    print_config_debug()
+    logger.info("Starting Vision Monitor Server; camera feed at http://localhost:8080/video_feed")
+
+    if install_profile_signal(profiler, analysis_thread_idents, Path(PROFILE_OUTPUT_DIR),
+                              duration=float(os.getenv("PROFILE_SECONDS", "10"))):
+        logger.info("Send SIGUSR1 (kill -USR1 %d) to profile the analysis workers", os.getpid())
+
+    logger.info("Sessions at /sessions/<id>/...",
+                extra={"analysis_workers": scheduler.workers, "default_camera": DEFAULT_CAMERA})
+    if WARM_MODE:
+        logger.info("Warm mode: preloading the face model",
+                    extra={"camera_idle_grace_s": CAMERA_IDLE_GRACE_SECONDS})
+        analyzer_resource.start()
+    start_history_compaction()
     
     app.run(host='0.0.0.0', port=8080, debug=False, threaded=True)
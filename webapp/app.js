@@ -173,6 +173,114 @@ async function loadDashboard() {
     document.getElementById('mom-phone').value = data.mom_phone || '';
     document.getElementById('your-phone').value = data.your_phone || '';
   }
+  
+  loadAttentionHistory().catch(() => {
+    // Vision server not running yet; history loads when a session starts
+  });
+}
+
+// Attention history - paged from the vision server's /events, then followed live through /events/tail.
+// historyCursor is where the last page or streamed event ended, so each load only fetches what is new.
+// historyDay is the midnight the counts start from; when it changes they start again from zero.
+const HISTORY_TRANSITIONS_SHOWN = 10;
+let historyCursor = null;
+let historySource = null;
+let historyLastState = null;
+let historyDay = null;
+let historyLoading = null;
+const historyCounts = {};
+
+function startOfToday() {
+  const midnight = new Date();
+  midnight.setHours(0, 0, 0, 0);
+  return midnight.toISOString();
+}
+
+function resetHistoryIfNewDay() {
+  const today = startOfToday();
+  if (today === historyDay) return;
+  historyDay = today;
+  historyCursor = null;
+  historyLastState = null;
+  for (const state of Object.keys(historyCounts)) {
+    historyCounts[state] = 0;
+  }
+  document.getElementById('history-transitions').replaceChildren();
+}
+
+function recordHistoryEvent(event) {
+  historyCounts[event.state] = (historyCounts[event.state] || 0) + 1;
+  if (event.state !== historyLastState) {
+    const list = document.getElementById('history-transitions');
+    const item = document.createElement('li');
+    const time = document.createElement('span');
+    time.textContent = new Date(event.timestamp).toLocaleTimeString();
+    item.append(time, event.state.replace('_', ' '));
+    list.prepend(item);
+    while (list.children.length > HISTORY_TRANSITIONS_SHOWN) {
+      list.lastChild.remove();
+    }
+  }
+  historyLastState = event.state;
+}
+
+function renderHistoryCounts() {
+  for (const [state, count] of Object.entries(historyCounts)) {
+    const counter = document.getElementById(`history-${state}`);
+    if (counter) counter.textContent = count;
+  }
+}
+
+function loadAttentionHistory() {
+  // Callers that overlap (dashboard load, session start) share one load, so no page is counted twice;
+  // while the tail is open it delivers everything new itself.
+  if (historySource) return Promise.resolve();
+  if (!historyLoading) {
+    historyLoading = fetchAttentionHistory().finally(() => {
+      historyLoading = null;
+    });
+  }
+  return historyLoading;
+}
+
+async function fetchAttentionHistory() {
+  resetHistoryIfNewDay();
+  let query = historyCursor === null ? `start=${encodeURIComponent(historyDay)}` : `since=${historyCursor}`;
+  while (true) {
+    const response = await fetch(`http://localhost:8080/events?session=default&limit=1000&${query}`);
+    if (!response.ok) return;
+    const page = await response.json();
+    page.events.forEach(recordHistoryEvent);
+    historyCursor = page.next_cursor;
+    if (!page.more) break;
+    query = `since=${historyCursor}`;
+  }
+  renderHistoryCounts();
+}
+
+async function followAttentionHistory() {
+  try {
+    await loadAttentionHistory();
+  } catch (error) {
+    console.error('Error loading attention history:', error);
+    return;
+  }
+  if (historySource) return;
+  // EventSource reconnects on its own, resuming after the last event id (the cursor) it received
+  historySource = new EventSource(`http://localhost:8080/events/tail?session=default&since=${historyCursor}`);
+  historySource.onmessage = (message) => {
+    resetHistoryIfNewDay();
+    historyCursor = message.lastEventId;
+    recordHistoryEvent(JSON.parse(message.data));
+    renderHistoryCounts();
+  };
+}
+
+function stopFollowingAttentionHistory() {
+  if (historySource) {
+    historySource.close();
+    historySource = null;
+  }
 }
 
 // Settings modal
@@ -273,6 +381,7 @@ document.getElementById('start-session-btn')?.addEventListener('click', async ()
     } catch (error) {
       console.error('Error starting vision monitor:', error);
     }
+    followAttentionHistory();
     
     // Update session status in Supabase
     const { error } = await supabase.rpc('update_session_status', { is_active_val: true });
@@ -313,6 +422,7 @@ document.getElementById('stop-session-btn')?.addEventListener('click', async ()
   }
   
   // Stop vision monitor
+  stopFollowingAttentionHistory();
   try {
     await fetch('http://localhost:8080/stop_session', { method: 'POST' });
   } catch (error) {